@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fused parse-and-hash vs the string pipeline, stage by stage.
+
+Pipeline: read lines as str, CriteoDataLoader._parse_line, then
+Preprocessor.transform. Fused: read lines as bytes, then
+FusedParser.parse_line. Each stage runs over the whole (materialized)
+input, so the times add up to a full pass. Also checks that both produce
+identical features.
+
+Usage:
+    python benchmarks/bench_fused.py
+    python benchmarks/bench_fused.py --data data/day_0.gz --max-lines 1000000
+"""
+import os
+import sys
+import time
+import argparse
+import itertools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.data_loader import CriteoDataLoader, create_sample_data, open_text
+from src.data.fused import FusedParser, iter_binary_lines
+from src.data.preprocessing import Preprocessor
+
+
+def timed(fn):
+    """(seconds, result) of fn()."""
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fused parse-and-hash benchmark')
+    parser.add_argument('--data', type=str, help='Data file (default: sample data)')
+    parser.add_argument('--max-lines', type=int, help='Lines limit')
+    parser.add_argument('--num-buckets', type=int, default=2**18)
+    args = parser.parse_args()
+
+    path = args.data
+    if path is None:
+        path = 'data/sample/train.txt'
+        if not os.path.exists(path):
+            create_sample_data(path, num_samples=10000)
+
+    preprocessor = Preprocessor(num_buckets=args.num_buckets)
+    loader = CriteoDataLoader(path)
+
+    def read_text():
+        with open_text(path) as f:
+            return list(itertools.islice(f, args.max_lines))
+
+    read_time, lines = timed(read_text)
+    parse_time, parsed = timed(lambda: [p for p in map(loader._parse_line, lines) if p is not None])
+    hash_time, expected = timed(lambda: [(label, preprocessor.transform(features))
+                                         for label, features in parsed])
+    pipeline = [('read (str)', read_time), ('parse', parse_time), ('hash', hash_time)]
+
+    fused_parser = FusedParser(preprocessor)
+    read_bytes_time, raw_lines = timed(
+        lambda: list(itertools.islice(iter_binary_lines(path), args.max_lines)))
+    fused_time, fused = timed(lambda: [p for p in map(fused_parser.parse_line, raw_lines)
+                                       if p is not None])
+    fused_stages = [('read (bytes)', read_bytes_time), ('parse + hash', fused_time)]
+
+    print(f"Data: {path} ({len(lines):,} lines, {len(expected):,} samples)")
+    for name, stages in (('Pipeline', pipeline), ('Fused', fused_stages)):
+        total = sum(seconds for _, seconds in stages)
+        detail = ', '.join(f"{stage} {seconds:.3f}s" for stage, seconds in stages)
+        print(f"  {name:<9} {total:7.3f}s {len(expected) / total:>10,.0f} samples/s  ({detail})")
+    print(f"  Same features: {fused == expected}")
+
+
+if __name__ == '__main__':
+    main()
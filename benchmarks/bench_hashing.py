@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FeatureHasher hash functions.
+
+Hashes the 'name:value' keys of the data with every available hash_name
+(murmur3 and xxhash need their packages) and reports features hashed per
+second, end-to-end Preprocessor.transform samples per second, and the
+collision rate among distinct keys next to the rate expected from a
+uniform hash. The first row is the original hexdigest-based MD5/SHA-256
+scheme that legacy_md5 reproduces.
+
+Usage:
+    python benchmarks/bench_hashing.py
+    python benchmarks/bench_hashing.py --data data/day_0.gz --max-samples 200000 \\
+        --num-buckets 16777216
+"""
+import os
+import sys
+import time
+import hashlib
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.data_loader import StreamingIterator, create_sample_data
+from src.data.preprocessing import FeatureHasher, Preprocessor, HAS_MMH3, HAS_XXHASH
+
+
+def feature_keys(samples):
+    """The encoded keys FeatureHasher.transform hashes for every sample."""
+    keys = []
+    for raw_features in samples:
+        for i, value in enumerate(raw_features[:13]):
+            if value != -1:
+                keys.append(f"I{i + 1}:{value}".encode())
+        for i, value in enumerate(raw_features[13:]):
+            keys.append(f"C{i + 1}:{value or '__MISSING__'}".encode())
+    return keys
+
+
+def hexdigest_hash(key, num_buckets):
+    """The original scheme: two hexdigests parsed as 128/256-bit ints."""
+    bucket = int(hashlib.md5(key).hexdigest(), 16) % num_buckets
+    sign = 1 if int(hashlib.sha256(key).hexdigest(), 16) % 2 == 0 else -1
+    return bucket, sign
+
+
+def collision_rate(buckets, num_buckets):
+    """Observed and expected fraction of distinct keys sharing a bucket."""
+    distinct = len(buckets)
+    used = len(set(buckets))
+    expected_used = num_buckets * (1 - (1 - 1 / num_buckets) ** distinct)
+    return 1 - used / distinct, 1 - expected_used / distinct
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Feature hashing benchmark')
+    parser.add_argument('--data', type=str, help='Data file (default: sample data)')
+    parser.add_argument('--max-samples', type=int, default=20000)
+    parser.add_argument('--num-buckets', type=int, default=2**18)
+    args = parser.parse_args()
+
+    path = args.data
+    if path is None:
+        path = 'data/sample/train.txt'
+        if not os.path.exists(path):
+            create_sample_data(path, num_samples=10000)
+
+    samples = [features for _, features in StreamingIterator(path, max_samples=args.max_samples)]
+    keys = feature_keys(samples)
+    distinct_keys = list(dict.fromkeys(keys))
+    print(f"Data: {path} ({len(samples):,} samples, {len(keys):,} features, "
+          f"{len(distinct_keys):,} distinct, {args.num_buckets:,} buckets)")
+
+    backends = ['legacy_md5', 'crc32']
+    backends += ['murmur3'] if HAS_MMH3 else []
+    backends += ['xxhash'] if HAS_XXHASH else []
+
+    print(f"{'Hash':<22}{'Features/s':>14}{'Samples/s':>12}{'Collisions':>12}{'Uniform':>10}")
+    print("-" * 70)
+
+    start = time.perf_counter()
+    for key in keys:
+        hexdigest_hash(key, args.num_buckets)
+    rate = len(keys) / (time.perf_counter() - start)
+    print(f"{'md5 hexdigest (old)':<22}{rate:>14,.0f}{'':>12}{'':>12}{'':>10}")
+
+    for name in backends:
+        hash_key = FeatureHasher(args.num_buckets, hash_name=name).hash_key
+        start = time.perf_counter()
+        for key in keys:
+            hash_key(key)
+        feature_rate = len(keys) / (time.perf_counter() - start)
+
+        preprocessor = Preprocessor(num_buckets=args.num_buckets, hash_name=name)
+        start = time.perf_counter()
+        for raw_features in samples:
+            preprocessor.transform(raw_features)
+        sample_rate = len(samples) / (time.perf_counter() - start)
+
+        observed, expected = collision_rate([hash_key(key)[0] for key in distinct_keys],
+                                            args.num_buckets)
+        print(f"{name:<22}{feature_rate:>14,.0f}{sample_rate:>12,.0f}"
+              f"{observed:>12.2%}{expected:>10.2%}")
+
+    missing = [name for name, available in (('murmur3', HAS_MMH3), ('xxhash', HAS_XXHASH))
+               if not available]
+    if missing:
+        print(f"Skipped (package not installed): {', '.join(missing)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Hogwild multi-process FTRL vs the sequential StreamingTrainer.
+
+Reports training throughput (samples/s) and speedup for an increasing number
+of workers, together with train/test log-loss and test AUC so that the
+parallel models can be checked for parity with the sequential one.
+
+Usage:
+    python benchmarks/bench_hogwild.py
+    python benchmarks/bench_hogwild.py --data data/day_2.gz --test-data data/day_3.gz \\
+        --max-samples 2000000 --workers 1 2 4 8
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.data_loader import create_sample_data
+from src.data.preprocessing import Preprocessor
+from src.algorithms.ftrl import FTRLProximal
+from src.training.trainer import StreamingTrainer
+from src.training.parallel import HogwildTrainer
+
+
+def evaluate_quietly(model, preprocessor, test_path, max_samples):
+    """Evaluate a model without the trainer's progress output."""
+    trainer = StreamingTrainer(model, preprocessor, batch_size=1024)
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return trainer.evaluate(test_path, max_samples=max_samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hogwild FTRL scaling benchmark')
+    parser.add_argument('--data', type=str, help='Training file (default: generated sample)')
+    parser.add_argument('--test-data', type=str, help='Test file (default: generated sample)')
+    parser.add_argument('--max-samples', type=int, help='Training samples limit')
+    parser.add_argument('--num-buckets', type=int, default=2**20)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--batch-size', type=int, default=1, help='Per-worker batch size')
+    args = parser.parse_args()
+    
+    train_path, test_path = args.data, args.test_data
+    if train_path is None:
+        train_path = 'data/bench/train.txt'
+        if not os.path.exists(train_path):
+            create_sample_data(train_path, num_samples=100000)
+    if test_path is None:
+        test_path = 'data/bench/test.txt'
+        if not os.path.exists(test_path):
+            create_sample_data(test_path, num_samples=20000)
+    
+    params = {'alpha': 0.1, 'beta': 1.0, 'L1': 1.0, 'L2': 1.0}
+    preprocessor = Preprocessor(num_buckets=args.num_buckets)
+    rows = []
+    
+    # Sequential baseline (same dense backend and preprocessing)
+    model = FTRLProximal(num_features=args.num_buckets, backend='dense', **params)
+    trainer = StreamingTrainer(model, preprocessor, log_interval=10**12)
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        train_metrics = trainer.train(train_path, max_samples=args.max_samples)
+    elapsed = time.time() - start
+    test_metrics = evaluate_quietly(model, preprocessor, test_path, None)
+    rows.append(('sequential', train_metrics['count'], elapsed, train_metrics, test_metrics))
+    
+    for num_workers in args.workers:
+        hogwild = HogwildTrainer(num_workers=num_workers,
+                                 num_features=args.num_buckets,
+                                 preprocessor=preprocessor,
+                                 batch_size=args.batch_size,
+                                 **params)
+        with contextlib.redirect_stdout(io.StringIO()):
+            model, train_metrics = hogwild.train(train_path, max_samples=args.max_samples)
+        test_metrics = evaluate_quietly(model, preprocessor, test_path, None)
+        rows.append((f'hogwild x{num_workers}', train_metrics['count'],
+                     train_metrics['time'], train_metrics, test_metrics))
+    
+    base_speed = rows[0][1] / rows[0][2]
+    print(f"\n{'Mode':<14} {'Samples':>10} {'Time(s)':>9} {'Samples/s':>11} {'Speedup':>8} "
+          f"{'Train LL':>9} {'Test LL':>9} {'Test AUC':>9}")
+    print("-" * 86)
+    for name, count, elapsed, train_metrics, test_metrics in rows:
+        speed = count / elapsed
+        print(f"{name:<14} {count:>10,} {elapsed:>9.2f} {speed:>11.0f} {speed / base_speed:>7.2f}x "
+              f"{train_metrics['log_loss']:>9.4f} {test_metrics['log_loss']:>9.4f} "
+              f"{test_metrics.get('auc', float('nan')):>9.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: exact vs count-based learning-rate state for FTRL-Proximal.
+
+Trains the dense FTRL model with the exact sum of squared gradients n and
+with n approximated from positive/negative counts (lr_state='counts') for
+several counter types, and reports the learning-rate state memory, the
+total state memory, and train/test log-loss and AUC with the difference to
+the exact model.
+
+Usage:
+    python benchmarks/bench_lr_state.py
+    python benchmarks/bench_lr_state.py --data data/day_2.gz --test-data data/day_3.gz \\
+        --max-samples 1000000 --num-buckets 16777216
+"""
+import os
+import sys
+import io
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.data_loader import create_sample_data
+from src.data.preprocessing import Preprocessor
+from src.algorithms.ftrl import FTRLProximal
+from src.training.trainer import StreamingTrainer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FTRL learning-rate state benchmark')
+    parser.add_argument('--data', type=str, help='Training file (default: sample data)')
+    parser.add_argument('--test-data', type=str, help='Test file (default: sample data)')
+    parser.add_argument('--max-samples', type=int, help='Training samples limit')
+    parser.add_argument('--num-buckets', type=int, default=2**18)
+    parser.add_argument('--dtype', type=str, default='float64', choices=['float32', 'float64'])
+    args = parser.parse_args()
+    
+    train_path, test_path = args.data, args.test_data
+    if train_path is None:
+        train_path = 'data/sample/train.txt'
+        if not os.path.exists(train_path):
+            create_sample_data(train_path, num_samples=10000)
+    if test_path is None:
+        test_path = 'data/sample/test.txt'
+        if not os.path.exists(test_path):
+            create_sample_data(test_path, num_samples=2000)
+    
+    configs = [
+        ('exact', 'exact', 'uint16'),
+        ('counts u8', 'counts', 'uint8'),
+        ('counts u16', 'counts', 'uint16'),
+        ('counts u32', 'counts', 'uint32'),
+    ]
+    preprocessor = Preprocessor(num_buckets=args.num_buckets)
+    rows = []
+    
+    for name, lr_state, count_dtype in configs:
+        model = FTRLProximal(alpha=0.1, beta=1.0, L1=1.0, L2=1.0,
+                             num_features=args.num_buckets, backend='dense', dtype=args.dtype,
+                             lr_state=lr_state, count_dtype=count_dtype)
+        trainer = StreamingTrainer(model, preprocessor, log_interval=10**12)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            train_metrics = trainer.train(train_path, max_samples=args.max_samples)
+            test_metrics = trainer.evaluate(test_path)
+        
+        lr_bytes = sum(state.nbytes for state in model._lr_arrays().values())
+        rows.append((name, lr_bytes, model.memory_usage(), train_metrics['log_loss'],
+                     test_metrics['log_loss'], test_metrics.get('auc', float('nan'))))
+    
+    base = rows[0]
+    print(f"\n{'LR state':<11} {'n MB':>7} {'State MB':>9} {'Train LL':>9} "
+          f"{'Test LL':>9} {'dLL':>8} {'Test AUC':>9} {'dAUC':>8}")
+    print("-" * 78)
+    for name, lr_bytes, state_bytes, train_ll, test_ll, auc in rows:
+        print(f"{name:<11} {lr_bytes / 2**20:>7.2f} {state_bytes / 2**20:>9.2f} "
+              f"{train_ll:>9.4f} {test_ll:>9.4f} {test_ll - base[4]:>+8.4f} "
+              f"{auc:>9.4f} {auc - base[5]:>+8.4f}")
+    print(f"\nn MB is the learning-rate state (float n or the two counters); "
+          f"State MB adds z and the weight cache ({args.dtype}).")
+
+
+if __name__ == '__main__':
+    main()
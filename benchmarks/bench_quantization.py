@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: quantized serving snapshots for FTRL and Online LR.
+
+Trains both models on one pass over the training file, exports frozen
+snapshots at several precisions (float64, float32, 16/12/8/4-bit, and the
+paper's q2.13 format) and scores all of them on one pass over the held-out
+file. Reports snapshot memory for both layouts and log-loss / AUC drift
+against the full-precision model.
+
+Usage:
+    python benchmarks/bench_quantization.py
+    python benchmarks/bench_quantization.py --data data/day_2.gz --test-data data/day_3.gz \\
+        --max-samples 1000000 --num-buckets 16777216
+"""
+import os
+import sys
+import io
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.data_loader import create_sample_data
+from src.data.preprocessing import Preprocessor
+from src.algorithms.ftrl import FTRLProximal
+from src.algorithms.online_logistic import OnlineLogisticRegression
+from src.training.trainer import MultiModelTrainer
+
+
+# (name, bits, scale); bits None = float snapshot of that dtype
+PRECISIONS = [
+    ('float64', None, 'float64'),
+    ('float32', None, 'float32'),
+    ('16-bit', 16, None),
+    ('q2.13', 16, 2**-13),
+    ('12-bit', 12, None),
+    ('8-bit', 8, None),
+    ('4-bit', 4, None),
+]
+
+
+@contextlib.contextmanager
+def quietly():
+    """Silence the trainers' progress output."""
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def snapshot(model, layout: str, bits, scale_or_dtype):
+    """Frozen (float) or quantized snapshot of a model."""
+    if bits is None:
+        return model.freeze(layout=layout, dtype=scale_or_dtype)
+    return model.freeze(layout=layout).quantize(bits=bits, scale=scale_or_dtype)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quantized serving snapshot benchmark')
+    parser.add_argument('--data', type=str, help='Training file (default: sample data)')
+    parser.add_argument('--test-data', type=str, help='Held-out file (default: sample data)')
+    parser.add_argument('--max-samples', type=int, help='Training samples limit')
+    parser.add_argument('--num-buckets', type=int, default=2**18)
+    args = parser.parse_args()
+    
+    train_path, test_path = args.data, args.test_data
+    if train_path is None:
+        train_path = 'data/sample/train.txt'
+        if not os.path.exists(train_path):
+            create_sample_data(train_path, num_samples=10000)
+    if test_path is None:
+        test_path = 'data/sample/test.txt'
+        if not os.path.exists(test_path):
+            create_sample_data(test_path, num_samples=2000)
+    
+    preprocessor = Preprocessor(num_buckets=args.num_buckets)
+    models = {
+        'ftrl': FTRLProximal(alpha=0.1, beta=1.0, L1=1.0, L2=1.0, num_features=args.num_buckets),
+        'online_lr': OnlineLogisticRegression(learning_rate=0.1, L2=0.001,
+                                              num_features=args.num_buckets),
+    }
+    
+    with quietly():
+        MultiModelTrainer(models, preprocessor, log_interval=10**12).train(
+            train_path, max_samples=args.max_samples)
+    
+    snapshots = {}
+    memory = {}
+    for model_name, model in models.items():
+        for name, bits, setting in PRECISIONS:
+            key = f'{model_name} {name}'
+            snapshots[key] = snapshot(model, 'sorted', bits, setting)
+            memory[key] = (snapshots[key].nbytes,
+                           snapshot(model, 'dense', bits, setting).nbytes)
+    
+    with quietly():
+        results = MultiModelTrainer(snapshots, preprocessor, batch_size=1024).evaluate(test_path)
+    
+    print(f"\n{'Snapshot':<20} {'Weights':>8} {'Sorted B':>10} {'Dense B':>11} "
+          f"{'Test LL':>9} {'dLL':>10} {'AUC':>7} {'dAUC':>9}")
+    print("-" * 91)
+    for key, frozen in snapshots.items():
+        base = results[key.split()[0] + ' float64']
+        result = results[key]
+        sorted_bytes, dense_bytes = memory[key]
+        print(f"{key:<20} {frozen.num_weights:>8,} {sorted_bytes:>10,} {dense_bytes:>11,} "
+              f"{result['log_loss']:>9.5f} {result['log_loss'] - base['log_loss']:>+10.6f} "
+              f"{result.get('auc', float('nan')):>7.4f} "
+              f"{result.get('auc', float('nan')) - base.get('auc', float('nan')):>+9.5f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: frozen serving snapshot vs the training-time FTRL model.
+
+Trains FTRL on the sample data, freezes it with the 'sorted' and 'dense'
+layouts and reports memory, scoring throughput on pre-hashed test batches
+and the largest prediction difference against the training model.
+
+Usage:
+    python benchmarks/bench_serving.py
+    python benchmarks/bench_serving.py --data data/day_2.gz --test-data data/day_3.gz \\
+        --max-samples 1000000 --num-buckets 16777216
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.data_loader import CriteoDataLoader, create_sample_data
+from src.data.preprocessing import Preprocessor
+from src.algorithms.ftrl import FTRLProximal
+from src.training.trainer import StreamingTrainer
+
+
+def time_scoring(score_fn, batches, repeat: int) -> float:
+    """Best-of-repeat samples/s of score_fn over all batches."""
+    num_samples = sum(len(indptr) - 1 for _, _, indptr in batches)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for batch in batches:
+            score_fn(*batch)
+        best = min(best, time.perf_counter() - start)
+    return num_samples / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FTRL serving snapshot benchmark')
+    parser.add_argument('--data', type=str, help='Training file (default: sample data)')
+    parser.add_argument('--test-data', type=str, help='Test file (default: sample data)')
+    parser.add_argument('--max-samples', type=int, help='Training samples limit')
+    parser.add_argument('--num-buckets', type=int, default=2**18)
+    parser.add_argument('--batch-size', type=int, default=1024)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    train_path, test_path = args.data, args.test_data
+    if train_path is None:
+        train_path = 'data/sample/train.txt'
+        if not os.path.exists(train_path):
+            create_sample_data(train_path, num_samples=10000)
+    if test_path is None:
+        test_path = 'data/sample/test.txt'
+        if not os.path.exists(test_path):
+            create_sample_data(test_path, num_samples=2000)
+    
+    preprocessor = Preprocessor(num_buckets=args.num_buckets)
+    model = FTRLProximal(alpha=0.1, beta=1.0, L1=1.0, L2=1.0, num_features=args.num_buckets)
+    trainer = StreamingTrainer(model, preprocessor, log_interval=10**12)
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        trainer.train(train_path, max_samples=args.max_samples)
+    
+    # Hash the test set once so that only scoring is timed
+    batches = [preprocessor.transform_batch(raw_batch)
+               for _, raw_batch in CriteoDataLoader(test_path, batch_size=args.batch_size)]
+    reference = np.concatenate([model.predict_batch(*batch) for batch in batches])
+    
+    candidates = [('ftrl (training)', model, model.memory_usage())]
+    for layout in ('sorted', 'dense'):
+        for dtype in ('float64', 'float32'):
+            frozen = model.freeze(layout=layout, dtype=dtype)
+            candidates.append((f'frozen {layout} {dtype[5:]}', frozen, frozen.nbytes))
+    
+    nonzero, total, _ = model.sparsity()
+    print(f"\nFTRL: {nonzero:,} nonzero of {total:,} coordinates, "
+          f"{len(reference):,} test samples, batch size {args.batch_size}")
+    print(f"\n{'Model':<20} {'Memory':>12} {'vs train':>9} {'Samples/s':>12} {'Max |dp|':>10}")
+    print("-" * 67)
+    train_bytes = candidates[0][2]
+    for name, scorer, nbytes in candidates:
+        speed = time_scoring(scorer.predict_batch, batches, args.repeat)
+        preds = np.concatenate([scorer.predict_batch(*batch) for batch in batches])
+        print(f"{name:<20} {nbytes:>12,} {nbytes / train_bytes:>9.1%} {speed:>12,.0f} "
+              f"{np.max(np.abs(preds - reference)):>10.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-sample streaming from a text file.
+
+Compares the old StreamingIterator path, one-element batches from a
+frozen copy of the previous CriteoDataLoader.__iter__ unpacked as
+labels[0], features[0], with the single-sample
+CriteoDataLoader.iter_samples generator it now uses. Reports samples per
+second for reading + parsing alone and with per-sample hashing
+(Preprocessor.transform), the full input side of StreamingTrainer.train.
+Run-to-run noise is of the same order as the difference between the
+two paths, so use several --repeats on a large --data file.
+
+Usage:
+    python benchmarks/bench_streaming.py
+    python benchmarks/bench_streaming.py --data data/day_0.gz --max-samples 1000000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.data_loader import CriteoDataLoader, create_sample_data
+from src.data.preprocessing import Preprocessor
+
+
+def old_batches(loader):
+    """
+    Frozen copy of CriteoDataLoader.__iter__ (string mode) from before
+    iter_samples: the batch lists are built inside the parse loop.
+    """
+    labels = []
+    features = []
+    sample_count = 0
+    
+    for line in loader._lines():
+        if loader.max_samples and sample_count >= loader.max_samples:
+            break
+        
+        parsed = loader._parse_line(line)
+        if parsed is not None:
+            label, feat = parsed
+            labels.append(label)
+            features.append(feat)
+            sample_count += 1
+            
+            if len(labels) >= loader.batch_size:
+                yield labels, features
+                labels = []
+                features = []
+    
+    if labels:
+        yield labels, features
+
+
+def batch_of_one(path, max_samples):
+    """The previous per-sample path: one-element batches, unpacked."""
+    loader = CriteoDataLoader(path, batch_size=1, max_samples=max_samples)
+    for labels, features in old_batches(loader):
+        yield labels[0], features[0]
+
+
+def single_sample(path, max_samples):
+    """The dedicated single-sample generator."""
+    return CriteoDataLoader(path, max_samples=max_samples).iter_samples()
+
+
+def run(source, path, max_samples, preprocessor):
+    """(seconds, samples) of one pass over the data."""
+    count = 0
+    start = time.perf_counter()
+    if preprocessor is None:
+        for _label, _features in source(path, max_samples):
+            count += 1
+    else:
+        transform = preprocessor.transform
+        for _label, features in source(path, max_samples):
+            transform(features)
+            count += 1
+    return time.perf_counter() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-sample streaming benchmark')
+    parser.add_argument('--data', type=str, help='Data file (default: sample data)')
+    parser.add_argument('--max-samples', type=int, help='Samples limit')
+    parser.add_argument('--num-buckets', type=int, default=2**18)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    
+    path = args.data
+    if path is None:
+        path = 'data/sample/train.txt'
+        if not os.path.exists(path):
+            create_sample_data(path, num_samples=10000)
+    
+    preprocessor = Preprocessor(num_buckets=args.num_buckets)
+    
+    print(f"Data: {path}")
+    print(f"{'Path':<28}{'Stage':<18}{'Seconds':>10}{'Samples/s':>14}")
+    print("-" * 70)
+    sources = (('batch_size=1 + unpack', batch_of_one), ('iter_samples', single_sample))
+    for stage, prep in (('parse', None), ('parse + hash', preprocessor)):
+        # Alternate the paths and keep the best pass of each, so that drift
+        # in machine load does not favour whichever runs first
+        best = {name: (float('inf'), 0) for name, _ in sources}
+        for _ in range(args.repeats):
+            for name, source in sources:
+                best[name] = min(best[name], run(source, path, args.max_samples, prep))
+        for name, (seconds, count) in best.items():
+            print(f"{name:<28}{stage:<18}{seconds:>10.3f}{count / seconds:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,23 +7,32 @@ Bài tập lớn môn Thuật toán ứng dụng.
 
 Usage:
     python main.py --train --data data/sample/train.txt
-    python main.py --evaluate --model models/ftrl.pkl --data data/sample/test.txt
+    python main.py --evaluate --model models/ftrl.bin --data data/sample/test.txt
     python main.py --demo
     python main.py --compare
+    python main.py --convert --data data/sample/train.txt --cache-dir data/cache/train
+    python main.py --split --data data/train.txt.gz --cache-dir data/train.parts
 """
 
 import os
 import sys
+import time
 import argparse
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.data.data_loader import CriteoDataLoader, StreamingIterator, create_sample_data
-from src.data.preprocessing import Preprocessor
+from src.data.data_loader import CriteoDataLoader, StreamingIterator, create_sample_data, split_into_parts
+from src.data.columnar import convert_to_columnar
+from src.data.preprocessing import FeatureHasher, Preprocessor
 from src.algorithms.ftrl import FTRLProximal
 from src.algorithms.online_logistic import OnlineLogisticRegression
-from src.training.trainer import StreamingTrainer, compare_models
+from src.algorithms.model_io import read_header
+from src.algorithms.admission import CountingBloomAdmission, ProbabilisticAdmission
+from src.algorithms.eviction import CoordinateEvictor
+from src.training.trainer import StreamingTrainer, MultiModelTrainer, compare_models
+from src.training.parallel import HogwildTrainer
+from src.training.checkpoint import CheckpointManager
 from src.evaluation.metrics import RunningMetrics, log_loss, auc_score
 from src.evaluation.visualizer import Visualizer
 from src.evaluation.graph_analysis import FeatureGraphAnalyzer
@@ -59,30 +68,99 @@ def train(args):
     else:
         train_path, _ = setup_sample_data()
     
+    # Multi-process Hogwild training (FTRL only)
+    if args.workers > 1 and args.model_type == 'ftrl':
+        hogwild = HogwildTrainer(
+            num_workers=args.workers,
+            num_features=args.num_buckets,
+            alpha=args.alpha,
+            beta=args.beta,
+            L1=args.l1,
+            L2=args.l2,
+            dtype=args.dtype,
+            preprocessor=Preprocessor(num_buckets=args.num_buckets, typed=args.typed,
+                                      hash_name=args.hash),
+            batch_size=args.batch_size
+        )
+        model, metrics = hogwild.train(train_path, max_samples=args.max_samples)
+        if args.output:
+            os.makedirs(os.path.dirname(args.output), exist_ok=True)
+            model.save(args.output)
+            print(f"Model saved to {args.output}")
+        return metrics
+    
+    # Checkpointing (FTRL only): resume from the latest base + deltas
+    checkpoint_manager = None
+    if args.checkpoint_dir and args.model_type == 'ftrl':
+        checkpoint_manager = CheckpointManager(args.checkpoint_dir)
+    
+    # Bounded-memory FTRL: incremental coordinate eviction
+    eviction = None
+    if args.max_coordinates or args.ttl or args.prune_zero_after is not None:
+        eviction = CoordinateEvictor(max_coordinates=args.max_coordinates,
+                                     ttl=args.ttl,
+                                     prune_zero_after=args.prune_zero_after)
+    
+    # Feature admission (FTRL only): not saved with the model, so it is
+    # attached to a resumed model as well
+    admission = None
+    if args.admission_min_count:
+        admission = CountingBloomAdmission(min_count=args.admission_min_count)
+    elif args.admission_prob:
+        admission = ProbabilisticAdmission(p=args.admission_prob)
+    
     # Initialize model
-    if args.model_type == 'ftrl':
+    if args.resume and checkpoint_manager and checkpoint_manager.exists():
+        model = checkpoint_manager.load()
+        if admission is not None:
+            model.admission = admission
+        if eviction is not None:
+            model.eviction = eviction
+            eviction.track(model)
+        print(f"Resumed from checkpoint: {model}")
+    elif args.model_type == 'ftrl':
         model = FTRLProximal(
             alpha=args.alpha,
             beta=args.beta,
             L1=args.l1,
-            L2=args.l2
+            L2=args.l2,
+            num_features=args.num_buckets,
+            backend=args.backend,
+            dtype=args.dtype,
+            admission=admission,
+            eviction=eviction,
+            lr_state=args.lr_state,
+            count_dtype=args.count_dtype
         )
     else:
         model = OnlineLogisticRegression(
             learning_rate=args.lr,
-            L2=args.l2
+            L2=args.l2,
+            num_features=args.num_buckets,
+            l2_mode=args.l2_mode,
+            backend=args.backend,
+            dtype=args.dtype,
+            batch_update=args.batch_update
         )
     
     # Initialize preprocessor and trainer
-    preprocessor = Preprocessor(num_buckets=args.num_buckets)
+    preprocessor = Preprocessor(num_buckets=args.num_buckets, typed=args.typed,
+                                hash_name=args.hash)
     trainer = StreamingTrainer(
         model=model,
         preprocessor=preprocessor,
-        log_interval=args.log_interval
+        log_interval=args.log_interval,
+        batch_size=args.batch_size,
+        checkpoint_manager=checkpoint_manager,
+        checkpoint_interval=args.checkpoint_interval,
+        parse_workers=args.parse_workers,
+        queue_depth=args.queue_depth,
+        prefetch=args.prefetch,
+        fused=args.fused
     )
     
     # Train
-    metrics = trainer.train(train_path, max_samples=args.max_samples)
+    metrics = trainer.train(train_path, max_samples=args.max_samples, start_line=args.start_line)
     
     # Save model
     if args.output:
@@ -107,11 +185,17 @@ def evaluate(args):
         print("Error: --model path required for evaluation")
         return
     
-    # Load model
-    if 'ftrl' in args.model.lower():
-        model = FTRLProximal.load(args.model)
+    # Load model (memory-mapped, read-only: startup does not depend on size)
+    header = read_header(args.model)
+    if header is not None:
+        is_ftrl = header['model'] == 'FTRLProximal'
     else:
-        model = OnlineLogisticRegression.load(args.model)
+        is_ftrl = 'ftrl' in args.model.lower()
+    
+    if is_ftrl:
+        model = FTRLProximal.load(args.model, mmap=True)
+    else:
+        model = OnlineLogisticRegression.load(args.model, mmap=True)
     
     print(f"Loaded model: {model}")
     
@@ -122,8 +206,27 @@ def evaluate(args):
         _, test_path = setup_sample_data()
     
     # Evaluate
-    preprocessor = Preprocessor(num_buckets=args.num_buckets)
-    trainer = StreamingTrainer(model, preprocessor)
+    preprocessor = Preprocessor(num_buckets=args.num_buckets, typed=args.typed,
+                                hash_name=args.hash)
+    
+    if args.quantize_bits:
+        # Full precision and quantized weights scored in one pass
+        quantized = model.freeze().quantize(bits=args.quantize_bits, scale=args.quantize_scale)
+        print(f"Quantized: {quantized}")
+        trainer = MultiModelTrainer({'full': model, 'quantized': quantized}, preprocessor,
+                                    batch_size=args.batch_size)
+        results = trainer.evaluate(test_path, max_samples=args.max_samples)
+        
+        full, drift = results['full'], results['quantized']
+        print(f"\nDrift ({args.quantize_bits}-bit, scale={quantized.scale:.3g}):")
+        print(f"  Log-Loss: {drift['log_loss'] - full['log_loss']:+.6f}")
+        if 'auc' in full:
+            print(f"  AUC: {drift['auc'] - full['auc']:+.6f}")
+        return results
+    
+    trainer = StreamingTrainer(model, preprocessor, batch_size=args.batch_size,
+                               parse_workers=args.parse_workers, queue_depth=args.queue_depth,
+                               prefetch=args.prefetch, fused=args.fused)
     
     metrics = trainer.evaluate(test_path, max_samples=args.max_samples)
     
@@ -169,6 +272,52 @@ def compare(args):
     return results
 
 
+def convert(args):
+    """Convert a TSV/GZ data file into a columnar binary cache."""
+    print("=" * 60)
+    print("COLUMNAR CACHE CONVERSION")
+    print("=" * 60)
+    
+    if args.data:
+        data_path = args.data
+    else:
+        data_path, _ = setup_sample_data()
+    
+    cache_dir = args.cache_dir
+    if not cache_dir:
+        base = data_path[:-3] if data_path.endswith('.gz') else data_path
+        cache_dir = os.path.splitext(base)[0] + '.cols'
+    
+    start = time.time()
+    num_rows = convert_to_columnar(data_path, cache_dir, max_samples=args.max_samples)
+    print(f"Wrote {num_rows:,} rows to {cache_dir} in {time.time() - start:.1f}s")
+    print(f"Use it in place of the file, e.g. --data {cache_dir}")
+    return cache_dir
+
+
+def split(args):
+    """Split a TSV/GZ data file into part files for sharded reading."""
+    print("=" * 60)
+    print("SPLIT INTO PARTS")
+    print("=" * 60)
+    
+    if args.data:
+        data_path = args.data
+    else:
+        data_path, _ = setup_sample_data()
+    
+    parts_dir = args.cache_dir
+    if not parts_dir:
+        base = data_path[:-3] if data_path.endswith('.gz') else data_path
+        parts_dir = os.path.splitext(base)[0] + '.parts'
+    
+    start = time.time()
+    parts = split_into_parts(data_path, parts_dir, lines_per_part=args.lines_per_part)
+    print(f"Wrote {len(parts)} parts to {parts_dir} in {time.time() - start:.1f}s")
+    print(f"Use it in place of the file, e.g. --data {parts_dir}")
+    return parts_dir
+
+
 def run_graph_analysis(args):
     """Run NetworkX graph analysis on features."""
     print("=" * 60)
@@ -179,7 +328,7 @@ def run_graph_analysis(args):
         data_path = args.data
     else:
         data_path, _ = setup_sample_data()
-        
+    
     analyzer = FeatureGraphAnalyzer()
     corr = analyzer.calculate_interactions(data_path, max_samples=args.max_samples or 5000)
     analyzer.visualize_feature_network(corr, threshold=args.threshold or 0.1)
@@ -222,8 +371,8 @@ def demo():
     # Save model
     print("\n6. Saving model...")
     os.makedirs('models', exist_ok=True)
-    model.save('models/ftrl_demo.pkl')
-    print("   Saved to: models/ftrl_demo.pkl")
+    model.save('models/ftrl_demo.bin')
+    print("   Saved to: models/ftrl_demo.bin")
     
     print("\n" + "=" * 60)
     print("DEMO COMPLETED SUCCESSFULLY!")
@@ -256,7 +405,10 @@ Examples:
   python main.py --demo                           # Run quick demo
   python main.py --compare                        # Compare FTRL vs Online LR
   python main.py --train --data train.txt         # Train on custom data
-  python main.py --evaluate --model ftrl.pkl      # Evaluate saved model
+  python main.py --evaluate --model ftrl.bin      # Evaluate saved model
+  python main.py --convert --data train.txt       # Columnar cache train.cols
+  python main.py --train --data train.cols        # Train from the cache
+  python main.py --split --data train.txt.gz      # Part files train.parts
         """
     )
     
@@ -264,6 +416,10 @@ Examples:
     parser.add_argument('--train', action='store_true', help='Train a model')
     parser.add_argument('--evaluate', action='store_true', help='Evaluate a model')
     parser.add_argument('--compare', action='store_true', help='Compare FTRL vs Online LR')
+    parser.add_argument('--convert', action='store_true',
+                       help='Convert --data into a columnar binary cache (see --cache-dir)')
+    parser.add_argument('--split', action='store_true',
+                       help='Split --data into part files for sharded reading (see --cache-dir)')
     parser.add_argument('--graph', action='store_true', help='Run NetworkX graph analysis')
     parser.add_argument('--demo', action='store_true', help='Run demo')
     
@@ -271,12 +427,17 @@ Examples:
     parser.add_argument('--data', type=str, help='Path to training/test data')
     parser.add_argument('--test-data', type=str, help='Path to test data (for compare)')
     parser.add_argument('--max-samples', type=int, help='Maximum samples to process')
+    parser.add_argument('--cache-dir', type=str,
+                       help='Output directory for --convert (default: <data>.cols) '
+                            'or --split (default: <data>.parts)')
+    parser.add_argument('--lines-per-part', type=int, default=1_000_000,
+                       help='Lines per part file for --split')
     
     # Model arguments
     parser.add_argument('--model', type=str, help='Path to saved model (for evaluate)')
     parser.add_argument('--model-type', type=str, default='ftrl', 
                        choices=['ftrl', 'online_lr'], help='Model type')
-    parser.add_argument('--output', type=str, default='models/model.pkl',
+    parser.add_argument('--output', type=str, default='models/model.bin',
                        help='Output path for trained model')
     
     # FTRL hyperparameters
@@ -284,16 +445,73 @@ Examples:
     parser.add_argument('--beta', type=float, default=1.0, help='FTRL beta')
     parser.add_argument('--l1', type=float, default=1.0, help='L1 regularization')
     parser.add_argument('--l2', type=float, default=1.0, help='L2 regularization')
+    parser.add_argument('--backend', type=str, default='dict',
+                       choices=list(FTRLProximal.BACKENDS), help='Model state backend (FTRL and Online LR)')
+    parser.add_argument('--dtype', type=str, default='float64',
+                       choices=['float32', 'float64'], help='Float type for the dense backend')
+    parser.add_argument('--lr-state', type=str, default='exact',
+                       choices=list(FTRLProximal.LR_STATES),
+                       help="FTRL learning-rate state: float n or positive/negative counts (dense backend)")
+    parser.add_argument('--count-dtype', type=str, default='uint16',
+                       choices=['uint8', 'uint16', 'uint32'], help="Counter type for --lr-state counts")
+    parser.add_argument('--admission-min-count', type=int,
+                       help='Admit a new FTRL coordinate after N occurrences (counting Bloom filter)')
+    parser.add_argument('--admission-prob', type=float,
+                       help='Admit a new FTRL coordinate with probability p per occurrence')
+    parser.add_argument('--max-coordinates', type=int,
+                       help='FTRL memory budget: evict coordinates beyond this count')
+    parser.add_argument('--ttl', type=int,
+                       help='Evict FTRL coordinates not updated for this many samples')
+    parser.add_argument('--prune-zero-after', type=int,
+                       help='Evict zero-weight FTRL coordinates idle for this many samples')
+    parser.add_argument('--quantize-bits', type=int,
+                       help='Evaluate: also score with weights quantized to this many bits and report drift')
+    parser.add_argument('--quantize-scale', type=float,
+                       help='Weight of one quantization step (default: max|w| / (2^(bits-1) - 1))')
     parser.add_argument('--lr', type=float, default=0.1, help='Learning rate (Online LR)')
+    parser.add_argument('--l2-mode', type=str, default='active',
+                       choices=list(OnlineLogisticRegression.L2_MODES),
+                       help="Online LR L2: shrink active features only, or lazy decay of all weights")
+    parser.add_argument('--batch-update', type=str, default='online',
+                       choices=list(OnlineLogisticRegression.BATCH_UPDATES),
+                       help="Online LR mini-batches: per-row online steps or one averaged-gradient step")
     parser.add_argument('--threshold', type=float, default=0.1, help='Graph correlation threshold')
     
     # Preprocessing
     parser.add_argument('--num-buckets', type=int, default=2**18,
                        help='Number of hash buckets')
+    parser.add_argument('--typed', action='store_true',
+                       help='Parse categoricals as uint32 and hash integer ids (use for train and evaluate alike)')
+    parser.add_argument('--hash', type=str, default='legacy_md5', choices=FeatureHasher.HASHES,
+                       help='Feature hash function (use for train and evaluate alike; '
+                            'murmur3/xxhash need the mmh3/xxhash packages)')
     
     # Training
     parser.add_argument('--log-interval', type=int, default=10000,
                        help='Logging interval')
+    parser.add_argument('--batch-size', type=int, default=1,
+                       help='Mini-batch size (>1 uses vectorized batch updates)')
+    parser.add_argument('--checkpoint-dir', type=str,
+                       help='Directory for base/delta FTRL checkpoints')
+    parser.add_argument('--checkpoint-interval', type=int, default=100000,
+                       help='Checkpoint interval (in samples)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Resume training from --checkpoint-dir')
+    parser.add_argument('--start-line', type=int, default=0,
+                       help='Start reading a text --data file at this line (skips the '
+                            'lines a resumed run has already trained on)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes for Hogwild FTRL training')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                       help='Processes that parse and hash the input ahead of training (0 = in-process)')
+    parser.add_argument('--queue-depth', type=int, default=8,
+                       help='Parsed chunks the --parse-workers may run ahead of training')
+    parser.add_argument('--prefetch', type=int, default=0,
+                       help='Line blocks a background reader thread may read ahead '
+                            '(0 = read in the training loop)')
+    parser.add_argument('--fused', action='store_true',
+                       help='Parse and hash text input in one pass over the raw bytes '
+                            '(same features; not with --typed or --parse-workers)')
     
     # Visualization
     parser.add_argument('--plot', action='store_true', help='Generate plots')
@@ -301,7 +519,8 @@ Examples:
     args = parser.parse_args()
     
     # Default to demo if no mode specified
-    if not any([args.train, args.evaluate, args.compare, args.demo, args.graph]):
+    if not any([args.train, args.evaluate, args.compare, args.convert, args.split,
+                args.demo, args.graph]):
         args.demo = True
     
     # Run selected mode
@@ -315,6 +534,10 @@ Examples:
         evaluate(args)
     elif args.compare:
         compare(args)
+    elif args.convert:
+        convert(args)
+    elif args.split:
+        split(args)
 
 
 if __name__ == '__main__':
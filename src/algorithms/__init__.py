@@ -1,3 +1,7 @@
 # Algorithms Module
 from .ftrl import FTRLProximal
 from .online_logistic import OnlineLogisticRegression
+from .model_io import read_header, read_model, write_model
+from .admission import AdmissionPolicy, CountingBloomAdmission, ProbabilisticAdmission
+from .eviction import CoordinateEvictor
+from .serving import FrozenModel, QuantizedModel
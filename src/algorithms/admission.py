@@ -0,0 +1,209 @@
+"""
+Feature Admission Policies for FTRL-Proximal
+
+Decide whether a coordinate that has no state yet may allocate z/n.
+
+Reference:
+    McMahan et al., "Ad Click Prediction: a View from the Trenches" (2013),
+    Section 5.2 "Probabilistic Feature Inclusion"
+"""
+import random
+from typing import Dict, Optional
+import numpy as np
+
+
+class AdmissionPolicy:
+    """
+    Base policy: every new coordinate is admitted.
+    
+    Subclasses override _admit / _admit_batch. The model only asks about
+    coordinates that do not have state yet, so existing coordinates are
+    never affected.
+    """
+    
+    def __init__(self):
+        self.num_checked = 0
+        self.num_rejected = 0
+    
+    def admit(self, i: int) -> bool:
+        """
+        Decide whether a new coordinate may allocate state.
+        
+        Args:
+            i: Feature index seen without state
+        
+        Returns:
+            True if the coordinate should be created now
+        """
+        self.num_checked += 1
+        admitted = self._admit(i)
+        if not admitted:
+            self.num_rejected += 1
+        return admitted
+    
+    def admit_batch(self, idx: np.ndarray, occurrences: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Vectorized admit() over an array of new coordinates.
+        
+        A coordinate seen k times in a mini-batch gets the decision k
+        admit() calls in a row would reach (admitted if any of them is).
+        
+        Args:
+            idx: Array of feature indices without state
+            occurrences: Times each coordinate was seen (default: once each)
+        
+        Returns:
+            Boolean array, True where the coordinate is admitted
+        """
+        idx = np.asarray(idx, dtype=np.int64)
+        if occurrences is None:
+            occurrences = np.ones(len(idx), dtype=np.int64)
+        admitted = self._admit_batch(idx, np.asarray(occurrences, dtype=np.int64))
+        self.num_checked += len(idx)
+        self.num_rejected += int(len(idx) - np.count_nonzero(admitted))
+        return admitted
+    
+    def _admit(self, i: int) -> bool:
+        return True
+    
+    def _admit_batch(self, idx: np.ndarray, occurrences: np.ndarray) -> np.ndarray:
+        return np.ones(len(idx), dtype=bool)
+    
+    def memory_usage(self) -> int:
+        """Bytes used by the policy itself."""
+        return 0
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Admission statistics.
+        
+        Returns:
+            Dictionary with checked/rejected occurrence counts, the
+            rejection rate and the policy's own memory in bytes
+        """
+        return {
+            'checked': self.num_checked,
+            'rejected': self.num_rejected,
+            'rejection_rate': self.num_rejected / self.num_checked if self.num_checked else 0.0,
+            'policy_bytes': self.memory_usage()
+        }
+
+
+class CountingBloomAdmission(AdmissionPolicy):
+    """
+    Admit a coordinate once it has been seen min_count times.
+    
+    Occurrences of not-yet-admitted coordinates are counted in a counting
+    Bloom filter: num_hashes 8-bit saturating counters per coordinate,
+    spread over a fixed table. The estimated count is the minimum of the
+    counters (conservative update: only the minimal counters are
+    incremented), so it may overestimate because of collisions but never
+    underestimates. One-off IDs therefore never allocate z/n state, at
+    the price of a small fixed table.
+    
+    Example:
+        model = FTRLProximal(admission=CountingBloomAdmission(min_count=3))
+    """
+    
+    # Odd 64-bit multipliers, one per hash function
+    _MULTIPLIERS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9,
+                    0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53)
+    _MASK64 = (1 << 64) - 1
+    
+    def __init__(self, min_count: int = 2, num_counters: int = 2**22, num_hashes: int = 3):
+        """
+        Initialize the filter.
+        
+        Args:
+            min_count: Occurrences required before a coordinate is admitted
+            num_counters: Counter table size (rounded up to a power of 2)
+            num_hashes: Counters per coordinate (at most 6)
+        """
+        super().__init__()
+        if not 1 <= num_hashes <= len(self._MULTIPLIERS):
+            raise ValueError(f"num_hashes must be in [1, {len(self._MULTIPLIERS)}]")
+        if not 1 <= min_count <= 255:
+            raise ValueError("min_count must be in [1, 255]")
+        
+        bits = max(1, (num_counters - 1).bit_length())
+        self.min_count = min_count
+        self.num_hashes = num_hashes
+        self.num_counters = 1 << bits
+        self._shift = 64 - bits
+        self._multipliers = self._MULTIPLIERS[:num_hashes]
+        
+        # bytearray for fast scalar access, NumPy view for batches
+        self._table = bytearray(self.num_counters)
+        self._counters = np.frombuffer(self._table, dtype=np.uint8)
+    
+    def _positions(self, i: int):
+        key = i + 1
+        return [((key * m) & self._MASK64) >> self._shift for m in self._multipliers]
+    
+    def _admit(self, i: int) -> bool:
+        table = self._table
+        positions = self._positions(i)
+        count = min(table[p] for p in positions) + 1
+        if count >= self.min_count:
+            return True
+        for p in positions:
+            if table[p] < count:
+                table[p] = count
+        return False
+    
+    def _admit_batch(self, idx: np.ndarray, occurrences: np.ndarray) -> np.ndarray:
+        # Occurrences of the same coordinate inside the batch add up
+        uniq, inverse = np.unique(idx, return_inverse=True)
+        occurrences = np.bincount(inverse, weights=occurrences, minlength=len(uniq)).astype(np.int64)
+        keys = uniq.astype(np.uint64) + np.uint64(1)
+        positions = np.stack([(keys * np.uint64(m)) >> np.uint64(self._shift)
+                              for m in self._multipliers]).astype(np.int64)
+        
+        counts = self._counters[positions].min(axis=0).astype(np.int64) + occurrences
+        admitted = counts >= self.min_count
+        
+        # Conservative update, as the occurrences before admission would
+        # leave it: rejected coordinates reach their count, admitted ones
+        # min_count - 1 (both stay below min_count <= 255)
+        new_counts = np.minimum(counts, self.min_count - 1).astype(np.uint8)
+        for row in positions:
+            np.maximum.at(self._counters, row, new_counts)
+        return admitted[inverse]
+    
+    def memory_usage(self) -> int:
+        return self.num_counters
+
+
+class ProbabilisticAdmission(AdmissionPolicy):
+    """
+    Admit each occurrence of a new coordinate with probability p.
+    
+    A coordinate seen k times is admitted with probability 1 - (1-p)^k, so
+    rare IDs mostly never allocate state while frequent ones enter quickly.
+    Needs no memory of its own.
+    
+    Example:
+        model = FTRLProximal(admission=ProbabilisticAdmission(p=0.1, seed=42))
+    """
+    
+    def __init__(self, p: float = 0.1, seed: int = 0):
+        """
+        Initialize the policy.
+        
+        Args:
+            p: Admission probability per occurrence
+            seed: Random seed for reproducibility
+        """
+        super().__init__()
+        if not 0.0 < p <= 1.0:
+            raise ValueError("p must be in (0, 1]")
+        self.p = p
+        self._random = random.Random(seed)
+        self._rng = np.random.default_rng(seed)
+    
+    def _admit(self, i: int) -> bool:
+        return self._random.random() < self.p
+    
+    def _admit_batch(self, idx: np.ndarray, occurrences: np.ndarray) -> np.ndarray:
+        # k occurrences: admitted unless all k draws fail
+        return self._rng.random(len(idx)) < 1.0 - (1.0 - self.p) ** occurrences
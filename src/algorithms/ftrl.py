@@ -7,10 +7,16 @@ Reference:
     McMahan et al., "Ad Click Prediction: a View from the Trenches" (2013)
     https://research.google/pubs/pub41159/
 """
+import sys
 import math
 from typing import Dict, Optional, Tuple
 import numpy as np
 
+from src.algorithms.model_io import write_model, read_model, read_header, lookup_sorted
+from src.algorithms.admission import AdmissionPolicy
+from src.algorithms.eviction import CoordinateEvictor
+from src.algorithms.serving import FrozenModel
+
 
 class FTRLProximal:
     """
@@ -47,6 +53,30 @@ class FTRLProximal:
         L1 (λ1): L1 regularization - creates sparsity (default: 1.0)
         L2 (λ2): L2 regularization - prevents overfitting (default: 1.0)
     
+    State Backends:
+        'dict':  z/n stored in Python dicts keyed by feature index. Only
+                 coordinates that have been seen take memory.
+        'dense': z/n/w stored in preallocated contiguous NumPy arrays of
+                 length num_features. Indices produced by FeatureHasher are
+                 bounded by num_buckets, so the arrays can be sized once and
+                 updates become vectorized array reads/writes.
+        'mmap':  read-only; set by load(filepath, mmap=True). z/n/w are
+                 memory-mapped arrays aligned with a sorted index array and
+                 weights are found by binary search. Scoring only.
+    
+    Learning-Rate State (lr_state):
+        'exact':  n_i is the float sum of squared gradients.
+        'counts': n_i is approximated from the number of positive (P_i)
+                  and negative (N_i) examples in which feature i was
+                  non-zero (paper, Section 4.5):
+                      n_i ≈ P_i * N_i / (P_i + N_i)
+                  P/N are small unsigned integers (count_dtype), so the
+                  learning-rate state takes half the bytes of a float n
+                  (uint16 vs float64, uint8 vs float32). Once a counter of
+                  a coordinate would overflow, both counts (and n) stay
+                  fixed. The approximation assumes binary features.
+                  'dense' backend only.
+    
     Example:
         model = FTRLProximal(alpha=0.1, beta=1.0, L1=1.0, L2=1.0)
         
@@ -58,12 +88,24 @@ class FTRLProximal:
             model.update(features, label)
     """
     
+    BACKENDS = ('dict', 'dense')
+    LR_STATES = ('exact', 'counts')
+    
+    # Boxed int key + boxed float value of one dict entry (CPython, 64-bit)
+    _BOXED_ENTRY_BYTES = 28 + 24
+    
     def __init__(self,
                  alpha: float = 0.1,
                  beta: float = 1.0,
                  L1: float = 1.0,
                  L2: float = 1.0,
-                 num_features: Optional[int] = None):
+                 num_features: Optional[int] = None,
+                 backend: str = 'dict',
+                 dtype: str = 'float64',
+                 admission: Optional[AdmissionPolicy] = None,
+                 eviction: Optional[CoordinateEvictor] = None,
+                 lr_state: str = 'exact',
+                 count_dtype: str = 'uint16'):
         """
         Initialize FTRL-Proximal model.
         
@@ -73,23 +115,76 @@ class FTRLProximal:
             L1: L1 regularization strength (higher = sparser model)
             L2: L2 regularization strength (higher = smaller weights)
             num_features: Optional fixed feature dimension
+                (required for the 'dense' backend, usually num_buckets)
+            backend: State storage backend, 'dict' or 'dense'
+            dtype: Float type of the dense arrays, 'float32' or 'float64'
+            admission: Optional AdmissionPolicy deciding whether a coordinate
+                without state may allocate z/n (see admission.py). Rejected
+                occurrences are skipped, as if the feature had weight 0 and
+                no gradient. The policy is not saved with the model.
+            eviction: Optional CoordinateEvictor that drops coordinates
+                incrementally after each update (memory budget, TTL, zero
+                weights; see eviction.py). Not saved with the model.
+            lr_state: 'exact' (float n) or 'counts' (n approximated from
+                positive/negative counts; 'dense' backend only)
+            count_dtype: Unsigned integer type of the counts, e.g. 'uint8',
+                'uint16' or 'uint32'
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {self.BACKENDS}")
+        if backend == 'dense' and not num_features:
+            raise ValueError("The 'dense' backend requires num_features")
+        if lr_state not in self.LR_STATES:
+            raise ValueError(f"Unknown lr_state '{lr_state}', expected one of {self.LR_STATES}")
+        if lr_state == 'counts' and backend == 'dict':
+            raise ValueError("lr_state='counts' requires the 'dense' backend")
+        if np.dtype(count_dtype).kind != 'u':
+            raise ValueError("count_dtype must be an unsigned integer type")
+        
         self.alpha = alpha
         self.beta = beta
         self.L1 = L1
         self.L2 = L2
         self.num_features = num_features
+        self.backend = backend
+        self.dtype = np.dtype(dtype)
+        self.admission = admission
+        self.eviction = eviction
+        self.lr_state = lr_state
+        self.count_dtype = np.dtype(count_dtype)
         
-        # FTRL state variables (only store non-zero values)
-        self.z: Dict[int, float] = {}  # sum of gradients adjusted
-        self.n: Dict[int, float] = {}  # sum of squared gradients
-        
-        # Current weights (computed lazily)
-        self._w: Dict[int, float] = {}
+        if backend == 'dense':
+            # Preallocated contiguous state, indexed directly by bucket
+            self.z = np.zeros(num_features, dtype=self.dtype)
+            self._w = np.zeros(num_features, dtype=self.dtype)
+            if lr_state == 'counts':
+                # Positive / negative example counts replace n
+                self.n = None
+                self.pos = np.zeros(num_features, dtype=self.count_dtype)
+                self.neg = np.zeros(num_features, dtype=self.count_dtype)
+            else:
+                self.n = np.zeros(num_features, dtype=self.dtype)
+        else:
+            # FTRL state variables (only store non-zero values)
+            self.z: Dict[int, float] = {}  # sum of gradients adjusted
+            self.n: Dict[int, float] = {}  # sum of squared gradients
+            
+            # Current non-zero weights, refreshed for every coordinate an
+            # update touches (w_i only changes when z_i or n_i change)
+            self._w: Dict[int, float] = {}
         
         # Statistics
         self.num_updates = 0
         
+        # Running model-size counters, kept current by every update so that
+        # sparsity() does not need to rescan the model
+        self._num_total = 0     # coordinates with state
+        self._num_nonzero = 0   # coordinates with |z| > L1 (non-zero weight)
+        
+        # Coordinates changed since the last checkpoint (None = not tracking).
+        # A set for the 'dict' backend, a boolean mask for 'dense'.
+        self._dirty = None
+        
     def _compute_weight(self, i: int) -> float:
         """
         Compute weight for coordinate i using FTRL closed-form solution.
@@ -120,6 +215,70 @@ class FTRLProximal:
         
         return w_i
     
+    def _compute_weights(self, z: np.ndarray, n: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of _compute_weight over arrays of z and n.
+        
+        Args:
+            z: Array of z values
+            n: Array of n values (same shape as z)
+            
+        Returns:
+            Array of weights (0 where |z| <= L1)
+        """
+        denominator = (self.beta + np.sqrt(n)) / self.alpha + self.L2
+        w = -(z - np.where(z >= 0, self.L1, -self.L1)) / denominator
+        w[np.abs(z) <= self.L1] = 0.0
+        return w
+    
+    @staticmethod
+    def _to_arrays(features: Dict[int, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert a sparse feature dict to (indices, values) arrays."""
+        count = len(features)
+        idx = np.fromiter(features.keys(), dtype=np.int64, count=count)
+        x = np.fromiter(features.values(), dtype=np.float64, count=count)
+        return idx, x
+    
+    def _lr_arrays(self) -> Dict[str, np.ndarray]:
+        """Learning-rate state arrays of an array backend, by saved name."""
+        if self.lr_state == 'counts':
+            return {'pos': self.pos, 'neg': self.neg}
+        return {'n': self.n}
+    
+    @staticmethod
+    def _approx_n(pos: np.ndarray, neg: np.ndarray) -> np.ndarray:
+        """n ≈ P * N / (P + N) from positive/negative counts (0 if unseen)."""
+        pos = pos.astype(np.float64)
+        neg = neg.astype(np.float64)
+        total = pos + neg
+        return np.divide(pos * neg, total, out=np.zeros_like(total), where=total > 0)
+    
+    def _add_counts(self,
+                    pos: np.ndarray,
+                    neg: np.ndarray,
+                    pos_inc: np.ndarray,
+                    neg_inc: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Add example counts; both counts freeze once either would overflow."""
+        limit = np.iinfo(self.count_dtype).max
+        pos_new = pos.astype(np.int64) + pos_inc
+        neg_new = neg.astype(np.int64) + neg_inc
+        full = (np.maximum(pos_new, neg_new) > limit) | (np.maximum(pos, neg) == limit)
+        pos_new[full] = pos[full]
+        neg_new[full] = neg[full]
+        return pos_new.astype(self.count_dtype), neg_new.astype(self.count_dtype)
+    
+    def _n_dense(self, idx=slice(None)) -> np.ndarray:
+        """n of an array backend as float64 (approximated in 'counts' mode)."""
+        if self.lr_state == 'counts':
+            return self._approx_n(self.pos[idx], self.neg[idx])
+        return self.n[idx].astype(np.float64)
+    
+    def _has_state(self, idx=slice(None)) -> np.ndarray:
+        """Whether coordinates of an array backend have state."""
+        if self.lr_state == 'counts':
+            return (self.pos[idx] != 0) | (self.neg[idx] != 0)
+        return self.n[idx] != 0
+    
     def get_weights(self) -> Dict[int, float]:
         """
         Get current model weights.
@@ -127,12 +286,35 @@ class FTRLProximal:
         Returns:
             Dictionary of {feature_index: weight} for non-zero weights
         """
-        weights = {}
-        for i in set(self.z.keys()) | set(self.n.keys()):
+        if self.backend == 'dense':
+            nonzero = np.flatnonzero(self._w)
+            return dict(zip(nonzero.tolist(), self._w[nonzero].tolist()))
+        if self.backend == 'mmap':
+            nonzero = np.flatnonzero(self._w)
+            return dict(zip(self._index[nonzero].tolist(), self._w[nonzero].tolist()))
+        
+        return dict(self._w)
+    
+    def _rebuild_weight_cache(self):
+        """Recompute the stored weights from z and n (e.g. after load)."""
+        if self.backend == 'dense':
+            self._w = self._compute_weights(self.z, self._n_dense()).astype(self.dtype)
+            return
+        
+        self._w = {}
+        for i in self.z:
             w = self._compute_weight(i)
             if w != 0.0:
-                weights[i] = w
-        return weights
+                self._w[i] = w
+    
+    def _recount(self):
+        """Recompute the model-size counters with a full scan (e.g. after load)."""
+        if self.backend == 'dense':
+            self._num_total = int(np.count_nonzero(self._has_state()))
+            self._num_nonzero = int(np.count_nonzero(self._w))
+        else:
+            self._num_total = len(self.z)
+            self._num_nonzero = len(self._w)
     
     def predict_raw(self, features: Dict[int, float]) -> float:
         """
@@ -144,11 +326,15 @@ class FTRLProximal:
         Returns:
             Raw score (before sigmoid)
         """
+        if self.backend != 'dict':
+            idx, x = self._to_arrays(features)
+            return float(self._gather_weights(idx) @ x)
+        
+        # Weights are kept current by update(), so this is lookup + dot product
+        w_get = self._w.get
         score = 0.0
         for i, x_i in features.items():
-            w_i = self._compute_weight(i)
-            if w_i != 0.0:
-                score += w_i * x_i
+            score += w_get(i, 0.0) * x_i
         return score
     
     def predict(self, features: Dict[int, float]) -> float:
@@ -198,44 +384,425 @@ class FTRLProximal:
         Returns:
             Prediction made before update (for computing loss)
         """
-        # Predict with current weights
-        p = self.predict(features)
+        self._check_writable()
+        if self.backend == 'dense':
+            return self._update_dense(features, label)
+        
+        alpha, beta, L1, L2 = self.alpha, self.beta, self.L1, self.L2
+        z, n, w_cache = self.z, self.n, self._w
+        admission, dirty = self.admission, self._dirty
+        
+        # Single pass over the cached weights: keep them for the z update
+        active = [(i, x_i, w_cache.get(i, 0.0)) for i, x_i in features.items()]
+        score = 0.0
+        for _, x_i, w_i in active:
+            score += w_i * x_i
+        p = self._sigmoid(score)
         
         # Compute gradient: g = (p - y) for logistic loss
         g = p - label
         
         # Update each active feature
-        for i, x_i in features.items():
+        for i, x_i, w_i in active:
             g_i = g * x_i  # Gradient for feature i
             
-            # Get current n_i
-            n_i_old = self.n.get(i, 0.0)
+            # Update n_i (sum of squared gradients)
+            n_i_old = n.get(i)
+            if n_i_old is None:
+                # New coordinate: the admission policy may refuse to create it
+                if admission is not None and not admission.admit(i):
+                    continue
+                if g_i == 0.0:
+                    # Nothing learned yet: all-zero state is no state
+                    # (as in the dense backend, where n == 0 means unseen)
+                    continue
+                n_i_old = 0.0
+                self._num_total += 1
+            if dirty is not None:
+                # Changed since the last checkpoint (rejected or skipped
+                # coordinates are not: they still have no state)
+                dirty.add(i)
             n_i_new = n_i_old + g_i * g_i
+            n[i] = n_i_new
             
             # Compute σ_i (learning rate schedule)
-            sigma_i = (math.sqrt(n_i_new) - math.sqrt(n_i_old)) / self.alpha
+            sqrt_n_new = math.sqrt(n_i_new)
+            sigma_i = (sqrt_n_new - math.sqrt(n_i_old)) / alpha
             
-            # Update z_i
-            w_i = self._compute_weight(i)
-            z_i_old = self.z.get(i, 0.0)
-            self.z[i] = z_i_old + g_i - sigma_i * w_i
+            # Update z_i with the weight used for the prediction
+            z_i = z.get(i, 0.0) + g_i - sigma_i * w_i
+            z[i] = z_i
             
-            # Update n_i
-            self.n[i] = n_i_new
+            # Refresh the cached weight (closed form, see _compute_weight)
+            # and track weights crossing the L1 threshold
+            if abs(z_i) <= L1:
+                if w_i != 0.0:
+                    del w_cache[i]
+                    self._num_nonzero -= 1
+            else:
+                if w_i == 0.0:
+                    self._num_nonzero += 1
+                sign_z = 1.0 if z_i >= 0 else -1.0
+                w_cache[i] = -(z_i - sign_z * L1) / ((beta + sqrt_n_new) / alpha + L2)
+        
+        if self.eviction is not None:
+            # Rejected coordinates have no state and are not tracked
+            self.eviction.touch([i for i in features if i in n], self.num_updates)
         
         self.num_updates += 1
+        if self.eviction is not None:
+            self.eviction.step(self)
+        return p
+    
+    def _check_writable(self):
+        """Raise if the model state is a read-only memory map."""
+        if self.backend == 'mmap':
+            raise RuntimeError("Model was loaded with mmap=True and is read-only; "
+                               "load it without mmap to continue training")
+    
+    def _update_dense(self, features: Dict[int, float], label: int) -> float:
+        """
+        Vectorized update for the 'dense' backend.
+        
+        Same arithmetic as update(), applied to all active coordinates at
+        once. The stored weights are refreshed for the touched coordinates
+        so that predict() is a plain gather + dot product.
+        """
+        idx, x = self._to_arrays(features)
+        w = self._w[idx].astype(np.float64)
+        p = self._sigmoid(float(w @ x))
+        
+        counts = None
+        if self.lr_state == 'counts':
+            seen = (x != 0).astype(np.int64)
+            counts = (seen * int(label), seen * (1 - int(label)))
+        
+        self._apply_gradients(idx, (p - label) * x, w, counts)
+        
+        self.num_updates += 1
+        if self.eviction is not None:
+            self.eviction.step(self)
+        return p
+    
+    def _gather(self, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read z and n for an array of unique coordinates.
+        
+        Args:
+            idx: Array of feature indices
+            
+        Returns:
+            Tuple of float64 arrays (z, n), 0 for unseen coordinates
+        """
+        if self.backend == 'dense':
+            return self.z[idx].astype(np.float64), self._n_dense(idx)
+        
+        keys = idx.tolist()
+        z_get, n_get = self.z.get, self.n.get
+        z = np.array([z_get(i, 0.0) for i in keys], dtype=np.float64)
+        n = np.array([n_get(i, 0.0) for i in keys], dtype=np.float64)
+        return z, n
+    
+    def _gather_weights(self, idx: np.ndarray) -> np.ndarray:
+        """Current weights for an array of unique coordinates."""
+        if self.backend == 'dense':
+            return self._w[idx].astype(np.float64)
+        if self.backend == 'mmap':
+            return lookup_sorted(self._index, self._w, idx)
+        w_get = self._w.get
+        return np.array([w_get(i, 0.0) for i in idx.tolist()], dtype=np.float64)
+    
+    def _scatter(self, idx: np.ndarray, z: np.ndarray, n, w: np.ndarray):
+        """
+        Write back z, n and the refreshed weights for unique coordinates.
+        
+        In 'counts' mode n is the (pos, neg) tuple of updated counts.
+        """
+        if self.backend == 'dense':
+            self.z[idx] = z
+            if self.lr_state == 'counts':
+                self.pos[idx], self.neg[idx] = n
+            else:
+                self.n[idx] = n
+            self._w[idx] = w
+            return
+        
+        keys = idx.tolist()
+        self.z.update(zip(keys, z.tolist()))
+        self.n.update(zip(keys, n.tolist()))
+        
+        w_cache = self._w
+        for i, w_i in zip(keys, w.tolist()):
+            if w_i != 0.0:
+                w_cache[i] = w_i
+            else:
+                w_cache.pop(i, None)
+    
+    def _apply_gradients(self,
+                         idx: np.ndarray,
+                         g: np.ndarray,
+                         w: np.ndarray,
+                         counts: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                         occurrences: Optional[np.ndarray] = None):
+        """
+        FTRL z/n step for unique coordinates with (aggregated) gradients.
+        
+        Args:
+            idx: Array of unique feature indices
+            g: Gradient for each coordinate
+            w: Weight of each coordinate used to compute g
+            counts: ('counts' mode) positive and negative examples in which
+                each coordinate was non-zero
+            occurrences: Entries aggregated into each coordinate, passed to
+                the admission policy (default: one each)
+        """
+        z_old, n_old = self._gather(idx)
+        if self.lr_state == 'counts':
+            pos_old, neg_old = self.pos[idx], self.neg[idx]
+            new = (pos_old == 0) & (neg_old == 0)
+        else:
+            new = n_old == 0
+        
+        # New coordinates (no state yet) must pass the admission policy
+        if self.admission is not None and new.any():
+            keep = ~new
+            keep[new] = self.admission.admit_batch(
+                idx[new], None if occurrences is None else occurrences[new])
+            idx, g, w, z_old, n_old, new = idx[keep], g[keep], w[keep], z_old[keep], n_old[keep], new[keep]
+            if self.lr_state == 'counts':
+                pos_old, neg_old = pos_old[keep], neg_old[keep]
+                counts = (counts[0][keep], counts[1][keep])
+        
+        if self.lr_state == 'counts':
+            pos_new, neg_new = self._add_counts(pos_old, neg_old, *counts)
+            n_new = self._approx_n(pos_new, neg_new)
+            stored = (pos_new, neg_new)
+            created = new & ((pos_new > 0) | (neg_new > 0))
+        else:
+            n_new = n_old + g * g
+            stored = n_new
+            created = new & (n_new > 0)
+        
+        # A new coordinate the step leaves without learning-rate state (zero
+        # gradient) is not created: array backends could not tell it apart
+        # from an unseen one
+        empty = new & ~created
+        if empty.any():
+            keep = ~empty
+            idx, g, w, z_old, n_old, n_new, created = (
+                idx[keep], g[keep], w[keep], z_old[keep], n_old[keep], n_new[keep], created[keep])
+            stored = tuple(part[keep] for part in stored) if self.lr_state == 'counts' else n_new
+        
+        sigma = (np.sqrt(n_new) - np.sqrt(n_old)) / self.alpha
+        z_new = z_old + g - sigma * w
+        w_new = self._compute_weights(z_new, n_new)
+        
+        num_before = len(self.z)
+        self._scatter(idx, z_new, stored, w_new)
+        self._mark_dirty(idx)
+        if self.eviction is not None:
+            self.eviction.touch(idx.tolist(), self.num_updates)
+        
+        # Model-size counters: new coordinates and L1 threshold crossings
+        if self.backend == 'dense':
+            self._num_total += int(np.count_nonzero(created))
+        else:
+            self._num_total += len(self.z) - num_before
+        self._num_nonzero += int(np.count_nonzero(w_new)) - int(np.count_nonzero(w))
+    
+    def _mark_dirty(self, idx: np.ndarray):
+        """Record coordinates changed since the last checkpoint."""
+        if self._dirty is None:
+            return
+        if self.backend == 'dense':
+            self._dirty[idx] = True
+        else:
+            self._dirty.update(idx.tolist())
+    
+    def weight_of(self, i: int) -> float:
+        """Current weight of coordinate i (0 if it has no state)."""
+        if self.backend == 'dict':
+            return self._w.get(i, 0.0)
+        return float(self._gather_weights(np.array([i], dtype=np.int64))[0])
+    
+    def evict(self, i: int) -> bool:
+        """
+        Drop all state of coordinate i, as if it had never been seen.
+        
+        Used by CoordinateEvictor. The coordinate is marked as changed, so
+        the next delta checkpoint records it as removed (z = n = 0).
+        
+        Args:
+            i: Feature index
+            
+        Returns:
+            True if the coordinate had state
+        """
+        self._check_writable()
+        if self.backend == 'dense':
+            if not self._has_state(i):
+                return False
+            if self._w[i] != 0:
+                self._num_nonzero -= 1
+            self.z[i] = self._w[i] = 0
+            for state in self._lr_arrays().values():
+                state[i] = 0
+        else:
+            if self.n.pop(i, None) is None:
+                return False
+            self.z.pop(i, None)
+            if self._w.pop(i, None) is not None:
+                self._num_nonzero -= 1
+        
+        self._num_total -= 1
+        if self._dirty is not None:
+            self._mark_dirty(np.array([i], dtype=np.int64))
+        return True
+    
+    @staticmethod
+    def _sigmoid_array(x: np.ndarray) -> np.ndarray:
+        """Numerically stable element-wise sigmoid (same branches as _sigmoid)."""
+        exp_neg = np.exp(-np.abs(x))
+        return np.where(x >= 0, 1.0 / (1.0 + exp_neg), exp_neg / (1.0 + exp_neg))
+    
+    @staticmethod
+    def _row_ids(indptr: np.ndarray) -> np.ndarray:
+        """Row number of every non-zero entry of a CSR batch."""
+        return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    
+    def _batch_scores(self,
+                      indices: np.ndarray,
+                      values: np.ndarray,
+                      indptr: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Raw scores of a CSR batch.
+        
+        Weights are looked up once per distinct coordinate, so a coordinate
+        shared by many rows (e.g. the bias) costs a single lookup.
+        
+        Returns:
+            Tuple of (scores, unique_indices, inverse, unique_weights)
+        """
+        uniq, inverse = np.unique(indices, return_inverse=True)
+        w = self._gather_weights(uniq)
+        num_rows = len(indptr) - 1
+        scores = np.bincount(self._row_ids(indptr),
+                             weights=w[inverse] * values,
+                             minlength=num_rows)
+        return scores, uniq, inverse, w
+    
+    def predict_batch(self,
+                      indices: np.ndarray,
+                      values: np.ndarray,
+                      indptr: np.ndarray) -> np.ndarray:
+        """
+        Predict click probabilities for a CSR batch.
+        
+        Row r uses entries indices[indptr[r]:indptr[r+1]] and the matching
+        values (see Preprocessor.transform_batch).
+        
+        Args:
+            indices: Feature index of every non-zero entry
+            values: Feature value of every non-zero entry
+            indptr: Row pointers, length num_rows + 1
+            
+        Returns:
+            Array of probabilities, one per row
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        indptr = np.asarray(indptr, dtype=np.int64)
+        scores = self._batch_scores(indices, values, indptr)[0]
+        return self._sigmoid_array(scores)
+    
+    def update_batch(self,
+                     indices: np.ndarray,
+                     values: np.ndarray,
+                     indptr: np.ndarray,
+                     labels: np.ndarray) -> np.ndarray:
+        """
+        Mini-batch update from a CSR batch.
+        
+        All rows are scored with the current weights, then the per-entry
+        gradients (p_r - y_r) * x_ri are summed per coordinate (so duplicate
+        coordinates across or within rows are aggregated) and a single
+        FTRL z/n step is applied to every touched coordinate. With one row
+        this is exactly update().
+        
+        Args:
+            indices: Feature index of every non-zero entry
+            values: Feature value of every non-zero entry
+            indptr: Row pointers, length num_rows + 1
+            labels: True labels (0 or 1), one per row
+            
+        Returns:
+            Predictions made before the update, one per row
+        """
+        self._check_writable()
+        indices = np.asarray(indices, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        indptr = np.asarray(indptr, dtype=np.int64)
+        labels = np.asarray(labels, dtype=np.float64)
+        
+        scores, uniq, inverse, w = self._batch_scores(indices, values, indptr)
+        p = self._sigmoid_array(scores)
+        
+        # Per-entry gradients, aggregated per distinct coordinate
+        row_ids = self._row_ids(indptr)
+        g_entries = (p - labels)[row_ids] * values
+        g = np.bincount(inverse, weights=g_entries, minlength=len(uniq))
+        
+        # Positive / negative examples per distinct coordinate
+        counts = None
+        if self.lr_state == 'counts':
+            seen = values != 0
+            positive = labels[row_ids] > 0
+            counts = tuple(np.bincount(inverse, weights=seen & label_mask,
+                                       minlength=len(uniq)).astype(np.int64)
+                           for label_mask in (positive, ~positive))
+        
+        # A coordinate in k rows counts as k occurrences for admission
+        self._apply_gradients(uniq, g, w, counts,
+                              occurrences=np.bincount(inverse, minlength=len(uniq)))
+        
+        self.num_updates += len(labels)
+        if self.eviction is not None:
+            self.eviction.step(self, num_updates=len(labels))
         return p
     
+    def memory_usage(self) -> int:
+        """
+        Approximate bytes held by the model state (z, n and weights).
+        
+        For the 'dict' backend this counts the hash tables plus one boxed
+        int key and float value per entry; for array backends the array sizes.
+        
+        Returns:
+            Size in bytes
+        """
+        if self.backend != 'dict':
+            total = self.z.nbytes + self._w.nbytes
+            total += sum(state.nbytes for state in self._lr_arrays().values())
+            if self.backend == 'mmap':
+                total += self._index.nbytes
+            return total
+        
+        total = 0
+        for state in (self.z, self.n, self._w):
+            total += sys.getsizeof(state) + len(state) * self._BOXED_ENTRY_BYTES
+        return total
+    
     def sparsity(self) -> Tuple[int, int, float]:
         """
         Compute model sparsity.
         
+        O(1): reads the counters maintained by update()/update_batch().
+        
         Returns:
             Tuple of (num_nonzero, num_total, sparsity_ratio)
         """
-        weights = self.get_weights()
-        num_nonzero = len(weights)
-        num_total = len(self.z)
+        num_nonzero = self._num_nonzero
+        num_total = self._num_total
         
         if num_total == 0:
             return 0, 0, 1.0
@@ -243,23 +810,239 @@ class FTRLProximal:
         sparsity = 1.0 - num_nonzero / num_total
         return num_nonzero, num_total, sparsity
     
+    def freeze(self, layout: str = 'sorted', dtype: Optional[str] = None) -> FrozenModel:
+        """
+        Export a scoring-only snapshot holding just the nonzero weights.
+        
+        The snapshot does not change when this model keeps training.
+        Call .quantize(bits, scale) on it for fixed-point weights.
+        
+        Args:
+            layout: 'sorted' (index + weight arrays) or 'dense' (one weight
+                per feature, requires num_features)
+            dtype: Float type of the snapshot weights (default: model dtype)
+            
+        Returns:
+            FrozenModel (see serving.py)
+        """
+        if self.backend == 'dict':
+            idx, w = self._to_arrays(self._w)
+        else:
+            nonzero = np.flatnonzero(self._w)
+            idx = nonzero if self.backend == 'dense' else self._index[nonzero]
+            w = self._w[nonzero]
+        return FrozenModel(idx, w, layout=layout, num_features=self.num_features,
+                           dtype=dtype or self.dtype.name)
+    
+    def _state_arrays(self, idx: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        State of stored coordinates as arrays sorted by feature index.
+        
+        Args:
+            idx: Sorted coordinates to export (default: every stored one).
+                Coordinates without state are exported with z = n = w = 0.
+        
+        Returns:
+            Dict with 'indices', 'z', 'n' and 'w' arrays of equal length
+        """
+        if self.backend == 'mmap':
+            if idx is not None:
+                raise RuntimeError("Cannot export a subset of a read-only model")
+            return {'indices': self._index, 'z': self.z, **self._lr_arrays(), 'w': self._w}
+        
+        if self.backend == 'dense':
+            if idx is None:
+                idx = np.flatnonzero(self._has_state())
+            lr_arrays = {name: state[idx] for name, state in self._lr_arrays().items()}
+            return {'indices': idx, 'z': self.z[idx], **lr_arrays, 'w': self._w[idx]}
+        
+        keys = sorted(self.z) if idx is None else idx.tolist()
+        z_get, n_get, w_get = self.z.get, self.n.get, self._w.get
+        return {
+            'indices': np.array(keys, dtype=np.int64),
+            'z': np.array([z_get(i, 0.0) for i in keys], dtype=self.dtype),
+            'n': np.array([n_get(i, 0.0) for i in keys], dtype=self.dtype),
+            'w': np.array([w_get(i, 0.0) for i in keys], dtype=self.dtype),
+        }
+    
+    def _header(self, kind: str) -> Dict:
+        """Header fields written by save() and save_delta()."""
+        return {
+            'model': 'FTRLProximal',
+            'kind': kind,
+            'alpha': self.alpha,
+            'beta': self.beta,
+            'L1': self.L1,
+            'L2': self.L2,
+            'num_features': self.num_features,
+            'backend': 'dict' if self.backend == 'mmap' else self.backend,
+            'dtype': self.dtype.name,
+            'lr_state': self.lr_state,
+            'count_dtype': self.count_dtype.name,
+            'num_updates': self.num_updates,
+            'num_nonzero': self._num_nonzero
+        }
+    
+    def track_changes(self):
+        """
+        Start (or restart) recording which coordinates change.
+        
+        After this call, save_delta() writes only the coordinates touched
+        since the previous track_changes()/save_delta().
+        """
+        self._check_writable()
+        if self.backend == 'dense':
+            self._dirty = np.zeros(self.num_features, dtype=bool)
+        else:
+            self._dirty = set()
+    
+    def num_changed(self) -> int:
+        """Number of coordinates changed since tracking (re)started."""
+        if self._dirty is None:
+            return 0
+        if self.backend == 'dense':
+            return int(np.count_nonzero(self._dirty))
+        return len(self._dirty)
+    
+    def save_delta(self, filepath: str) -> int:
+        """
+        Write only the coordinates changed since the last checkpoint.
+        
+        The file uses the binary model format with kind 'delta'; a removed
+        coordinate is written with z = n = 0. Change tracking restarts
+        afterwards.
+        
+        Args:
+            filepath: Output path
+            
+        Returns:
+            Number of coordinates written
+        """
+        if self._dirty is None:
+            raise RuntimeError("Change tracking is off; call track_changes() after a full save")
+        
+        if self.backend == 'dense':
+            idx = np.flatnonzero(self._dirty)
+        else:
+            idx = np.array(sorted(self._dirty), dtype=np.int64)
+        
+        write_model(filepath, self._header('delta'), self._state_arrays(idx))
+        self.track_changes()
+        return len(idx)
+    
+    def apply_delta(self, filepath: str):
+        """
+        Apply a delta written by save_delta() on top of the current state.
+        
+        Args:
+            filepath: Delta file path
+        """
+        self._check_writable()
+        header, arrays = read_model(filepath)
+        if header.get('kind') != 'delta':
+            raise ValueError(f"{filepath} is not a delta checkpoint")
+        
+        idx, z, w = arrays['indices'], arrays['z'], arrays['w']
+        if self.backend == 'dense':
+            self.z[idx] = z
+            self._w[idx] = w
+            for name, state in self._lr_arrays().items():
+                state[idx] = arrays[name]
+        else:
+            n = arrays['n']
+            removed = (z == 0) & (n == 0)
+            for i in idx[removed].tolist():
+                self.z.pop(i, None)
+                self.n.pop(i, None)
+                self._w.pop(i, None)
+            
+            kept = ~removed
+            keys = idx[kept].tolist()
+            self.z.update(zip(keys, z[kept].tolist()))
+            self.n.update(zip(keys, n[kept].tolist()))
+            for i, w_i in zip(keys, w[kept].tolist()):
+                if w_i != 0.0:
+                    self._w[i] = w_i
+                else:
+                    self._w.pop(i, None)
+        
+        self.num_updates = header['num_updates']
+        self._recount()
+    
     def save(self, filepath: str):
-        """Save model to file."""
-        import pickle
-        with open(filepath, 'wb') as f:
-            pickle.dump({
-                'alpha': self.alpha,
-                'beta': self.beta,
-                'L1': self.L1,
-                'L2': self.L2,
-                'z': self.z,
-                'n': self.n,
-                'num_updates': self.num_updates
-            }, f)
+        """
+        Save model in the binary model format (see model_io).
+        
+        Args:
+            filepath: Output path
+        """
+        write_model(filepath, self._header('full'), self._state_arrays())
     
     @classmethod
-    def load(cls, filepath: str) -> 'FTRLProximal':
-        """Load model from file."""
+    def load(cls, filepath: str, mmap: bool = False) -> 'FTRLProximal':
+        """
+        Load model from file.
+        
+        Args:
+            filepath: Path written by save() (legacy pickles are also accepted)
+            mmap: Memory-map the state instead of reading it. The returned
+                model is read-only (backend 'mmap'): it can predict, but
+                update() raises. Startup cost does not depend on model size.
+            
+        Returns:
+            FTRLProximal instance
+        """
+        header = read_header(filepath)
+        if header is None:
+            return cls._load_pickle(filepath)
+        
+        if header.get('kind') == 'delta':
+            raise ValueError(f"{filepath} is a delta checkpoint; use CheckpointManager.load()")
+        
+        header, arrays = read_model(filepath, mmap=mmap)
+        model = cls(
+            alpha=header['alpha'],
+            beta=header['beta'],
+            L1=header['L1'],
+            L2=header['L2'],
+            num_features=header['num_features'],
+            backend='dict' if mmap else header['backend'],
+            dtype=header['dtype'],
+            lr_state='exact' if mmap else header.get('lr_state', 'exact'),
+            count_dtype=header.get('count_dtype', 'uint16')
+        )
+        model.num_updates = header['num_updates']
+        
+        idx, z, w = arrays['indices'], arrays['z'], arrays['w']
+        if mmap:
+            model.backend = 'mmap'
+            model.lr_state = header.get('lr_state', 'exact')
+            model._index = idx
+            model.z, model._w = z, w
+            model.n = arrays.get('n')
+            if model.lr_state == 'counts':
+                model.pos, model.neg = arrays['pos'], arrays['neg']
+            model._num_total = header['count']
+            model._num_nonzero = header['num_nonzero']
+            return model
+        
+        if model.backend == 'dense':
+            model.z[idx] = z
+            model._w[idx] = w
+            for name, state in model._lr_arrays().items():
+                state[idx] = arrays[name]
+        else:
+            keys = idx.tolist()
+            model.z = dict(zip(keys, z.tolist()))
+            model.n = dict(zip(keys, arrays['n'].tolist()))
+            nonzero = np.flatnonzero(w)
+            model._w = dict(zip(idx[nonzero].tolist(), w[nonzero].tolist()))
+        model._recount()
+        return model
+    
+    @classmethod
+    def _load_pickle(cls, filepath: str) -> 'FTRLProximal':
+        """Load a model saved by the older pickle-based save()."""
         import pickle
         with open(filepath, 'rb') as f:
             data = pickle.load(f)
@@ -268,17 +1051,59 @@ class FTRLProximal:
             alpha=data['alpha'],
             beta=data['beta'],
             L1=data['L1'],
-            L2=data['L2']
+            L2=data['L2'],
+            num_features=data.get('num_features'),
+            backend=data.get('backend', 'dict'),
+            dtype=data.get('dtype', 'float64')
         )
         model.z = data['z']
         model.n = data['n']
+        model._rebuild_weight_cache()
+        model._recount()
         model.num_updates = data['num_updates']
         return model
     
+    @classmethod
+    def from_arrays(cls,
+                    z: np.ndarray,
+                    n: np.ndarray,
+                    w: Optional[np.ndarray] = None,
+                    alpha: float = 0.1,
+                    beta: float = 1.0,
+                    L1: float = 1.0,
+                    L2: float = 1.0) -> 'FTRLProximal':
+        """
+        Build a 'dense' model around existing state arrays (no copy).
+        
+        Used to attach a model to arrays that live elsewhere, e.g. in
+        multiprocessing.shared_memory for Hogwild training.
+        
+        Args:
+            z: z array, length num_features
+            n: n array, same length and dtype as z
+            w: Optional weight array; recomputed from z and n when None
+            alpha, beta, L1, L2: Hyperparameters
+            
+        Returns:
+            FTRLProximal instance whose state *is* the given arrays
+        """
+        model = cls(alpha=alpha, beta=beta, L1=L1, L2=L2,
+                    num_features=1, backend='dense', dtype=z.dtype.name)
+        model.num_features = len(z)
+        model.z = z
+        model.n = n
+        if w is None:
+            model._rebuild_weight_cache()
+        else:
+            model._w = w
+        model._recount()
+        return model
+    
     def __repr__(self) -> str:
         nonzero, total, sparsity = self.sparsity()
         return (f"FTRLProximal(α={self.alpha}, β={self.beta}, "
-                f"L1={self.L1}, L2={self.L2}, "
+                f"L1={self.L1}, L2={self.L2}, backend={self.backend}, "
+                f"lr_state={self.lr_state}, "
                 f"updates={self.num_updates}, "
                 f"weights={nonzero}/{total}, sparsity={sparsity:.2%})")
 
@@ -314,3 +1139,51 @@ if __name__ == '__main__':
     # Test sparsity
     nonzero, total, sparsity = model.sparsity()
     print(f"  Sparsity: {sparsity:.2%} ({nonzero}/{total} non-zero)")
+    
+    # Test admission parity: a mini-batch admits the coordinates its rows
+    # admit one by one (a coordinate in k rows counts as k occurrences)
+    from src.algorithms.admission import CountingBloomAdmission
+    
+    # (random values: summed gradients of +-1 features can cancel exactly,
+    # and a coordinate with zero gradient gets no state)
+    rows = [{int(i): np.random.uniform(0.5, 1.5) for i in np.random.choice(50, size=5, replace=False)}
+            for _ in range(64)]
+    labels = np.random.randint(0, 2, size=len(rows))
+    indptr = np.cumsum([0] + [len(row) for row in rows])
+    indices = np.array([i for row in rows for i in row], dtype=np.int64)
+    values = np.array([x for row in rows for x in row.values()])
+    
+    per_sample = FTRLProximal(admission=CountingBloomAdmission(min_count=4))
+    per_sample.track_changes()
+    for features, label in zip(rows, labels):
+        per_sample.update(features, int(label))
+    batched = FTRLProximal(admission=CountingBloomAdmission(min_count=4))
+    batched.update_batch(indices, values, indptr, labels)
+    print(f"  Batch admission matches per-sample: {set(batched.n) == set(per_sample.n)} "
+          f"({len(batched.n)} of 50 admitted)")
+    print(f"  Rejected coordinates not tracked as changed: "
+          f"{per_sample.num_changed() == len(per_sample.n)}")
+    
+    # Test counter parity across backends and the batch path, including
+    # zero gradients (every fourth feature only ever has value 0, which
+    # must not create state)
+    rows = [{int(i): 0.0 if i % 4 == 0 else np.random.uniform(0.5, 1.5)
+             for i in np.random.choice(200, size=6, replace=False)} for _ in range(300)]
+    labels = np.random.randint(0, 2, size=len(rows))
+    indptr = np.cumsum([0] + [len(row) for row in rows])
+    indices = np.array([i for row in rows for i in row], dtype=np.int64)
+    values = np.array([x for row in rows for x in row.values()])
+    
+    counters = set()
+    for backend in FTRLProximal.BACKENDS:
+        for batch in (False, True):
+            counted = FTRLProximal(L1=0.5, num_features=200, backend=backend)
+            if batch:
+                counted.update_batch(indices, values, indptr, labels)
+            else:
+                for features, label in zip(rows, labels):
+                    counted.update(features, int(label))
+            counters.add(counted.sparsity()[1])
+            counted._recount()
+            counters.add(counted.sparsity()[1])
+    print(f"  Coordinates with state match across backends: {counters == {150}}")
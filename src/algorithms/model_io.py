@@ -0,0 +1,161 @@
+"""
+Binary Model Format
+
+Versioned, memory-mappable on-disk format for sparse linear models.
+
+Layout:
+    [0:8)     magic b'CTRMODEL'
+    [8:12)    format version (uint32, little endian)
+    [12:16)   header length in bytes (uint32, little endian)
+    [16:...)  JSON header (hyperparameters, counters, array table)
+    ...       arrays, each starting on a 64-byte boundary
+
+Every array has one entry per stored coordinate. The 'indices' array holds
+the sorted feature indices, and the other arrays (z, n, w, ...) are aligned
+with it, so a model can be scored straight from a read-only np.memmap
+with a binary search and no unpickling. Several processes that map the same
+file share one page-cache copy.
+"""
+import os
+import json
+import struct
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+
+MAGIC = b'CTRMODEL'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct('<8sII')
+
+
+def _aligned(offset: int) -> int:
+    """Round offset up to the next ALIGNMENT boundary."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_model(filepath: str, header: Dict, arrays: Dict[str, np.ndarray]):
+    """
+    Write a model file.
+    
+    Args:
+        filepath: Output path
+        header: JSON-serializable metadata (hyperparameters, counters, ...)
+        arrays: Named 1-D arrays of equal length; must include 'indices'
+            sorted in increasing order
+    """
+    if 'indices' not in arrays:
+        raise ValueError("arrays must include 'indices'")
+    count = len(arrays['indices'])
+    for name, array in arrays.items():
+        if array.ndim != 1 or len(array) != count:
+            raise ValueError(f"array '{name}' must be 1-D with {count} entries")
+    
+    # The array table needs the header size, so lay out the header with
+    # placeholder offsets first and then fill them in
+    table = [{'name': name, 'dtype': np.dtype(array.dtype).str, 'offset': 0}
+             for name, array in arrays.items()]
+    full_header = dict(header, count=count, arrays=table)
+    
+    while True:
+        encoded = json.dumps(full_header, sort_keys=True).encode('utf-8')
+        offset = _aligned(_PREFIX.size + len(encoded))
+        changed = False
+        for entry, array in zip(table, arrays.values()):
+            if entry['offset'] != offset:
+                entry['offset'] = offset
+                changed = True
+            offset = _aligned(offset + array.nbytes)
+        if not changed:
+            break
+    
+    with open(filepath, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        f.write(encoded)
+        for entry, array in zip(table, arrays.values()):
+            f.write(b'\0' * (entry['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(array, dtype=entry['dtype']).tobytes())
+
+
+def read_header(filepath: str) -> Optional[Dict]:
+    """
+    Read the JSON header of a model file.
+    
+    Args:
+        filepath: Model path
+    
+    Returns:
+        Header dict, or None if the file is not in this format
+        (e.g. a legacy pickle)
+    """
+    with open(filepath, 'rb') as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            return None
+        magic, version, header_len = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            return None
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{filepath}: model format version {version} is newer "
+                             f"than supported version {FORMAT_VERSION}")
+        header = json.loads(f.read(header_len).decode('utf-8'))
+    header['format_version'] = version
+    return header
+
+
+def read_model(filepath: str, mmap: bool = False) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """
+    Read a model file.
+    
+    Args:
+        filepath: Model path
+        mmap: If True, arrays are read-only np.memmap views of the file
+            (zero-copy); otherwise they are loaded into memory
+    
+    Returns:
+        Tuple of (header, arrays)
+    """
+    header = read_header(filepath)
+    if header is None:
+        raise ValueError(f"{filepath} is not a binary model file")
+    
+    count = header['count']
+    arrays = {}
+    with open(filepath, 'rb') as f:
+        for entry in header['arrays']:
+            dtype = np.dtype(entry['dtype'])
+            if count == 0:
+                arrays[entry['name']] = np.zeros(0, dtype=dtype)
+            elif mmap:
+                arrays[entry['name']] = np.memmap(filepath, dtype=dtype, mode='r',
+                                                  offset=entry['offset'], shape=(count,))
+            else:
+                f.seek(entry['offset'])
+                arrays[entry['name']] = np.fromfile(f, dtype=dtype, count=count)
+    return header, arrays
+
+
+def is_binary_model(filepath: str) -> bool:
+    """Whether filepath is in the binary model format."""
+    return os.path.exists(filepath) and read_header(filepath) is not None
+
+
+def lookup_sorted(index: np.ndarray, values: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """
+    Look up keys in a sorted index (binary search), 0 for missing keys.
+    
+    Args:
+        index: Sorted array of stored feature indices
+        values: Array aligned with index
+        keys: Feature indices to look up
+    
+    Returns:
+        float64 array with values[position of key] or 0.0
+    """
+    if len(index) == 0:
+        return np.zeros(len(keys), dtype=np.float64)
+    pos = np.searchsorted(index, keys)
+    np.minimum(pos, len(index) - 1, out=pos)
+    found = index[pos] == keys
+    return np.where(found, values[pos], 0.0).astype(np.float64)
@@ -7,6 +7,9 @@ import math
 from typing import Dict, Optional, Tuple
 import numpy as np
 
+from src.algorithms.model_io import write_model, read_model, read_header, lookup_sorted
+from src.algorithms.serving import FrozenModel
+
 
 class OnlineLogisticRegression:
     """
@@ -28,6 +31,33 @@ class OnlineLogisticRegression:
         - ∇L = (p - y) * x for logistic loss
         - λ = L2 regularization parameter
     
+    L2 Modes (l2_mode):
+        'active': the λ * w shrinkage is applied only to the features of
+                  the current sample (the original behavior), so the
+                  effective regularization depends on feature frequency.
+        'global': every weight decays by (1 - η_t * λ) at every step, as
+                  in full-batch SGD, applied lazily in O(active features):
+                  a global log-scale C_t = Σ_s log(1 - η_s * λ) is kept
+                  plus, per weight, the value c_i of C when it was last
+                  written. The true weight is w_i * exp(C_t - c_i), which
+                  is caught up when the feature is next seen.
+    
+    Weight Backends:
+        'dict':  weights in a Python dict keyed by feature index.
+        'dense': weights in a preallocated NumPy array of length
+                 num_features (usually num_buckets); updates are
+                 vectorized gathers and scatters.
+        Loading with mmap=True gives a read-only, memory-mapped model
+        (sorted index + weights) for scoring.
+    
+    Mini-Batches (update_batch, batch_update):
+        'online':  pure online SGD: the rows are applied one after the
+                   other, each scored with the weights left by the previous
+                   row. Same result as calling update() per row.
+        'average': one vectorized SGD step with the current η_t on the
+                   gradient averaged over the rows (scatter-add per
+                   coordinate). With one row this is exactly update().
+    
     Example:
         model = OnlineLogisticRegression(learning_rate=0.1, L2=0.001)
         
@@ -36,11 +66,19 @@ class OnlineLogisticRegression:
             loss = log_loss(label, pred)
     """
     
+    L2_MODES = ('active', 'global')
+    BACKENDS = ('dict', 'dense')
+    BATCH_UPDATES = ('online', 'average')
+    
     def __init__(self,
                  learning_rate: float = 0.1,
                  L2: float = 0.001,
                  decay: bool = True,
-                 num_features: Optional[int] = None):
+                 num_features: Optional[int] = None,
+                 l2_mode: str = 'active',
+                 backend: str = 'dict',
+                 dtype: str = 'float64',
+                 batch_update: str = 'online'):
         """
         Initialize Online Logistic Regression model.
         
@@ -49,14 +87,47 @@ class OnlineLogisticRegression:
             L2: L2 regularization strength
             decay: Whether to decay learning rate over time
             num_features: Optional fixed feature dimension
+                (required for the 'dense' backend, usually num_buckets)
+            l2_mode: 'active' (shrink only the sample's features) or
+                'global' (lazy decay of every weight, see class docstring)
+            backend: Weight storage backend, 'dict' or 'dense'
+            dtype: Float type of the dense weights, 'float32' or 'float64'
+            batch_update: How update_batch() combines rows, 'online' or
+                'average' (see class docstring)
         """
+        if l2_mode not in self.L2_MODES:
+            raise ValueError(f"Unknown l2_mode '{l2_mode}', expected one of {self.L2_MODES}")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {self.BACKENDS}")
+        if backend == 'dense' and not num_features:
+            raise ValueError("The 'dense' backend requires num_features")
+        if batch_update not in self.BATCH_UPDATES:
+            raise ValueError(f"Unknown batch_update '{batch_update}', "
+                             f"expected one of {self.BATCH_UPDATES}")
+        
         self.learning_rate = learning_rate
         self.L2 = L2
         self.decay = decay
         self.num_features = num_features
+        self.l2_mode = l2_mode
+        self.backend = backend
+        self.dtype = np.dtype(dtype)
+        self.batch_update = batch_update
+        
+        # Lazy global decay ('global' mode): cumulative log decay C and the
+        # value of C at each weight's last write
+        self._log_scale = 0.0
+        
+        if backend == 'dense':
+            self.w = np.zeros(num_features, dtype=self.dtype)
+            self._marks = np.zeros(num_features if l2_mode == 'global' else 0)
+        else:
+            # Weights stored as sparse dict
+            self.w: Dict[int, float] = {}
+            self._marks: Dict[int, float] = {}
         
-        # Weights stored as sparse dict
-        self.w: Dict[int, float] = {}
+        # Sorted feature indices when w is a read-only memory map (see load)
+        self._index: Optional[np.ndarray] = None
         
         # Statistics
         self.num_updates = 0
@@ -78,22 +149,97 @@ class OnlineLogisticRegression:
         
         Args:
             features: Sparse feature dict {index: value}
-            
+        
         Returns:
             Raw score (before sigmoid)
         """
+        if self._index is not None or self.backend == 'dense':
+            idx, x = self._to_arrays(features)
+            return float(self._gather(idx) @ x)
+        
+        if self.l2_mode == 'global':
+            return sum(self._current_weight(i) * x_i for i, x_i in features.items())
+        
         score = 0.0
         for i, x_i in features.items():
             score += self.w.get(i, 0.0) * x_i
         return score
     
+    def _current_weight(self, i: int) -> float:
+        """Weight of feature i with the pending global decay applied."""
+        w_i = self.w.get(i)
+        if w_i is None:
+            return 0.0
+        gap = self._log_scale - self._marks[i]
+        return w_i * math.exp(gap) if gap else w_i
+    
+    @staticmethod
+    def _to_arrays(features: Dict[int, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert a sparse feature dict to (indices, values) arrays."""
+        count = len(features)
+        idx = np.fromiter(features.keys(), dtype=np.int64, count=count)
+        x = np.fromiter(features.values(), dtype=np.float64, count=count)
+        return idx, x
+    
+    def _gather(self, idx: np.ndarray) -> np.ndarray:
+        """Current weights (pending global decay applied) for unique coordinates."""
+        if self._index is not None:
+            return lookup_sorted(self._index, self.w, idx)
+        
+        if self.backend == 'dense':
+            w = self.w[idx].astype(np.float64)
+            if self.l2_mode == 'global':
+                w *= np.exp(self._log_scale - self._marks[idx])
+            return w
+        
+        keys = idx.tolist()
+        if self.l2_mode == 'global':
+            return np.array([self._current_weight(i) for i in keys], dtype=np.float64)
+        w_get = self.w.get
+        return np.array([w_get(i, 0.0) for i in keys], dtype=np.float64)
+    
+    def _apply_step(self,
+                    idx: np.ndarray,
+                    w: np.ndarray,
+                    step: np.ndarray,
+                    l2_eta,
+                    log_decay: float):
+        """
+        Write the SGD step for unique coordinates.
+        
+        Args:
+            idx: Array of feature indices
+            w: Their current weights (see _gather)
+            step: Learning-rate-scaled loss gradient per coordinate
+            l2_eta: Learning rate multiplying the L2 term ('active' mode)
+            log_decay: Log of this step's global decay factor ('global' mode)
+        """
+        if self.l2_mode == 'global':
+            if math.isinf(log_decay):
+                raise ValueError("learning_rate * L2 must be < 1 for l2_mode='global'")
+            self._log_scale += log_decay
+            w = w * math.exp(log_decay) - step
+        else:
+            w = w - step - self.L2 * l2_eta * w
+        
+        if self.backend == 'dense':
+            self.w[idx] = w
+            if self.l2_mode == 'global':
+                self._marks[idx] = self._log_scale
+            return
+        
+        keys = idx.tolist()
+        self.w.update(zip(keys, w.tolist()))
+        if self.l2_mode == 'global':
+            self._marks.update(dict.fromkeys(keys, self._log_scale))
+    
     def predict(self, features: Dict[int, float]) -> float:
         """
         Predict click probability.
         
         Args:
             features: Sparse feature dict {index: value}
-            
+        
         Returns:
             Probability in [0, 1]
         """
@@ -116,10 +262,16 @@ class OnlineLogisticRegression:
         Args:
             features: Sparse feature dict {index: value}
             label: True label (0 or 1)
-            
+        
         Returns:
             Prediction made before update
         """
+        self._check_writable()
+        if self.backend == 'dense':
+            return self._update_dense(features, label)
+        if self.l2_mode == 'global':
+            return self._update_global(features, label)
+        
         # Predict with current weights
         p = self.predict(features)
         
@@ -144,6 +296,198 @@ class OnlineLogisticRegression:
         self.num_updates += 1
         return p
     
+    def _update_global(self, features: Dict[int, float], label: int) -> float:
+        """
+        SGD step with lazy global L2 decay (l2_mode='global').
+        
+        Same result as shrinking every weight by (1 - η * λ) each step, but
+        only the active weights are touched.
+        """
+        w, marks = self.w, self._marks
+        w_get, exp = w.get, math.exp
+        log_scale = self._log_scale
+        
+        # Catch up the active weights once; reuse them for the prediction
+        # and the update (inlined _current_weight)
+        active = []
+        score = 0.0
+        for i, x_i in features.items():
+            w_i = w_get(i)
+            if w_i is None:
+                w_i = 0.0
+            else:
+                gap = log_scale - marks[i]
+                if gap:
+                    w_i *= exp(gap)
+            active.append((i, x_i, w_i))
+            score += w_i * x_i
+        p = self._sigmoid(score)
+        
+        g = p - label
+        eta = self.get_learning_rate()
+        shrink = eta * self.L2
+        if shrink >= 1.0:
+            raise ValueError(f"learning_rate * L2 = {shrink} must be < 1 for l2_mode='global'")
+        
+        # This step's decay of all the other weights
+        self._log_scale += math.log1p(-shrink)
+        log_scale = self._log_scale
+        
+        for i, x_i, w_i in active:
+            w[i] = w_i - eta * (g * x_i + self.L2 * w_i)
+            marks[i] = log_scale
+        
+        self.num_updates += 1
+        return p
+    
+    def _check_writable(self):
+        """Raise if the weights are a read-only memory map."""
+        if self._index is not None:
+            raise RuntimeError("Model was loaded with mmap=True and is read-only; "
+                               "load it without mmap to continue training")
+    
+    def _update_dense(self, features: Dict[int, float], label: int) -> float:
+        """
+        Vectorized update for the 'dense' backend.
+        
+        Same arithmetic as update(), applied to all active features at once.
+        """
+        idx, x = self._to_arrays(features)
+        return self._update_row(idx, x, label)
+    
+    def _update_row(self, idx: np.ndarray, x: np.ndarray, label: float) -> float:
+        """SGD step for one sample given as (indices, values) arrays."""
+        w = self._gather(idx)
+        p = self._sigmoid(float(w @ x))
+        
+        eta = self.get_learning_rate()
+        log_decay = math.log1p(-eta * self.L2) if eta * self.L2 < 1.0 else -math.inf
+        self._apply_step(idx, w, eta * (p - label) * x, eta, log_decay)
+        
+        self.num_updates += 1
+        return p
+    
+    @staticmethod
+    def _sigmoid_array(x: np.ndarray) -> np.ndarray:
+        """Numerically stable element-wise sigmoid (same branches as _sigmoid)."""
+        exp_neg = np.exp(-np.abs(x))
+        return np.where(x >= 0, 1.0 / (1.0 + exp_neg), exp_neg / (1.0 + exp_neg))
+    
+    @staticmethod
+    def _row_ids(indptr: np.ndarray) -> np.ndarray:
+        """Row number of every non-zero entry of a CSR batch."""
+        return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    
+    def _batch_scores(self,
+                      indices: np.ndarray,
+                      values: np.ndarray,
+                      indptr: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Raw scores of a CSR batch (one weight lookup per distinct coordinate).
+        
+        Returns:
+            Tuple of (scores, unique_indices, inverse, unique_weights)
+        """
+        uniq, inverse = np.unique(indices, return_inverse=True)
+        w = self._gather(uniq)
+        scores = np.bincount(self._row_ids(indptr),
+                             weights=w[inverse] * values,
+                             minlength=len(indptr) - 1)
+        return scores, uniq, inverse, w
+    
+    def predict_batch(self,
+                      indices: np.ndarray,
+                      values: np.ndarray,
+                      indptr: np.ndarray) -> np.ndarray:
+        """
+        Predict click probabilities for a CSR batch.
+        
+        Args:
+            indices: Feature index of every non-zero entry
+            values: Feature value of every non-zero entry
+            indptr: Row pointers, length num_rows + 1
+        
+        Returns:
+            Array of probabilities, one per row
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        indptr = np.asarray(indptr, dtype=np.int64)
+        scores = self._batch_scores(indices, values, indptr)[0]
+        return self._sigmoid_array(scores)
+    
+    def update_batch(self,
+                     indices: np.ndarray,
+                     values: np.ndarray,
+                     indptr: np.ndarray,
+                     labels: np.ndarray) -> np.ndarray:
+        """
+        Mini-batch SGD update from a CSR batch.
+        
+        With batch_update='average' all rows are scored with the current
+        weights, the per-entry gradients are scatter-added per coordinate
+        and one step is written to every touched coordinate. With 'online'
+        the rows are applied one at a time (see class docstring).
+        num_updates advances by the number of rows either way.
+        
+        Args:
+            indices: Feature index of every non-zero entry
+            values: Feature value of every non-zero entry
+            indptr: Row pointers, length num_rows + 1
+            labels: True labels (0 or 1), one per row
+        
+        Returns:
+            Predictions made before the update, one per row
+        """
+        self._check_writable()
+        indices = np.asarray(indices, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        indptr = np.asarray(indptr, dtype=np.int64)
+        labels = np.asarray(labels, dtype=np.float64)
+        num_rows = len(labels)
+        
+        if self.batch_update == 'online':
+            bounds = indptr.tolist()
+            return np.array([self._update_row(indices[bounds[r]:bounds[r + 1]],
+                                              values[bounds[r]:bounds[r + 1]], labels[r])
+                             for r in range(num_rows)], dtype=np.float64)
+        
+        scores, uniq, inverse, w = self._batch_scores(indices, values, indptr)
+        p = self._sigmoid_array(scores)
+        
+        g = np.bincount(inverse, weights=(p - labels)[self._row_ids(indptr)] * values,
+                        minlength=len(uniq))
+        eta = self.get_learning_rate()
+        log_decay = math.log1p(-eta * self.L2) if eta * self.L2 < 1.0 else -math.inf
+        self._apply_step(uniq, w, eta * g / max(num_rows, 1), eta, log_decay)
+        
+        self.num_updates += num_rows
+        return p
+    
+    def _nonzero_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted indices and current values of the stored weights."""
+        if self._index is not None:
+            return self._index, self.w
+        self._materialize()
+        if self.backend == 'dense':
+            nonzero = np.flatnonzero(self.w)
+            return nonzero, self.w[nonzero].astype(np.float64)
+        keys = sorted(self.w)
+        return (np.array(keys, dtype=np.int64),
+                np.array([self.w[i] for i in keys], dtype=np.float64))
+    
+    def _materialize(self):
+        """Apply the pending global decay to every stored weight."""
+        if self.l2_mode != 'global' or self._index is not None:
+            return
+        if self.backend == 'dense':
+            self.w *= np.exp(self._log_scale - self._marks)
+            self._marks[:] = self._log_scale
+            return
+        for i in self.w:
+            self.w[i] = self._current_weight(i)
+            self._marks[i] = self._log_scale
+    
     def get_weights(self) -> Dict[int, float]:
         """
         Get current model weights.
@@ -151,6 +495,10 @@ class OnlineLogisticRegression:
         Returns:
             Dictionary of {feature_index: weight}
         """
+        if self._index is not None or self.backend == 'dense':
+            indices, weights = self._nonzero_arrays()
+            return dict(zip(indices.tolist(), weights.tolist()))
+        self._materialize()
         return self.w.copy()
     
     def weight_stats(self) -> Tuple[float, float, int]:
@@ -160,27 +508,98 @@ class OnlineLogisticRegression:
         Returns:
             Tuple of (mean_abs_weight, max_abs_weight, num_weights)
         """
-        if not self.w:
+        if self._index is not None or self.backend == 'dense':
+            abs_weights = np.abs(self._nonzero_arrays()[1])
+            if len(abs_weights) == 0:
+                return 0.0, 0.0, 0
+            return float(abs_weights.mean()), float(abs_weights.max()), len(abs_weights)
+        
+        if len(self.w) == 0:
             return 0.0, 0.0, 0
         
+        self._materialize()
         abs_weights = [abs(w) for w in self.w.values()]
         return np.mean(abs_weights), max(abs_weights), len(self.w)
     
+    def freeze(self, layout: str = 'sorted', dtype: Optional[str] = None) -> FrozenModel:
+        """
+        Export a scoring-only snapshot of the weights.
+        
+        Args:
+            layout: 'sorted' or 'dense' (see serving.py)
+            dtype: Float type of the snapshot weights (default: model dtype)
+        
+        Returns:
+            FrozenModel; call .quantize(bits, scale) on it for fixed-point weights
+        """
+        indices, weights = self._nonzero_arrays()
+        return FrozenModel(indices, weights, layout=layout,
+                           num_features=self.num_features, dtype=dtype or self.dtype.name)
+    
     def save(self, filepath: str):
-        """Save model to file."""
-        import pickle
-        with open(filepath, 'wb') as f:
-            pickle.dump({
-                'learning_rate': self.learning_rate,
-                'L2': self.L2,
-                'decay': self.decay,
-                'w': self.w,
-                'num_updates': self.num_updates
-            }, f)
+        """
+        Save model in the binary model format (see model_io).
+        
+        Args:
+            filepath: Output path
+        """
+        indices, weights = self._nonzero_arrays()
+        
+        write_model(filepath, {
+            'model': 'OnlineLogisticRegression',
+            'learning_rate': self.learning_rate,
+            'L2': self.L2,
+            'decay': self.decay,
+            'l2_mode': self.l2_mode,
+            'num_features': self.num_features,
+            'backend': self.backend,
+            'dtype': self.dtype.name,
+            'batch_update': self.batch_update,
+            'num_updates': self.num_updates
+        }, {'indices': indices, 'w': weights})
     
     @classmethod
-    def load(cls, filepath: str) -> 'OnlineLogisticRegression':
-        """Load model from file."""
+    def load(cls, filepath: str, mmap: bool = False) -> 'OnlineLogisticRegression':
+        """
+        Load model from file.
+        
+        Args:
+            filepath: Path written by save() (legacy pickles are also accepted)
+            mmap: Memory-map the weights for read-only scoring
+        
+        Returns:
+            OnlineLogisticRegression instance
+        """
+        header = read_header(filepath)
+        if header is None:
+            return cls._load_pickle(filepath)
+        
+        header, arrays = read_model(filepath, mmap=mmap)
+        model = cls(
+            learning_rate=header['learning_rate'],
+            L2=header['L2'],
+            decay=header['decay'],
+            l2_mode=header.get('l2_mode', 'active'),
+            num_features=header.get('num_features'),
+            backend='dict' if mmap else header.get('backend', 'dict'),
+            dtype=header.get('dtype', 'float64'),
+            batch_update=header.get('batch_update', 'online')
+        )
+        model.num_updates = header['num_updates']
+        if mmap:
+            model._index = arrays['indices']
+            model.w = arrays['w']
+        elif model.backend == 'dense':
+            model.w[arrays['indices']] = arrays['w']
+        else:
+            keys = arrays['indices'].tolist()
+            model.w = dict(zip(keys, arrays['w'].tolist()))
+            model._marks = dict.fromkeys(keys, 0.0)
+        return model
+    
+    @classmethod
+    def _load_pickle(cls, filepath: str) -> 'OnlineLogisticRegression':
+        """Load a model saved by the older pickle-based save()."""
         import pickle
         with open(filepath, 'rb') as f:
             data = pickle.load(f)
@@ -197,6 +616,7 @@ class OnlineLogisticRegression:
     def __repr__(self) -> str:
         mean_w, max_w, num_w = self.weight_stats()
         return (f"OnlineLogisticRegression(lr={self.learning_rate}, L2={self.L2}, "
+                f"l2_mode={self.l2_mode}, backend={self.backend}, "
                 f"updates={self.num_updates}, weights={num_w}, "
                 f"mean|w|={mean_w:.4f}, max|w|={max_w:.4f})")
 
@@ -228,3 +648,59 @@ if __name__ == '__main__':
     
     print(f"  Model: {model}")
     print(f"  Avg loss (last 100): {np.mean(losses[-100:]):.4f}")
+    
+    # Lazy global decay must match decaying every weight at every step
+    print("\nTesting lazy global L2 decay against eager decay:")
+    lazy = OnlineLogisticRegression(learning_rate=0.1, L2=0.01, l2_mode='global')
+    eager_w: Dict[int, float] = {}
+    np.random.seed(0)
+    
+    for t in range(2000):
+        features = {int(i): 1.0 for i in np.random.choice(500, size=10, replace=False)}
+        label = int(np.random.random() < 0.2)
+        
+        # Eager reference: O(model) decay of every weight, then the SGD step
+        eta = lazy.get_learning_rate()
+        p = lazy._sigmoid(sum(eager_w.get(i, 0.0) * x_i for i, x_i in features.items()))
+        gradients = {i: (p - label) * x_i for i, x_i in features.items()}
+        for i in eager_w:
+            if i not in features:
+                eager_w[i] *= 1.0 - eta * lazy.L2
+        for i, g_i in gradients.items():
+            w_i = eager_w.get(i, 0.0)
+            eager_w[i] = w_i - eta * (g_i + lazy.L2 * w_i)
+        
+        lazy.update(features, label)
+    
+    lazy_w = lazy.get_weights()
+    max_diff = max(abs(lazy_w[i] - w_i) for i, w_i in eager_w.items())
+    print(f"  Model: {lazy}")
+    print(f"  Max |w_lazy - w_eager|: {max_diff:.2e}")
+    
+    # Dense backend and mini-batches must reproduce the per-sample updates
+    print("\nTesting dense backend and mini-batch updates:")
+    reference = OnlineLogisticRegression(learning_rate=0.1, L2=0.01)
+    dense = OnlineLogisticRegression(learning_rate=0.1, L2=0.01,
+                                     backend='dense', num_features=500)
+    batched = OnlineLogisticRegression(learning_rate=0.1, L2=0.01, backend='dense',
+                                       num_features=500, batch_update='online')
+    np.random.seed(1)
+    
+    for t in range(50):
+        rows = [{int(i): 1.0 for i in np.random.choice(500, size=10, replace=False)}
+                for _ in range(20)]
+        labels = (np.random.random(20) < 0.2).astype(int)
+        for features, label in zip(rows, labels):
+            reference.update(features, label)
+            dense.update(features, label)
+        indices = np.concatenate([list(features) for features in rows])
+        values = np.concatenate([list(features.values()) for features in rows])
+        indptr = np.cumsum([0] + [len(features) for features in rows])
+        batched.update_batch(indices, values, indptr, labels)
+    
+    ref_w = reference.get_weights()
+    for other in (dense, batched):
+        other_w = other.get_weights()
+        max_diff = max(abs(other_w.get(i, 0.0) - w_i) for i, w_i in ref_w.items())
+        print(f"  Model: {other}")
+        print(f"  Max |w - w_dict|: {max_diff:.2e}")
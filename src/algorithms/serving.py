@@ -0,0 +1,298 @@
+"""
+Frozen Serving Snapshots
+
+Scoring-only copies of a trained linear model: nonzero weights only, no
+optimizer state, optionally quantized to fixed-point integers.
+
+Reference:
+    McMahan et al., "Ad Click Prediction: a View from the Trenches" (2013),
+    Section 4.2 "Encoding Values with Fewer Bits"
+"""
+import math
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+from src.algorithms.model_io import lookup_sorted
+
+
+class FrozenModel:
+    """
+    Immutable serving snapshot of a sparse linear model.
+    
+    Holds only the nonzero weights, so with L1 sparsity it is a small
+    fraction of the training state (FTRL keeps z, n and w for every
+    coordinate seen). Scoring is a lookup plus a dot product.
+    
+    Layouts:
+        'sorted': sorted feature indices (int32 when they fit, else int64)
+                  + aligned weights; lookups are binary searches.
+                  Memory ~ (4 + itemsize) * nonzeros.
+        'dense':  one weight per feature (num_features); lookups are
+                  direct array reads. Fastest when num_features is small
+                  enough to afford itemsize * num_features bytes.
+    
+    Example:
+        frozen = model.freeze(layout='sorted')
+        probs = frozen.predict_batch(indices, values, indptr)
+        print(frozen.nbytes)
+    """
+    
+    LAYOUTS = ('sorted', 'dense')
+    
+    _INT32_MAX = np.iinfo(np.int32).max
+    
+    def __init__(self,
+                 index: np.ndarray,
+                 weights: np.ndarray,
+                 layout: str = 'sorted',
+                 num_features: Optional[int] = None,
+                 dtype: str = 'float64'):
+        """
+        Build a snapshot from nonzero weights.
+        
+        Args:
+            index: Feature indices of the nonzero weights (any order)
+            weights: Weight of each index
+            layout: 'sorted' or 'dense'
+            num_features: Feature dimension of the 'dense' layout (default:
+                largest index + 1)
+            dtype: Type of the stored weights, 'float32' or 'float64'
+        """
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}', expected one of {self.LAYOUTS}")
+        
+        index = np.asarray(index, dtype=np.int64)
+        weights = np.asarray(weights, dtype=dtype)
+        nonzero = weights != 0
+        index, weights = index[nonzero], weights[nonzero]
+        
+        if layout == 'dense' and not num_features:
+            num_features = int(index.max()) + 1 if len(index) else 1
+        
+        self.layout = layout
+        self.num_features = num_features
+        self.num_weights = len(index)
+        
+        if layout == 'dense':
+            self._w = np.zeros(num_features, dtype=dtype)
+            self._w[index] = weights
+            self._index = None
+        else:
+            order = np.argsort(index, kind='stable')
+            self._index = index[order]
+            self._w = weights[order]
+            
+            # Half-size index when every feature index fits (keys are
+            # clipped to the same type at lookup time)
+            if not len(index) or self._index[-1] < self._INT32_MAX:
+                self._index = self._index.astype(np.int32)
+        
+        self._w.setflags(write=False)
+    
+    @classmethod
+    def from_weights(cls,
+                     weights: Dict[int, float],
+                     layout: str = 'sorted',
+                     num_features: Optional[int] = None,
+                     dtype: str = 'float64') -> 'FrozenModel':
+        """
+        Build a snapshot from a {feature_index: weight} dict.
+        
+        Works for any model with get_weights(), e.g. OnlineLogisticRegression.
+        """
+        index = np.fromiter(weights.keys(), dtype=np.int64, count=len(weights))
+        values = np.fromiter(weights.values(), dtype=np.float64, count=len(weights))
+        return cls(index, values, layout=layout, num_features=num_features, dtype=dtype)
+    
+    def weights(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The stored nonzero weights.
+        
+        Returns:
+            Tuple of (int64 feature indices, float64 weights)
+        """
+        if self.layout == 'dense':
+            index = np.flatnonzero(self._w)
+            return index, self._lookup(index)
+        return self._index.astype(np.int64), self._lookup(self._index.astype(np.int64))
+    
+    def quantize(self, bits: int = 16, scale: Optional[float] = None) -> 'QuantizedModel':
+        """
+        Quantized copy of this snapshot (same layout).
+        
+        Args:
+            bits: Bits per weight (2-32)
+            scale: Weight of one integer step (default: max|w| / (2^(bits-1) - 1))
+        
+        Returns:
+            QuantizedModel
+        """
+        index, weights = self.weights()
+        return QuantizedModel(index, weights, bits=bits, scale=scale,
+                              layout=self.layout, num_features=self.num_features)
+    
+    def _lookup(self, idx: np.ndarray) -> np.ndarray:
+        """Weights for an array of feature indices (0 where absent)."""
+        if self.layout == 'dense':
+            inside = idx < len(self._w)
+            if inside.all():
+                return self._w[idx].astype(np.float64)
+            # Indices beyond num_features have no weight
+            w = np.zeros(len(idx), dtype=np.float64)
+            w[inside] = self._w[idx[inside]]
+            return w
+        # Binary search over the sorted distinct keys is several times
+        # faster than searching every (unordered, repeated) key
+        uniq, inverse = np.unique(idx, return_inverse=True)
+        if self._index.dtype == np.int32:
+            uniq = np.minimum(uniq, self._INT32_MAX).astype(np.int32)
+        return lookup_sorted(self._index, self._w, uniq)[inverse]
+    
+    def predict_raw(self, features: Dict[int, float]) -> float:
+        """
+        Compute raw score (logit) for given features.
+        
+        Args:
+            features: Sparse feature dict {index: value}
+        
+        Returns:
+            Raw score (before sigmoid)
+        """
+        count = len(features)
+        idx = np.fromiter(features.keys(), dtype=np.int64, count=count)
+        x = np.fromiter(features.values(), dtype=np.float64, count=count)
+        return float(self._lookup(idx) @ x)
+    
+    def predict(self, features: Dict[int, float]) -> float:
+        """
+        Predict click probability.
+        
+        Args:
+            features: Sparse feature dict {index: value}
+        
+        Returns:
+            Probability in [0, 1]
+        """
+        return self._sigmoid(self.predict_raw(features))
+    
+    def predict_batch(self,
+                      indices: np.ndarray,
+                      values: np.ndarray,
+                      indptr: np.ndarray) -> np.ndarray:
+        """
+        Predict click probabilities for a CSR batch.
+        
+        Args:
+            indices: Feature index of every non-zero entry
+            values: Feature value of every non-zero entry
+            indptr: Row pointers, length num_rows + 1
+        
+        Returns:
+            Array of probabilities, one per row
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        indptr = np.asarray(indptr, dtype=np.int64)
+        
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        scores = np.bincount(rows, weights=self._lookup(indices) * values,
+                             minlength=len(indptr) - 1)
+        return self._sigmoid_array(scores)
+    
+    @staticmethod
+    def _sigmoid(x: float) -> float:
+        """Numerically stable sigmoid."""
+        if x >= 0:
+            return 1.0 / (1.0 + math.exp(-x))
+        exp_x = math.exp(x)
+        return exp_x / (1.0 + exp_x)
+    
+    @staticmethod
+    def _sigmoid_array(x: np.ndarray) -> np.ndarray:
+        """Numerically stable element-wise sigmoid."""
+        exp_neg = np.exp(-np.abs(x))
+        return np.where(x >= 0, 1.0 / (1.0 + exp_neg), exp_neg / (1.0 + exp_neg))
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the snapshot arrays."""
+        total = self._w.nbytes
+        if self._index is not None:
+            total += self._index.nbytes
+        return total
+    
+    def memory_usage(self) -> int:
+        """Bytes held by the snapshot (same as nbytes)."""
+        return self.nbytes
+    
+    def __repr__(self) -> str:
+        return (f"FrozenModel(layout={self.layout}, weights={self.num_weights}, "
+                f"dtype={self._w.dtype.name}, bytes={self.nbytes:,})")
+
+
+class QuantizedModel(FrozenModel):
+    """
+    Serving snapshot with weights stored as signed fixed-point integers.
+    
+    Each weight is stored as code = round(w / scale), clipped to the signed
+    range of `bits` bits, in the smallest NumPy integer type that holds it
+    (int8, int16 or int32). Scoring dequantizes on lookup (code * scale),
+    so the rounding error per weight is at most scale / 2 for unclipped
+    weights. Weights that round to 0 are dropped.
+    
+    bits=16 with scale=2**-13 is the paper's q2.13 format: range
+    [-4, 4), resolution 1.2e-4, 4x smaller than float64. With scale=None
+    the scale is chosen from the largest weight, so nothing is clipped.
+    
+    Example:
+        quantized = model.freeze().quantize(bits=16, scale=2**-13)
+        probs = quantized.predict_batch(indices, values, indptr)
+    """
+    
+    def __init__(self,
+                 index: np.ndarray,
+                 weights: np.ndarray,
+                 bits: int = 16,
+                 scale: Optional[float] = None,
+                 layout: str = 'sorted',
+                 num_features: Optional[int] = None):
+        """
+        Quantize nonzero weights.
+        
+        Args:
+            index: Feature indices of the weights
+            weights: Float weight of each index
+            bits: Bits per weight (2-32)
+            scale: Weight of one integer step (default: max|w| / (2^(bits-1) - 1))
+            layout: 'sorted' or 'dense'
+            num_features: Feature dimension of the 'dense' layout
+        """
+        if not 2 <= bits <= 32:
+            raise ValueError("bits must be in [2, 32]")
+        
+        weights = np.asarray(weights, dtype=np.float64)
+        qmax = 2 ** (bits - 1) - 1
+        if scale is None:
+            max_abs = float(np.abs(weights).max()) if len(weights) else 0.0
+            scale = max_abs / qmax if max_abs > 0 else 1.0
+        if scale <= 0:
+            raise ValueError("scale must be positive")
+        
+        code_dtype = np.int8 if bits <= 8 else np.int16 if bits <= 16 else np.int32
+        scaled = np.rint(weights / scale)
+        self.num_clipped = int(np.count_nonzero(np.abs(scaled) > qmax))
+        codes = np.clip(scaled, -qmax, qmax).astype(code_dtype)
+        
+        self.bits = bits
+        self.scale = float(scale)
+        super().__init__(index, codes, layout=layout, num_features=num_features,
+                         dtype=np.dtype(code_dtype).name)
+    
+    def _lookup(self, idx: np.ndarray) -> np.ndarray:
+        """Dequantized weights for an array of feature indices."""
+        return super()._lookup(idx) * self.scale
+    
+    def __repr__(self) -> str:
+        return (f"QuantizedModel(layout={self.layout}, weights={self.num_weights}, "
+                f"bits={self.bits}, scale={self.scale:.3g}, clipped={self.num_clipped}, "
+                f"bytes={self.nbytes:,})")
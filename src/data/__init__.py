@@ -1,3 +1,8 @@
 # Data Module
-from .data_loader import CriteoDataLoader, StreamingIterator
+from .data_loader import (CriteoDataLoader, StreamingIterator, TypedBatch, count_lines,
+                          iter_lines, open_loader, split_into_parts)
+from .line_index import LineIndex
+from .prefetch import Prefetcher
+from .fused import FusedDataLoader, FusedParser
+from .columnar import ColumnarBatch, ColumnarDataLoader, convert_to_columnar
 from .preprocessing import FeatureHasher, LogTransformer
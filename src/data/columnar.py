@@ -0,0 +1,324 @@
+"""
+Columnar Binary Cache for Criteo Data
+
+One-time conversion of a Criteo TSV file into fixed-width binary column
+files that later runs memory-map instead of re-parsing the text.
+"""
+import os
+import json
+from typing import Iterator, NamedTuple, Optional, Tuple
+import numpy as np
+
+from src.data.data_loader import CriteoDataLoader, TypedBatch, cat_to_uint32, open_text
+
+
+class ColumnarBatch(NamedTuple):
+    """
+    A batch of parsed samples as column arrays.
+    
+    Attributes:
+        ints: int32 matrix (rows x 13), 0 where missing
+        int_missing: bool matrix (rows x 13), True where the field was empty
+        cats: S8 matrix (rows x 26), b'' where missing
+    """
+    ints: np.ndarray
+    int_missing: np.ndarray
+    cats: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.ints)
+    
+    def to_rows(self) -> list:
+        """
+        Raw feature lists, exactly as CriteoDataLoader yields them.
+        
+        Returns:
+            List of [13 ints (-1 when missing)] + [26 str ('' when missing)]
+        """
+        ints = np.where(self.int_missing, -1, self.ints).tolist()
+        cats = self.cats.astype('U8').tolist()
+        return [row_ints + row_cats for row_ints, row_cats in zip(ints, cats)]
+
+
+class ColumnarCache:
+    """
+    Layout of a columnar cache directory.
+    
+    Files (row-major, native byte order, no headers):
+        labels.bin       uint8   (rows,)
+        ints.bin         int32   (rows, 13)
+        int_missing.bin  bool    (rows, 13)
+        cats.bin         S8      (rows, 26)
+        meta.json        row count, dtypes and the source path; written
+                         last, so a directory without it is incomplete
+    
+    Rows are the samples CriteoDataLoader accepts, in file order.
+    """
+    
+    VERSION = 1
+    META_FILE = 'meta.json'
+    COLUMNS = {
+        'labels': ('uint8', ()),
+        'ints': ('int32', (CriteoDataLoader.NUM_INT_FEATURES,)),
+        'int_missing': ('bool', (CriteoDataLoader.NUM_INT_FEATURES,)),
+        'cats': ('S8', (CriteoDataLoader.NUM_CAT_FEATURES,)),
+    }
+    
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        """Whether path is a complete columnar cache directory."""
+        return os.path.isfile(os.path.join(path, cls.META_FILE))
+    
+    @classmethod
+    def read_meta(cls, path: str) -> dict:
+        """Read and validate meta.json of a cache directory."""
+        with open(os.path.join(path, cls.META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get('version') != cls.VERSION:
+            raise ValueError(f"Unsupported columnar cache version: {meta.get('version')}")
+        return meta
+    
+    @classmethod
+    def column_file(cls, path: str, name: str) -> str:
+        return os.path.join(path, f"{name}.bin")
+
+
+def convert_to_columnar(input_path: str,
+                        output_dir: str,
+                        max_samples: Optional[int] = None,
+                        chunk_size: int = 65536) -> int:
+    """
+    Convert a Criteo TSV (or .gz) file into a columnar cache directory.
+    
+    Args:
+        input_path: Source data file
+        output_dir: Cache directory to create (existing column files are replaced)
+        max_samples: Maximum number of samples to convert (None = all)
+        chunk_size: Rows parsed before each write
+    
+    Returns:
+        Number of rows written
+    
+    Raises:
+        ValueError: If an integer does not fit in int32, a categorical
+            value is longer than 8 bytes or not ASCII, or a line has more
+            than the 26 categoricals the cache can hold (no column files
+            are left behind)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    meta_path = os.path.join(output_dir, ColumnarCache.META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    
+    files = {name: open(ColumnarCache.column_file(output_dir, name), 'wb')
+             for name in ColumnarCache.COLUMNS}
+    int32 = np.iinfo(np.int32)
+    num_rows = 0
+    
+    def flush(labels, ints, missing, cats):
+        ints = np.array(ints, dtype=np.int64)
+        if len(ints) and (ints.min() < int32.min or ints.max() > int32.max):
+            raise ValueError(f"{input_path}: integer feature out of int32 range")
+        cats = np.array(cats, dtype=object)
+        try:
+            encoded = np.char.encode(cats.astype(str), 'ascii')
+        except UnicodeEncodeError:
+            raise ValueError(f"{input_path}: non-ASCII categorical value") from None
+        if encoded.dtype.itemsize > 8:
+            raise ValueError(f"{input_path}: categorical value longer than 8 bytes")
+        
+        np.array(labels, dtype=np.uint8).tofile(files['labels'])
+        ints.astype(np.int32).tofile(files['ints'])
+        np.array(missing, dtype=bool).tofile(files['int_missing'])
+        encoded.astype('S8').tofile(files['cats'])
+    
+    try:
+        chunk = ([], [], [], [])
+        with open_text(input_path) as f:
+            for line in f:
+                if max_samples and num_rows >= max_samples:
+                    break
+                parsed = CriteoDataLoader._parse_columns(line)
+                if parsed is None:
+                    continue
+                if line.strip().count('\t') > CriteoDataLoader.TOTAL_FEATURES:
+                    # CriteoDataLoader keeps extra fields as C27, ...
+                    raise ValueError(f"{input_path}: line with more than "
+                                     f"{CriteoDataLoader.TOTAL_FEATURES + 1} fields")
+                for column, value in zip(chunk, parsed):
+                    column.append(value)
+                num_rows += 1
+                
+                if len(chunk[0]) >= chunk_size:
+                    flush(*chunk)
+                    chunk = ([], [], [], [])
+        if chunk[0]:
+            flush(*chunk)
+    except BaseException:
+        for f in files.values():
+            f.close()
+            os.remove(f.name)
+        raise
+    finally:
+        for f in files.values():
+            f.close()
+    
+    with open(meta_path, 'w') as f:
+        json.dump({
+            'version': ColumnarCache.VERSION,
+            'num_rows': num_rows,
+            'columns': {name: {'dtype': dtype, 'shape': list(shape)}
+                        for name, (dtype, shape) in ColumnarCache.COLUMNS.items()},
+            'source': os.path.abspath(input_path),
+        }, f, indent=2)
+    
+    return num_rows
+
+
+# Nibble of every byte value: 0-15 for hex digits, 16 for NUL padding,
+# 17 for anything else
+_HEX_NIBBLES = np.full(256, 17, dtype=np.uint8)
+_HEX_NIBBLES[0] = 16
+for _digit in b'0123456789abcdef':
+    _HEX_NIBBLES[_digit] = int(chr(_digit), 16)
+    _HEX_NIBBLES[ord(chr(_digit).upper())] = int(chr(_digit), 16)
+_NIBBLE_SHIFTS = np.arange(28, -1, -4, dtype=np.uint32)
+
+
+def decode_cats(cats: np.ndarray) -> np.ndarray:
+    """
+    Vectorized cat_to_uint32 over an S8 matrix.
+    
+    Full-width hex values are decoded with a lookup table; the rare others
+    (shorter or not hex) go through cat_to_uint32 one by one.
+    
+    Args:
+        cats: S8 array of categorical values (b'' = missing)
+    
+    Returns:
+        uint32 array of the same shape
+    """
+    cats = np.ascontiguousarray(cats, dtype='S8')
+    nibbles = _HEX_NIBBLES[cats.view(np.uint8).reshape(*cats.shape, 8)]
+    full = (nibbles < 16).all(axis=-1)
+    codes = (nibbles.astype(np.uint32) << _NIBBLE_SHIFTS).sum(axis=-1, dtype=np.uint32)
+    codes[~full] = 0
+    
+    for position in zip(*np.nonzero(~full & (cats != b''))):
+        codes[position] = cat_to_uint32(cats[position].decode('ascii'))
+    return codes
+
+
+class ColumnarDataLoader:
+    """
+    Batch loader over a columnar cache (see convert_to_columnar).
+    
+    The column files are memory-mapped, so a pass does no text parsing
+    and the OS page cache keeps them in memory across epochs.
+    Batches are (labels, ColumnarBatch) with labels as an int64 array;
+    Preprocessor.transform_batch accepts ColumnarBatch directly. With
+    typed=True the batches are TypedBatch (categoricals decoded to uint32).
+    
+    Sharding splits the rows into num_shards contiguous ranges.
+    
+    Example:
+        convert_to_columnar('data/train.txt', 'data/cache/train')
+        for labels, batch in ColumnarDataLoader('data/cache/train', batch_size=4096):
+            indices, values, indptr = preprocessor.transform_batch(batch)
+    """
+    
+    def __init__(self,
+                 path: str,
+                 batch_size: int = 1024,
+                 max_samples: Optional[int] = None,
+                 shard_index: int = 0,
+                 num_shards: int = 1,
+                 typed: bool = False):
+        """
+        Open a columnar cache.
+        
+        Args:
+            path: Cache directory written by convert_to_columnar
+            batch_size: Number of samples per batch
+            max_samples: Maximum number of samples to load (None = all)
+            shard_index: Which shard to read, in [0, num_shards)
+            num_shards: Number of disjoint contiguous row ranges
+            typed: Yield TypedBatch instead of ColumnarBatch
+        """
+        if not 0 <= shard_index < num_shards:
+            raise ValueError(f"shard_index must be in [0, {num_shards}), got {shard_index}")
+        if not ColumnarCache.exists(path):
+            raise FileNotFoundError(f"Columnar cache not found (no meta.json): {path}")
+        
+        self.path = path
+        self.batch_size = batch_size
+        self.max_samples = max_samples
+        self.shard_index = shard_index
+        self.num_shards = num_shards
+        self.typed = typed
+        
+        meta = ColumnarCache.read_meta(path)
+        self.num_rows = meta['num_rows']
+        self.columns = {name: self._map(name, meta['columns'][name])
+                        for name in ColumnarCache.COLUMNS}
+    
+    def _map(self, name: str, spec: dict) -> np.ndarray:
+        """Memory-map one column file (read-only)."""
+        shape = (self.num_rows, *spec['shape'])
+        if self.num_rows == 0:
+            return np.zeros(shape, dtype=spec['dtype'])
+        return np.memmap(ColumnarCache.column_file(self.path, name),
+                         dtype=spec['dtype'], mode='r', shape=shape)
+    
+    def _row_range(self) -> Tuple[int, int]:
+        """Rows [start, stop) of this shard, capped by max_samples."""
+        start = self.num_rows * self.shard_index // self.num_shards
+        stop = self.num_rows * (self.shard_index + 1) // self.num_shards
+        if self.max_samples:
+            stop = min(stop, start + self.max_samples)
+        return start, stop
+    
+    def __len__(self) -> int:
+        start, stop = self._row_range()
+        return stop - start
+    
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, ColumnarBatch]]:
+        """
+        Iterate over the cache in batches.
+        
+        Yields:
+            Tuple of (labels, ColumnarBatch or TypedBatch) for each batch
+        """
+        labels, ints = self.columns['labels'], self.columns['ints']
+        missing, cats = self.columns['int_missing'], self.columns['cats']
+        start, stop = self._row_range()
+        
+        for lo in range(start, stop, self.batch_size):
+            hi = min(lo + self.batch_size, stop)
+            if self.typed:
+                batch = TypedBatch(np.asarray(ints[lo:hi]), np.asarray(missing[lo:hi]),
+                                   decode_cats(cats[lo:hi]))
+            else:
+                batch = ColumnarBatch(np.asarray(ints[lo:hi]), np.asarray(missing[lo:hi]),
+                                      np.asarray(cats[lo:hi]))
+            yield labels[lo:hi].astype(np.int64), batch
+
+
+if __name__ == '__main__':
+    # Test: convert sample data and compare with the text loader
+    from src.data.data_loader import create_sample_data
+    
+    sample_path = 'data/sample/train.txt'
+    cache_dir = 'data/sample/train.cols'
+    if not os.path.exists(sample_path):
+        create_sample_data(sample_path, num_samples=100)
+    
+    print("Testing convert_to_columnar:")
+    num_rows = convert_to_columnar(sample_path, cache_dir)
+    print(f"  Rows: {num_rows}")
+    
+    print("\nTesting ColumnarDataLoader:")
+    text_rows = [row for _, batch in CriteoDataLoader(sample_path, batch_size=256) for row in batch]
+    cache_rows = [row for _, batch in ColumnarDataLoader(cache_dir, batch_size=256)
+                  for row in batch.to_rows()]
+    print(f"  Same rows as CriteoDataLoader: {text_rows == cache_rows}")
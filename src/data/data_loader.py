@@ -4,8 +4,334 @@ Data Loader Module for Criteo Dataset
 Provides streaming data loading for large-scale CTR prediction.
 """
 import os
+import re
+import glob
 import gzip
-from typing import Iterator, Tuple, List, Optional
+import zlib
+import random
+import itertools
+from typing import Iterator, NamedTuple, Tuple, List, Optional
+import numpy as np
+
+from src.data.line_index import LineIndex
+from src.data.prefetch import Prefetcher
+
+
+def open_text(filepath: str):
+    """Open a data file (plain or .gz) for reading text lines."""
+    if filepath.endswith('.gz'):
+        return gzip.open(filepath, 'rt', encoding='utf-8')
+    return open(filepath, 'r', encoding='utf-8')
+
+
+def list_parts(dirpath: str) -> List[str]:
+    """Part files of a split directory (see split_into_parts), in order."""
+    return sorted(path for path in glob.glob(os.path.join(dirpath, 'part-*'))
+                  if not path.endswith(LineIndex.SUFFIX))
+
+
+def shard_byte_range(filepath: str, shard_index: int, num_shards: int) -> Tuple[int, int]:
+    """
+    Byte range [start, end) of one of num_shards equal slices of a file.
+    
+    A shard owns the lines that start inside its range (see read_byte_range).
+    """
+    size = os.path.getsize(filepath)
+    return size * shard_index // num_shards, size * (shard_index + 1) // num_shards
+
+
+def read_byte_range(filepath: str, start: int, end: int) -> Iterator[str]:
+    """
+    Lines of an uncompressed file that start in the byte range [start, end).
+    
+    The line that straddles start belongs to the previous range, the line
+    that straddles end to this one, so consecutive ranges partition the
+    file's lines without any shard reading the others' bytes.
+    """
+    with open(filepath, 'rb') as f:
+        if start > 0:
+            # Skip to the first line start at or after start
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode('utf-8')
+
+
+def iter_lines(filepath: str,
+               shard_index: int = 0,
+               num_shards: int = 1,
+               start_line: int = 0) -> Iterator[str]:
+    """
+    Text lines of one shard of a data file or split directory.
+    
+    - Split directory (see split_into_parts): shard k reads the whole
+      part files k, k + num_shards, ...; one shard reads them all in order.
+    - Plain text: shard k reads the lines starting in its byte range
+      (shard_byte_range), seeking straight to it.
+    - Gzip: a stream cannot be entered mid-way, so each shard decompresses
+      the file and keeps every num_shards-th line. Pre-split large .gz
+      inputs with split_into_parts to avoid the repeated full scans.
+    
+    start_line skips to a line of a single file through its LineIndex
+    sidecar, e.g. to resume an interrupted run.
+    
+    Args:
+        filepath: Data file (TSV or GZ) or split directory
+        shard_index: Which shard to read, in [0, num_shards)
+        num_shards: Number of disjoint shards
+        start_line: First line to read (0-based; unsharded files only)
+    
+    Yields:
+        Raw lines, in file order
+    """
+    if start_line:
+        if num_shards > 1 or os.path.isdir(filepath):
+            raise ValueError("start_line needs a single unsharded data file")
+        yield from LineIndex.open(filepath).iter_from(start_line)
+    elif os.path.isdir(filepath):
+        for part in list_parts(filepath)[shard_index::num_shards]:
+            with open_text(part) as f:
+                yield from f
+    elif num_shards == 1:
+        with open_text(filepath) as f:
+            yield from f
+    elif filepath.endswith('.gz'):
+        with open_text(filepath) as f:
+            yield from itertools.islice(f, shard_index, None, num_shards)
+    else:
+        yield from read_byte_range(filepath, *shard_byte_range(filepath, shard_index, num_shards))
+
+
+def iter_shuffled_blocks(filepath: str,
+                         rng: random.Random,
+                         shard_index: int = 0,
+                         num_shards: int = 1) -> Iterator[str]:
+    """
+    Lines of a data file read block by block in random block order.
+    
+    Blocks are the LineIndex blocks of a text file, or the part files of a
+    split directory; shard k reads blocks k, k + num_shards, ... Lines
+    inside a block keep their order, so combine with iter_shuffled for a
+    finer shuffle.
+    
+    Args:
+        filepath: Uncompressed data file or split directory
+        rng: Random source of the block order
+        shard_index: Which shard to read, in [0, num_shards)
+        num_shards: Number of disjoint shards
+    
+    Yields:
+        Raw lines
+    """
+    if os.path.isdir(filepath):
+        parts = list_parts(filepath)[shard_index::num_shards]
+        rng.shuffle(parts)
+        for part in parts:
+            with open_text(part) as f:
+                yield from f
+        return
+    
+    if filepath.endswith('.gz'):
+        raise ValueError("Block shuffling needs an uncompressed file or a split directory "
+                         "(a .gz stream cannot seek to blocks)")
+    index = LineIndex.open(filepath)
+    blocks = list(range(shard_index, index.num_blocks, num_shards))
+    rng.shuffle(blocks)
+    for block in blocks:
+        yield from index.read_block(block)
+
+
+def iter_shuffled(items: Iterator, buffer_size: int, rng: random.Random) -> Iterator:
+    """
+    Streaming shuffle with a fixed-size buffer.
+    
+    The first buffer_size items fill the buffer; each later item replaces
+    a random buffered one, which is emitted. Memory is buffer_size items
+    regardless of the stream length; an item moves at most about
+    buffer_size positions earlier, and larger buffers mix more.
+    
+    Args:
+        items: Input stream
+        buffer_size: Items held at once
+        rng: Random source (seeded for a reproducible order)
+    
+    Yields:
+        The items of the stream, in shuffled order
+    """
+    if buffer_size < 1:
+        raise ValueError("buffer_size must be >= 1")
+    
+    items = iter(items)
+    buffer = list(itertools.islice(items, buffer_size))
+    randrange = rng.randrange
+    for item in items:
+        j = randrange(buffer_size)
+        yield buffer[j]
+        buffer[j] = item
+    
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+def count_lines(filepath: str, build: bool = True) -> Optional[int]:
+    """
+    Number of lines (text file or split directory) or rows (columnar cache).
+    
+    Text files are counted through their LineIndex sidecar. With build
+    (default) a missing sidecar is built, which reads the whole file once
+    and writes <file>.idx next to it; without, the count is only returned
+    when every sidecar already exists.
+    
+    Args:
+        filepath: Data file, split directory or columnar cache
+        build: Build missing line indexes
+    
+    Returns:
+        Line count, or None if build is False and an index is missing
+    """
+    from src.data.columnar import ColumnarCache
+    
+    if ColumnarCache.exists(filepath):
+        return ColumnarCache.read_meta(filepath)['num_rows']
+    paths = list_parts(filepath) if os.path.isdir(filepath) else [filepath]
+    if build:
+        return sum(LineIndex.open(path).num_lines for path in paths)
+    
+    total = 0
+    for path in paths:
+        index = LineIndex.load_current(path)
+        if index is None:
+            return None
+        total += index.num_lines
+    return total
+
+
+def split_into_parts(input_path: str,
+                     output_dir: str,
+                     lines_per_part: int = 1_000_000,
+                     compress: bool = True) -> List[str]:
+    """
+    Split a data file into part files of lines_per_part lines each.
+    
+    One sequential pass; afterwards N processes can read the directory as
+    N shards (whole parts each) without any of them scanning the rest,
+    which is the sharding strategy for .gz inputs.
+    
+    Args:
+        input_path: Data file (TSV or GZ)
+        output_dir: Directory for part-00000.tsv[.gz], part-00001.tsv[.gz], ...
+        lines_per_part: Lines per part file
+        compress: Gzip the parts
+    
+    Returns:
+        Paths of the written parts
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for old_part in list_parts(output_dir):
+        os.remove(old_part)
+    
+    suffix = '.tsv.gz' if compress else '.tsv'
+    parts = []
+    with open_text(input_path) as f:
+        while True:
+            lines = list(itertools.islice(f, lines_per_part))
+            if not lines:
+                break
+            part = os.path.join(output_dir, f"part-{len(parts):05d}{suffix}")
+            with (gzip.open(part, 'wt', encoding='utf-8', compresslevel=1) if compress
+                  else open(part, 'w', encoding='utf-8')) as out:
+                out.writelines(lines)
+            parts.append(part)
+    return parts
+
+
+# 1-8 hex digits and nothing else (int(value, 16) would also take a sign,
+# a 0x prefix, underscores and whitespace)
+_HEX_CAT = re.compile(r'[0-9a-fA-F]{1,8}')
+
+# A row of tab-joined categoricals that are all hex or empty
+_HEX_ROW = re.compile(r'[0-9a-fA-F]{0,8}(?:\t[0-9a-fA-F]{0,8})*')
+
+
+def cat_to_uint32(value: str) -> int:
+    """
+    Decode a categorical value to a uint32 code (0 = missing).
+    
+    Criteo categoricals are 8-digit hex strings and decode to their value.
+    Anything else (not 1-8 hex digits, e.g. '-1' or '0x1f') falls back to
+    a nonzero CRC-32. The hex value 00000000 shares code 0 with missing,
+    and a short hex value shares the code of its zero-padded form.
+    """
+    if not value:
+        return 0
+    if _HEX_CAT.fullmatch(value):
+        return int(value, 16)
+    return zlib.crc32(value.encode()) or 1
+
+
+class TypedBatch(NamedTuple):
+    """
+    A batch of samples parsed into fixed-width integer matrices (typed mode).
+    
+    Attributes:
+        ints: int32 matrix (rows x 13), 0 where missing
+        int_missing: bool matrix (rows x 13), True where the field was empty
+        cats: uint32 matrix (rows x 26), see cat_to_uint32 (0 = missing)
+    """
+    ints: np.ndarray
+    int_missing: np.ndarray
+    cats: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.ints)
+    
+    def row(self, r: int) -> 'TypedBatch':
+        """One-row batch (views, no copy)."""
+        return TypedBatch(self.ints[r:r + 1], self.int_missing[r:r + 1], self.cats[r:r + 1])
+
+
+def open_loader(filepath: str,
+                batch_size: int = 1024,
+                max_samples: Optional[int] = None,
+                shard_index: int = 0,
+                num_shards: int = 1,
+                typed: bool = False,
+                start_line: int = 0,
+                prefetch: int = 0):
+    """
+    Batch loader for a data path: ColumnarDataLoader for a columnar cache
+    directory (see columnar.py), CriteoDataLoader for a TSV/GZ file or a
+    split directory.
+    
+    Args:
+        filepath: Data file, split directory or columnar cache directory
+        batch_size: Number of samples per batch
+        max_samples: Maximum number of samples to load (None = all)
+        shard_index: Which shard to read, in [0, num_shards)
+        num_shards: Number of disjoint shards
+        typed: Yield TypedBatch integer matrices instead of raw features
+        start_line: First line of a text file to read (see iter_lines)
+        prefetch: Line blocks a reader thread may read ahead (text files
+            only, see CriteoDataLoader; 0 = read in the calling thread)
+    
+    Returns:
+        Iterable of (labels, features) batches
+    """
+    from src.data.columnar import ColumnarCache, ColumnarDataLoader
+    
+    if ColumnarCache.exists(filepath):
+        if start_line:
+            raise ValueError("start_line needs a text data file, not a columnar cache")
+        return ColumnarDataLoader(filepath, batch_size=batch_size, max_samples=max_samples,
+                                  shard_index=shard_index, num_shards=num_shards, typed=typed)
+    return CriteoDataLoader(filepath, batch_size=batch_size, max_samples=max_samples,
+                            shard_index=shard_index, num_shards=num_shards, typed=typed,
+                            start_line=start_line, prefetch=prefetch)
 
 
 class CriteoDataLoader:
@@ -17,6 +343,22 @@ class CriteoDataLoader:
     - Columns 1-13: Integer features (I1-I13) - numerical
     - Columns 14-39: Categorical features (C1-C26) - hashed strings
     
+    Batches hold raw feature lists (13 ints, -1 when missing, then 26
+    strings). With typed=True they are TypedBatch matrices instead: int32
+    integers with a missing mask and uint32 categoricals, which take a
+    fraction of the memory of Python ints and strings.
+    
+    With shuffle=True lines pass through a buffered shuffle (iter_shuffled) of
+    shuffle_buffer lines, optionally after reading the file in random
+    block order (shuffle_blocks, see iter_shuffled_blocks), so memory stays
+    fixed. The order is reproducible from seed; each new iteration over
+    the loader (epoch) draws a different one.
+    
+    With prefetch > 0 a background thread reads, inflates and splits the
+    input into blocks of PREFETCH_BLOCK lines, up to prefetch blocks ahead
+    (see Prefetcher), while the calling thread parses and trains.
+    prefetcher.wait_time tells how long the consumer waited for input.
+    
     Example:
         loader = CriteoDataLoader('data/train.txt', batch_size=1000)
         for batch in loader:
@@ -28,24 +370,61 @@ class CriteoDataLoader:
     NUM_CAT_FEATURES = 26
     TOTAL_FEATURES = NUM_INT_FEATURES + NUM_CAT_FEATURES
     
+    PREFETCH_BLOCK = 1024
+    
     def __init__(self, 
                  filepath: str,
                  batch_size: int = 1024,
                  shuffle: bool = False,
-                 max_samples: Optional[int] = None):
+                 max_samples: Optional[int] = None,
+                 shard_index: int = 0,
+                 num_shards: int = 1,
+                 typed: bool = False,
+                 start_line: int = 0,
+                 shuffle_buffer: int = 65536,
+                 shuffle_blocks: bool = False,
+                 seed: int = 0,
+                 prefetch: int = 0):
         """
         Initialize the data loader.
         
         Args:
-            filepath: Path to the data file (TSV or GZ format)
+            filepath: Path to the data file (TSV or GZ format) or a split
+                directory (see split_into_parts)
             batch_size: Number of samples per batch
-            shuffle: Whether to shuffle data (not recommended for streaming)
+            shuffle: Shuffle the samples with a bounded buffer
             max_samples: Maximum number of samples to load (None = all)
+            shard_index: Which shard to read, in [0, num_shards)
+            num_shards: Number of disjoint shards the input is split into:
+                line-aligned byte ranges of a text file, whole parts of a
+                split directory (see iter_lines)
+            typed: Yield TypedBatch matrices instead of raw feature lists
+            start_line: Skip to this line of the file (see iter_lines)
+            shuffle_buffer: Lines held by the shuffle buffer
+            shuffle_blocks: Also read the blocks of the file in random order
+            seed: Random seed of the shuffle
+            prefetch: Line blocks a reader thread may read ahead
+                (0 = read in the calling thread)
         """
+        if not 0 <= shard_index < num_shards:
+            raise ValueError(f"shard_index must be in [0, {num_shards}), got {shard_index}")
+        if shuffle and start_line:
+            raise ValueError("start_line cannot be combined with shuffle")
+        
         self.filepath = filepath
         self.batch_size = batch_size
         self.shuffle = shuffle
         self.max_samples = max_samples
+        self.shard_index = shard_index
+        self.num_shards = num_shards
+        self.typed = typed
+        self.start_line = start_line
+        self.shuffle_buffer = shuffle_buffer
+        self.shuffle_blocks = shuffle_blocks
+        self.seed = seed
+        self._epoch = 0
+        self.prefetch = prefetch
+        self.prefetcher: Optional[Prefetcher] = None
         
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"Data file not found: {filepath}")
@@ -57,35 +436,165 @@ class CriteoDataLoader:
         Yields:
             Tuple of (labels, features) for each batch
         """
+        if self.typed:
+            yield from self._iter_typed()
+            return
+        
         labels = []
         features = []
+        
+        for label, feat in self.iter_samples():
+            labels.append(label)
+            features.append(feat)
+            
+            if len(labels) >= self.batch_size:
+                yield labels, features
+                labels = []
+                features = []
+        
+        # Yield remaining samples
+        if labels:
+            yield labels, features
+    
+    def iter_samples(self) -> Iterator[Tuple[int, List]]:
+        """
+        Iterate one sample at a time, straight from the parse loop.
+        
+        The same samples as __iter__ (raw features only; batch_size and
+        typed are ignored), without building a batch around each one.
+        
+        Yields:
+            Tuple of (label, features) for each sample
+        """
+        parse_line = self._parse_line
+        max_samples = self.max_samples
         sample_count = 0
         
-        # Determine if file is compressed
-        is_gz = self.filepath.endswith('.gz')
-        open_func = gzip.open if is_gz else open
-        mode = 'rt' if is_gz else 'r'
+        for line in self._lines():
+            parsed = parse_line(line)
+            if parsed is None:
+                continue
+            yield parsed
+            
+            sample_count += 1
+            if max_samples and sample_count >= max_samples:
+                return
+    
+    def _lines(self) -> Iterator[str]:
+        """Raw lines of this loader's shard, shuffled and prefetched if requested."""
+        if not self.shuffle:
+            lines = iter_lines(self.filepath, self.shard_index, self.num_shards, self.start_line)
+        else:
+            rng = random.Random(f"{self.seed}:{self._epoch}")
+            self._epoch += 1
+            if self.shuffle_blocks:
+                lines = iter_shuffled_blocks(self.filepath, rng, self.shard_index, self.num_shards)
+            else:
+                lines = iter_lines(self.filepath, self.shard_index, self.num_shards)
+            lines = iter_shuffled(lines, self.shuffle_buffer, rng)
         
-        with open_func(self.filepath, mode, encoding='utf-8') as f:
-            for line in f:
-                if self.max_samples and sample_count >= self.max_samples:
-                    break
-                
+        if not self.prefetch:
+            return lines
+        # Hand lines over in blocks: one queue operation per PREFETCH_BLOCK lines
+        blocks = iter(lambda: list(itertools.islice(lines, self.PREFETCH_BLOCK)), [])
+        self.prefetcher = Prefetcher(blocks, depth=self.prefetch)
+        return itertools.chain.from_iterable(self.prefetcher)
+    
+    def _iter_typed(self) -> Iterator[Tuple[np.ndarray, TypedBatch]]:
+        """Batches of (int64 labels, TypedBatch), same rows as __iter__."""
+        labels, ints, missing, cats = [], [], [], []
+        sample_count = 0
+        
+        for line in self._lines():
+            if self.max_samples and sample_count >= self.max_samples:
+                break
+            
+            parsed = self._parse_columns(line)
+            if parsed is None:
+                continue
+            labels.append(parsed[0])
+            ints.extend(parsed[1])
+            missing.extend(parsed[2])
+            cats.extend(self._cat_codes(parsed[3]))
+            sample_count += 1
+            
+            if len(labels) >= self.batch_size:
+                yield self._typed_batch(labels, ints, missing, cats)
+                labels, ints, missing, cats = [], [], [], []
+        
+        if labels:
+            yield self._typed_batch(labels, ints, missing, cats)
+    
+    def parse_lines(self, lines: List[str]) -> Tuple:
+        """
+        Parse a chunk of lines into one batch (rejected lines are skipped).
+        
+        Args:
+            lines: Raw lines from the TSV file
+        
+        Returns:
+            Tuple of (labels, features) in the form __iter__ yields
+        """
+        if not self.typed:
+            labels, features = [], []
+            for line in lines:
                 parsed = self._parse_line(line)
                 if parsed is not None:
-                    label, feat = parsed
-                    labels.append(label)
-                    features.append(feat)
-                    sample_count += 1
-                    
-                    if len(labels) >= self.batch_size:
-                        yield labels, features
-                        labels = []
-                        features = []
+                    labels.append(parsed[0])
+                    features.append(parsed[1])
+            return labels, features
         
-        # Yield remaining samples
-        if labels:
-            yield labels, features
+        labels, ints, missing, cats = [], [], [], []
+        for line in lines:
+            parsed = self._parse_columns(line)
+            if parsed is not None:
+                labels.append(parsed[0])
+                ints.extend(parsed[1])
+                missing.extend(parsed[2])
+                cats.extend(self._cat_codes(parsed[3]))
+        return self._typed_batch(labels, ints, missing, cats)
+    
+    @staticmethod
+    def _cat_codes(values: List[str]) -> List[int]:
+        """cat_to_uint32 of a row of categoricals, with a fast path for hex."""
+        if _HEX_ROW.fullmatch('\t'.join(values)):
+            return [int(value, 16) if value else 0 for value in values]
+        return [cat_to_uint32(value) for value in values]
+    
+    @classmethod
+    def _typed_batch(cls, labels, ints, missing, cats) -> Tuple[np.ndarray, TypedBatch]:
+        """Build (labels, TypedBatch) from flat row-major lists."""
+        return (np.array(labels, dtype=np.int64),
+                TypedBatch(np.array(ints, dtype=np.int32).reshape(-1, cls.NUM_INT_FEATURES),
+                           np.array(missing, dtype=bool).reshape(-1, cls.NUM_INT_FEATURES),
+                           np.array(cats, dtype=np.uint32).reshape(-1, cls.NUM_CAT_FEATURES)))
+    
+    @classmethod
+    def _parse_columns(cls, line: str) -> Optional[Tuple[int, List[int], List[bool], List[str]]]:
+        """
+        Parse a line into (label, ints, int_missing, cats).
+        
+        Accepts and rejects the same lines as _parse_line, but keeps missing
+        integers (0 with missing=True) apart from a literal -1. Only the 26
+        categoricals of the schema are returned: fields past the 40th,
+        which _parse_line keeps as C27, ..., are dropped.
+        """
+        try:
+            parts = line.strip().split('\t')
+            if len(parts) < cls.TOTAL_FEATURES + 1:
+                return None
+            
+            label = int(parts[0])
+            
+            ints, missing = [], []
+            for field in parts[1:cls.NUM_INT_FEATURES + 1]:
+                missing.append(field == '')
+                ints.append(int(field) if field else 0)
+            
+            return label, ints, missing, parts[cls.NUM_INT_FEATURES + 1:cls.TOTAL_FEATURES + 1]
+        
+        except (ValueError, IndexError):
+            return None
     
     def _parse_line(self, line: str) -> Optional[Tuple[int, List]]:
         """
@@ -93,7 +602,7 @@ class CriteoDataLoader:
         
         Args:
             line: Raw line from TSV file
-            
+        
         Returns:
             Tuple of (label, features) or None if parsing fails
         """
@@ -118,7 +627,7 @@ class CriteoDataLoader:
                 cat_features.append(parts[i] if parts[i] else '')
             
             return label, int_features + cat_features
-            
+        
         except (ValueError, IndexError):
             return None
 
@@ -128,6 +637,7 @@ class StreamingIterator:
     Memory-efficient streaming iterator for processing one sample at a time.
     
     Useful for online learning where we update the model after each sample.
+    Also reads columnar cache directories (see columnar.py).
     
     Example:
         iterator = StreamingIterator('data/train.txt')
@@ -135,17 +645,34 @@ class StreamingIterator:
             model.partial_fit(features, label)
     """
     
-    def __init__(self, filepath: str, max_samples: Optional[int] = None):
+    def __init__(self,
+                 filepath: str,
+                 max_samples: Optional[int] = None,
+                 typed: bool = False,
+                 start_line: int = 0,
+                 prefetch: int = 0):
         """
         Initialize the streaming iterator.
         
         Args:
-            filepath: Path to the data file
+            filepath: Path to the data file or columnar cache directory
             max_samples: Maximum number of samples to iterate
+            typed: Yield one-row TypedBatch features instead of raw lists
+            start_line: First line of a text file to read (see iter_lines)
+            prefetch: Line blocks a reader thread may read ahead (see
+                CriteoDataLoader)
         """
+        from src.data.columnar import ColumnarCache
+        
         self.filepath = filepath
         self.max_samples = max_samples
-        self.loader = CriteoDataLoader(filepath, batch_size=1, max_samples=max_samples)
+        self.typed = typed
+        self.is_columnar = ColumnarCache.exists(filepath)
+        # Array batches are sliced per sample; read them in blocks (text
+        # samples come from CriteoDataLoader.iter_samples, unbatched)
+        self.loader = open_loader(filepath, batch_size=4096,
+                                  max_samples=max_samples, typed=typed,
+                                  start_line=start_line, prefetch=prefetch)
     
     def __iter__(self) -> Iterator[Tuple[int, List]]:
         """
@@ -154,25 +681,29 @@ class StreamingIterator:
         Yields:
             Tuple of (label, features) for each sample
         """
-        for labels, features in self.loader:
-            yield labels[0], features[0]
+        if self.typed:
+            for labels, batch in self.loader:
+                for r, label in enumerate(labels.tolist()):
+                    yield label, batch.row(r)
+            return
+        
+        if self.is_columnar:
+            for labels, batch in self.loader:
+                yield from zip(labels.tolist(), batch.to_rows())
+            return
+        
+        yield from self.loader.iter_samples()
     
     def count_lines(self) -> int:
         """
         Count total number of lines in file (for progress tracking).
         
+        Instant after the first call (see count_lines).
+        
         Returns:
             Number of lines in the file
         """
-        count = 0
-        is_gz = self.filepath.endswith('.gz')
-        open_func = gzip.open if is_gz else open
-        mode = 'rt' if is_gz else 'r'
-        
-        with open_func(self.filepath, mode, encoding='utf-8') as f:
-            for _ in f:
-                count += 1
-        return count
+        return count_lines(self.filepath)
 
 
 def create_sample_data(output_path: str, num_samples: int = 1000):
@@ -235,3 +766,40 @@ if __name__ == '__main__':
     iterator = StreamingIterator(sample_path, max_samples=5)
     for label, features in iterator:
         print(f"  Label: {label}, Features count: {len(features)}")
+    
+    # Test sharding: byte-range shards partition the lines
+    print("\nTesting iter_lines shards:")
+    all_lines = list(iter_lines(sample_path))
+    for num_shards in (2, 3, 7):
+        shards = [list(iter_lines(sample_path, k, num_shards)) for k in range(num_shards)]
+        same = [line for shard in shards for line in shard] == all_lines
+        print(f"  {num_shards} shards: sizes {[len(s) for s in shards]}, partition: {same}")
+    
+    # Test shuffling: same samples, different order, reproducible
+    print("\nTesting shuffle:")
+    ordered = [row for _, rows in CriteoDataLoader(sample_path) for row in rows]
+    for blocks in (False, True):
+        runs = [[row for _, rows in CriteoDataLoader(sample_path, shuffle=True, shuffle_buffer=32,
+                                                     shuffle_blocks=blocks, seed=7)
+                 for row in rows] for _ in range(2)]
+        same = sorted(map(str, runs[0])) == sorted(map(str, ordered))
+        print(f"  shuffle_blocks={blocks}: same samples: {same}, "
+              f"reordered: {runs[0] != ordered}, reproducible: {runs[0] == runs[1]}")
+    
+    # Test typed categoricals: only 1-8 hex digits decode as hex, anything
+    # int(..., 16) would also take ('-1', '0x1f', ' 1f') goes to CRC-32
+    print("\nTesting cat_to_uint32:")
+    odd = ['-1', '0x1f', '+1f', '1_f', ' 1f', '1f', '0000001f', 'DEADBEEF', '', 'xyz']
+    codes = [cat_to_uint32(value) for value in odd]
+    print(f"  In uint32 range: {all(0 <= code < 2**32 for code in codes)}, "
+          f"hex decoded: {codes[5:8] == [31, 31, 0xDEADBEEF]}, "
+          f"no merges with 1f: {31 not in codes[:5]}")
+    print(f"  Row fast path matches: {CriteoDataLoader._cat_codes(odd) == codes}, "
+          f"{CriteoDataLoader._cat_codes(odd[5:9]) == codes[5:9]}")
+    
+    odd_path = 'data/sample/odd_cats.txt'
+    with open(odd_path, 'w') as f:
+        f.write('\t'.join(['1'] + ['2'] * 13 + (odd * 3)[:26]) + '\n')
+    (labels, batch), = CriteoDataLoader(odd_path, typed=True)
+    print(f"  Typed loader accepts the line: {batch.cats[0].tolist() == (codes * 3)[:26]}")
+    os.remove(odd_path)
@@ -0,0 +1,291 @@
+"""
+Line-Offset Index for Text Data Files
+
+Sidecar file next to a TSV (or .gz) data file that records the byte
+offset of every stride-th line. Built once in a single bulk pass over the
+raw bytes (no decoding or splitting), it gives the line count instantly,
+seeks to any line after reading at most stride - 1 lines, and splits the
+file into blocks that can be read in any order.
+
+Layout of <data file>.idx:
+    [0:8)     magic b'CTRLINES'
+    [8:12)    format version (uint32, little endian)
+    [12:16)   header length in bytes (uint32, little endian)
+    [16:...)  JSON header (stride, line count, size and mtime of the file)
+    ...       int64 offsets, one per block
+"""
+import os
+import gzip
+import json
+import struct
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+
+
+MAGIC = b'CTRLINES'
+FORMAT_VERSION = 1
+
+_PREFIX = struct.Struct('<8sII')
+
+
+class LineIndex:
+    """
+    Byte offsets of every stride-th line of a data file.
+    
+    Block b holds lines [b * stride, (b + 1) * stride) and starts at
+    offsets[b]. For .gz files offsets are positions in the uncompressed
+    stream: counting stays instant, but a seek has to decompress up to the
+    target (without splitting lines), so random access is only cheap on
+    plain text.
+    
+    Example:
+        index = LineIndex.open('data/train.txt')   # builds train.txt.idx once
+        print(index.num_lines)
+        for line in index.iter_from(1_000_000):   # resume at line 1M
+            ...
+    """
+    
+    SUFFIX = '.idx'
+    
+    def __init__(self,
+                 filepath: str,
+                 offsets: np.ndarray,
+                 num_lines: int,
+                 stride: int,
+                 file_size: int,
+                 file_mtime_ns: int):
+        """
+        Wrap an index (use build, load or open to create one).
+        
+        Args:
+            filepath: Indexed data file
+            offsets: int64 start offset of every block
+            num_lines: Lines in the file (a final line without newline counts)
+            stride: Lines per block
+            file_size: Size of the data file when indexed
+            file_mtime_ns: Modification time of the data file when indexed
+        """
+        self.filepath = filepath
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.num_lines = num_lines
+        self.stride = stride
+        self.file_size = file_size
+        self.file_mtime_ns = file_mtime_ns
+    
+    @classmethod
+    def index_path(cls, filepath: str) -> str:
+        """Sidecar path of a data file."""
+        return filepath + cls.SUFFIX
+    
+    @staticmethod
+    def _open_binary(filepath: str):
+        if filepath.endswith('.gz'):
+            return gzip.open(filepath, 'rb')
+        return open(filepath, 'rb')
+    
+    @classmethod
+    def build(cls, filepath: str, stride: int = 4096, chunk_bytes: int = 1 << 24) -> 'LineIndex':
+        """
+        Index a data file in one pass over its bytes.
+        
+        Args:
+            filepath: Data file (TSV or GZ)
+            stride: Lines per block
+            chunk_bytes: Bytes read per chunk
+        
+        Returns:
+            LineIndex (not saved, see open)
+        """
+        if stride < 1:
+            raise ValueError("stride must be >= 1")
+        
+        stat = os.stat(filepath)
+        offsets = [np.zeros(1, dtype=np.int64)]
+        num_lines = 0
+        position = 0
+        last_byte = b'\n'
+        
+        with cls._open_binary(filepath) as f:
+            while True:
+                chunk = f.read(chunk_bytes)
+                if not chunk:
+                    break
+                # Every newline starts line num_lines + 1, num_lines + 2, ...
+                starts = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10) + (position + 1)
+                first = (-(num_lines + 1)) % stride
+                offsets.append(starts[first::stride])
+                num_lines += len(starts)
+                position += len(chunk)
+                last_byte = chunk[-1:]
+        
+        if last_byte != b'\n':
+            num_lines += 1
+        
+        offsets = np.concatenate(offsets)
+        # A newline at the very end does not start a line
+        offsets = offsets[offsets < position] if position else offsets[:0]
+        return cls(filepath, offsets, num_lines, stride, stat.st_size, stat.st_mtime_ns)
+    
+    def save(self, path: Optional[str] = None):
+        """Write the index (default: the sidecar path of the data file)."""
+        header = json.dumps({
+            'stride': self.stride,
+            'num_lines': self.num_lines,
+            'num_blocks': len(self.offsets),
+            'file_size': self.file_size,
+            'file_mtime_ns': self.file_mtime_ns,
+        }, sort_keys=True).encode('utf-8')
+        
+        with open(path or self.index_path(self.filepath), 'wb') as f:
+            f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            f.write(self.offsets.astype('<i8').tobytes())
+    
+    @classmethod
+    def load(cls, filepath: str, path: Optional[str] = None) -> 'LineIndex':
+        """
+        Read the index of a data file.
+        
+        Args:
+            filepath: Indexed data file
+            path: Index file (default: the sidecar path)
+        
+        Returns:
+            LineIndex
+        """
+        path = path or cls.index_path(filepath)
+        with open(path, 'rb') as f:
+            magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path}: not a line index file")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported line index version {version}")
+            header = json.loads(f.read(header_len).decode('utf-8'))
+            offsets = np.fromfile(f, dtype='<i8', count=header['num_blocks'])
+        
+        return cls(filepath, offsets, header['num_lines'], header['stride'],
+                   header['file_size'], header['file_mtime_ns'])
+    
+    @classmethod
+    def open(cls, filepath: str, stride: int = 4096) -> 'LineIndex':
+        """
+        The sidecar index of a data file, (re)built and saved when it is
+        missing or older than the file.
+        
+        A sidecar that cannot be written (read-only directory) is skipped;
+        the index is then rebuilt by the next run.
+        
+        Args:
+            filepath: Data file (TSV or GZ)
+            stride: Lines per block of a newly built index
+        
+        Returns:
+            LineIndex
+        """
+        index = cls.load_current(filepath)
+        if index is not None:
+            return index
+        
+        index = cls.build(filepath, stride=stride)
+        try:
+            index.save()
+        except OSError:
+            pass
+        return index
+    
+    @classmethod
+    def load_current(cls, filepath: str) -> Optional['LineIndex']:
+        """
+        The sidecar index of a data file if it exists and is up to date.
+        
+        Never reads the data file itself, so it is always instant.
+        
+        Args:
+            filepath: Data file (TSV or GZ)
+        
+        Returns:
+            LineIndex, or None if the sidecar is missing or stale
+        """
+        path = cls.index_path(filepath)
+        if not os.path.exists(path):
+            return None
+        index = cls.load(filepath, path)
+        return index if index.is_current() else None
+    
+    def is_current(self) -> bool:
+        """Whether the data file is unchanged since it was indexed."""
+        stat = os.stat(self.filepath)
+        return stat.st_size == self.file_size and stat.st_mtime_ns == self.file_mtime_ns
+    
+    @property
+    def num_blocks(self) -> int:
+        return len(self.offsets)
+    
+    def block_lines(self, block: int) -> Tuple[int, int]:
+        """Line range [first, stop) of a block."""
+        first = block * self.stride
+        return first, min(first + self.stride, self.num_lines)
+    
+    def iter_from(self, line: int) -> Iterator[str]:
+        """
+        Lines of the file starting at line number `line` (0-based).
+        
+        Seeks to the enclosing block and skips at most stride - 1 lines.
+        """
+        if line >= self.num_lines:
+            return
+        block, skip = divmod(line, self.stride)
+        with self._open_binary(self.filepath) as f:
+            f.seek(int(self.offsets[block]))
+            for _ in range(skip):
+                f.readline()
+            for raw in f:
+                yield raw.decode('utf-8')
+    
+    def read_block(self, block: int) -> List[str]:
+        """
+        All lines of one block.
+        
+        Args:
+            block: Block number in [0, num_blocks)
+        
+        Returns:
+            List of raw lines
+        """
+        if not 0 <= block < self.num_blocks:
+            raise IndexError(f"block {block} out of range [0, {self.num_blocks})")
+        first, stop = self.block_lines(block)
+        with self._open_binary(self.filepath) as f:
+            f.seek(int(self.offsets[block]))
+            return [f.readline().decode('utf-8') for _ in range(stop - first)]
+    
+    def __repr__(self) -> str:
+        return (f"LineIndex(lines={self.num_lines:,}, stride={self.stride}, "
+                f"blocks={self.num_blocks:,})")
+
+
+if __name__ == '__main__':
+    # Test: index the sample data and check counting and seeking
+    import time
+    from src.data.data_loader import create_sample_data, open_text
+    
+    sample_path = 'data/sample/train.txt'
+    if not os.path.exists(sample_path):
+        create_sample_data(sample_path, num_samples=10000)
+    
+    print("Testing LineIndex:")
+    with open_text(sample_path) as f:
+        lines = f.readlines()
+    
+    # Sizes follow the file, which other self-tests may have written shorter
+    stride = max(len(lines) // 10, 1)
+    target = len(lines) * 3 // 4
+    block = min(3, (len(lines) - 1) // stride)
+    
+    start = time.time()
+    index = LineIndex.build(sample_path, stride=stride)
+    print(f"  {index} built in {time.time() - start:.4f}s")
+    print(f"  Count matches: {index.num_lines == len(lines)}")
+    print(f"  Seek to {target} matches: {next(index.iter_from(target)) == lines[target]}")
+    print(f"  Block {block} matches: "
+          f"{index.read_block(block) == lines[block * stride:(block + 1) * stride]}")
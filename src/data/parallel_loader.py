@@ -0,0 +1,231 @@
+"""
+Parallel Parsing Pipeline
+
+Multi-process parsing (and optional hashing) of Criteo text files, with
+batches delivered to the consumer in input order.
+"""
+import itertools
+import multiprocessing as mp
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+
+from src.data.data_loader import CriteoDataLoader, TypedBatch, iter_lines
+
+
+# Per-process state of the pool workers (set by _init_worker)
+_worker_loader: Optional[CriteoDataLoader] = None
+_worker_preprocessor = None
+
+
+def _init_worker(filepath: str, typed: bool, preprocessor):
+    """Pool initializer: the parser and preprocessor are sent once per worker."""
+    global _worker_loader, _worker_preprocessor
+    _worker_loader = CriteoDataLoader(filepath, typed=typed)
+    _worker_preprocessor = preprocessor
+
+
+def _parse_chunk(lines: List[str]):
+    """
+    Parse (and hash, if the pool has a preprocessor) a chunk of lines.
+    
+    Returns:
+        Tuple of (labels, features): raw feature lists, a TypedBatch or,
+        when hashing, an (indices, values, indptr) CSR batch
+    """
+    labels, features = _worker_loader.parse_lines(lines)
+    
+    if _worker_preprocessor is not None:
+        features = _worker_preprocessor.transform_batch(features)
+        labels = np.asarray(labels, dtype=np.int64)
+    return labels, features
+
+
+def _slice_rows(features, lo: int, hi: int):
+    """Rows [lo, hi) of a batch of any kind."""
+    if isinstance(features, TypedBatch):
+        return TypedBatch(*(column[lo:hi] for column in features))
+    if isinstance(features, tuple):
+        indices, values, indptr = features
+        start, stop = indptr[lo], indptr[hi]
+        return indices[start:stop], values[start:stop], indptr[lo:hi + 1] - start
+    return features[lo:hi]
+
+
+def _concat_rows(parts: list):
+    """Concatenate batches of the same kind."""
+    if len(parts) == 1:
+        return parts[0]
+    first = parts[0]
+    if isinstance(first, TypedBatch):
+        return TypedBatch(*(np.concatenate(columns) for columns in zip(*parts)))
+    if isinstance(first, tuple):
+        offsets = np.cumsum([0] + [len(part[0]) for part in parts[:-1]])
+        indptr = np.concatenate([first[2][:1]] + [part[2][1:] + offset
+                                                 for part, offset in zip(parts, offsets)])
+        return (np.concatenate([part[0] for part in parts]),
+                np.concatenate([part[1] for part in parts]),
+                indptr)
+    if isinstance(first, np.ndarray):
+        return np.concatenate(parts)
+    return [row for part in parts for row in part]
+
+
+class ParallelDataLoader:
+    """
+    Batch loader that parses (and optionally hashes) in worker processes.
+    
+    The calling process only reads raw lines, which is cheap compared to
+    splitting and converting them. Chunks of lines go to a pool of
+    num_workers processes; at most queue_depth chunks are in flight, and
+    finished chunks are consumed strictly in input order, so the sample
+    stream is exactly that of CriteoDataLoader. Results are re-batched
+    to batch_size samples, so batches are also the same.
+    
+    With a preprocessor, workers also hash and batches are
+    (labels, (indices, values, indptr)) CSR batches: only the model update
+    is left to the training process. Without one, batches have the same
+    form as CriteoDataLoader (raw lists, or TypedBatch with typed=True).
+    
+    Example:
+        loader = ParallelDataLoader('data/train.txt', batch_size=1024,
+                                    num_workers=4, preprocessor=preprocessor)
+        for labels, (indices, values, indptr) in loader:
+            model.update_batch(indices, values, indptr, labels)
+    """
+    
+    def __init__(self,
+                 filepath: str,
+                 batch_size: int = 1024,
+                 max_samples: Optional[int] = None,
+                 num_workers: int = 2,
+                 queue_depth: int = 8,
+                 chunk_size: int = 4096,
+                 preprocessor=None,
+                 typed: bool = False,
+                 shard_index: int = 0,
+                 num_shards: int = 1,
+                 start_line: int = 0):
+        """
+        Initialize the loader.
+        
+        Args:
+            filepath: Path to the data file (TSV or GZ format) or a split
+                directory
+            batch_size: Number of samples per batch
+            max_samples: Maximum number of samples to load (None = all)
+            num_workers: Parser processes
+            queue_depth: Maximum chunks submitted but not yet consumed
+                (bounds memory when the consumer is slower than the parsers)
+            chunk_size: Lines per task sent to a worker
+            preprocessor: Hash in the workers with this Preprocessor
+                (None = yield parsed features)
+            typed: Parse into TypedBatch matrices (see CriteoDataLoader)
+            shard_index: Which shard to read, in [0, num_shards)
+            num_shards: Number of disjoint shards (see iter_lines)
+            start_line: First line of the file to read (see iter_lines)
+        """
+        if num_workers < 1:
+            raise ValueError("num_workers must be >= 1")
+        if queue_depth < 1:
+            raise ValueError("queue_depth must be >= 1")
+        
+        # Validates the path and shard
+        CriteoDataLoader(filepath, typed=typed, shard_index=shard_index, num_shards=num_shards)
+        
+        self.filepath = filepath
+        self.batch_size = batch_size
+        self.max_samples = max_samples
+        self.num_workers = num_workers
+        self.queue_depth = queue_depth
+        self.chunk_size = chunk_size
+        self.preprocessor = preprocessor
+        self.typed = typed
+        self.shard_index = shard_index
+        self.num_shards = num_shards
+        self.start_line = start_line
+    
+    def _chunks(self) -> Iterator[Tuple]:
+        """Finished chunks (labels, features) in input order."""
+        pool = mp.Pool(self.num_workers, initializer=_init_worker,
+                       initargs=(self.filepath, self.typed, self.preprocessor))
+        pending = deque()
+        try:
+            f = iter_lines(self.filepath, self.shard_index, self.num_shards, self.start_line)
+            while True:
+                lines = list(itertools.islice(f, self.chunk_size))
+                if lines:
+                    pending.append(pool.apply_async(_parse_chunk, (lines,)))
+                if pending and (len(pending) >= self.queue_depth or not lines):
+                    yield pending.popleft().get()
+                elif not lines:
+                    break
+        finally:
+            pool.terminate()
+            pool.join()
+    
+    def __iter__(self) -> Iterator[Tuple]:
+        """
+        Iterate over the dataset in batches.
+        
+        Yields:
+            Tuple of (labels, features) for each batch
+        """
+        buffered_labels, buffered_features = [], []
+        num_buffered = 0
+        remaining = self.max_samples or float('inf')
+        
+        for labels, features in self._chunks():
+            count = min(len(labels), remaining)
+            if count < len(labels):
+                labels, features = labels[:count], _slice_rows(features, 0, count)
+            remaining -= count
+            
+            # Re-batch to exactly batch_size samples
+            lo = 0
+            while lo < count:
+                take = min(self.batch_size - num_buffered, count - lo)
+                buffered_labels.append(labels[lo:lo + take])
+                buffered_features.append(_slice_rows(features, lo, lo + take))
+                num_buffered += take
+                lo += take
+                if num_buffered == self.batch_size:
+                    yield _concat_rows(buffered_labels), _concat_rows(buffered_features)
+                    buffered_labels, buffered_features = [], []
+                    num_buffered = 0
+            
+            if remaining <= 0:
+                break
+        
+        if num_buffered:
+            yield _concat_rows(buffered_labels), _concat_rows(buffered_features)
+
+
+if __name__ == '__main__':
+    # Test: same batches as the serial loader
+    import os
+    import time
+    from src.data.data_loader import create_sample_data
+    from src.data.preprocessing import Preprocessor
+    
+    sample_path = 'data/sample/train.txt'
+    if not os.path.exists(sample_path):
+        create_sample_data(sample_path, num_samples=10000)
+    
+    print("Testing ParallelDataLoader:")
+    serial = list(CriteoDataLoader(sample_path, batch_size=256))
+    parallel = list(ParallelDataLoader(sample_path, batch_size=256, num_workers=2,
+                                       chunk_size=1000))
+    same = all(list(a[0]) == list(b[0]) and a[1] == b[1] for a, b in zip(serial, parallel))
+    print(f"  Batches: {len(parallel)}, same as CriteoDataLoader: {same and len(serial) == len(parallel)}")
+    
+    preprocessor = Preprocessor(num_buckets=2**18)
+    start = time.time()
+    for _, batch in CriteoDataLoader(sample_path, batch_size=256):
+        preprocessor.transform_batch(batch)
+    serial_time = time.time() - start
+    start = time.time()
+    for _ in ParallelDataLoader(sample_path, batch_size=256, num_workers=2,
+                                preprocessor=preprocessor):
+        pass
+    print(f"  Parse + hash: serial {serial_time:.2f}s, 2 workers {time.time() - start:.2f}s")
@@ -4,10 +4,41 @@ Preprocessing Module for CTR Prediction
 Implements Feature Hashing (Hashing Trick) and numerical transformations.
 """
 import math
+import zlib
 import hashlib
 from typing import List, Dict, Optional, Tuple
 import numpy as np
 
+try:
+    import mmh3
+    HAS_MMH3 = True
+except ImportError:
+    HAS_MMH3 = False
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+from src.data.data_loader import TypedBatch
+
+
+def _murmur3(key: bytes) -> int:
+    return mmh3.hash(key, signed=False)
+
+
+def _xxhash(key: bytes) -> int:
+    return xxhash.xxh64_intdigest(key)
+
+
+# Non-cryptographic hash functions: name -> (function, digest bits)
+_FAST_HASHES = {
+    'murmur3': (_murmur3, 32),
+    'xxhash': (_xxhash, 64),
+    'crc32': (zlib.crc32, 32),
+}
+
 
 class FeatureHasher:
     """
@@ -21,7 +52,18 @@ class FeatureHasher:
     Mathematical formulation:
         h(x_i) = hash(feature_name + ":" + feature_value) mod num_buckets
         sign(x_i) = +1 or -1 based on secondary hash (for unbiased estimation)
-        
+    
+    Hash Functions (hash_name):
+        'legacy_md5': bucket from MD5, sign from SHA-256 (the original
+                      scheme; models trained with it need it to score)
+        'murmur3':    32-bit MurmurHash3 (needs the mmh3 package)
+        'xxhash':     64-bit xxHash (needs the xxhash package)
+        'crc32':      zlib CRC-32, always available
+    The fast functions take bucket and sign from one digest: the bucket
+    from the low bits (a mask when num_buckets is a power of 2), the sign
+    from the top bit. Buckets differ between functions, so a model must be
+    trained and scored with the same one.
+    
     Reference:
         Weinberger et al., "Feature Hashing for Large Scale Multitask Learning"
     
@@ -30,18 +72,63 @@ class FeatureHasher:
         sparse_vector = hasher.transform(['cat1:abc', 'cat2:def', 'int1:5'])
     """
     
+    HASHES = ('legacy_md5', 'murmur3', 'xxhash', 'crc32')
+    
     def __init__(self, 
                  num_buckets: int = 2**20,
-                 use_sign: bool = True):
+                 use_sign: bool = True,
+                 hash_name: str = 'legacy_md5'):
         """
         Initialize the feature hasher.
         
         Args:
             num_buckets: Size of hash space (power of 2 recommended)
             use_sign: Whether to use signed hashing (reduces collision bias)
+            hash_name: Hash function (see class docstring)
         """
+        if hash_name not in self.HASHES:
+            raise ValueError(f"Unknown hash '{hash_name}', expected one of {self.HASHES}")
+        if hash_name == 'murmur3' and not HAS_MMH3:
+            raise ImportError("hash_name='murmur3' needs the mmh3 package (pip install mmh3)")
+        if hash_name == 'xxhash' and not HAS_XXHASH:
+            raise ImportError("hash_name='xxhash' needs the xxhash package (pip install xxhash)")
+        
         self.num_buckets = num_buckets
         self.use_sign = use_sign
+        self.hash_name = hash_name
+        
+        if hash_name != 'legacy_md5':
+            self._digest, bits = _FAST_HASHES[hash_name]
+            if num_buckets > 2 ** (bits - 1):
+                raise ValueError(f"'{hash_name}' supports at most 2^{bits - 1} buckets")
+            self._sign_shift = bits - 1
+        # Power-of-two bucket counts reduce with a mask instead of a modulo
+        self._mask = num_buckets - 1 if num_buckets & (num_buckets - 1) == 0 else None
+        
+        self.bias_bucket = self._hash("__BIAS__")
+    
+    def hash_key(self, key: bytes) -> Tuple[int, int]:
+        """
+        Bucket and sign of an encoded feature key.
+        
+        Args:
+            key: UTF-8 encoded 'name:value'
+        
+        Returns:
+            Tuple of (bucket_index, sign)
+        """
+        if self.hash_name == 'legacy_md5':
+            bucket = int.from_bytes(hashlib.md5(key).digest(), 'big') % self.num_buckets
+            # Parity of the SHA-256 digest
+            if self.use_sign and hashlib.sha256(key).digest()[-1] & 1:
+                return bucket, -1
+            return bucket, 1
+        
+        h = self._digest(key)
+        bucket = h & self._mask if self._mask is not None else h % self.num_buckets
+        if self.use_sign and h >> self._sign_shift:
+            return bucket, -1
+        return bucket, 1
     
     def _hash(self, value: str) -> int:
         """
@@ -49,11 +136,11 @@ class FeatureHasher:
         
         Args:
             value: String to hash
-            
+        
         Returns:
             Bucket index in [0, num_buckets)
         """
-        return int(hashlib.md5(value.encode()).hexdigest(), 16) % self.num_buckets
+        return self.hash_key(value.encode())[0]
     
     def _sign(self, value: str) -> int:
         """
@@ -61,15 +148,11 @@ class FeatureHasher:
         
         Args:
             value: String to compute sign for
-            
+        
         Returns:
             +1 or -1
         """
-        if not self.use_sign:
-            return 1
-        # Use different hash function for sign
-        h = int(hashlib.sha256(value.encode()).hexdigest(), 16)
-        return 1 if h % 2 == 0 else -1
+        return self.hash_key(value.encode())[1]
     
     def hash_feature(self, name: str, value: str) -> Tuple[int, int]:
         """
@@ -78,12 +161,44 @@ class FeatureHasher:
         Args:
             name: Feature name (e.g., 'C1', 'I5')
             value: Feature value
-            
+        
         Returns:
             Tuple of (bucket_index, sign)
         """
-        key = f"{name}:{value}"
-        return self._hash(key), self._sign(key)
+        return self.hash_key(f"{name}:{value}".encode())
+    
+    @staticmethod
+    def _splitmix64(x: np.ndarray) -> np.ndarray:
+        """SplitMix64 finalizer over a uint64 array (wrapping arithmetic)."""
+        with np.errstate(over='ignore'):
+            x = x + np.uint64(0x9E3779B97F4A7C15)
+            x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            return x ^ (x >> np.uint64(31))
+    
+    def hash_ids(self, fields: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hash integer (field, value) pairs without building strings.
+        
+        The 64-bit key (field << 32) | (value mod 2^32) is mixed with
+        SplitMix64; the bucket is the hash mod num_buckets and the sign its
+        top bit. Buckets differ from the string hash (hash_feature), so a
+        model must be trained and scored with the same kind of hashing.
+        
+        Args:
+            fields: Field ids (broadcastable against values)
+            values: Integer values (negative values wrap to 32 bits)
+        
+        Returns:
+            Tuple of (int64 bucket indices, float64 signs of +1/-1)
+        """
+        keys = ((np.asarray(fields).astype(np.uint64) << np.uint64(32))
+                | (np.asarray(values).astype(np.int64).astype(np.uint64) & np.uint64(0xFFFFFFFF)))
+        h = self._splitmix64(keys)
+        buckets = (h % np.uint64(self.num_buckets)).astype(np.int64)
+        if not self.use_sign:
+            return buckets, np.ones(buckets.shape)
+        return buckets, 1.0 - 2.0 * (h >> np.uint64(63)).astype(np.float64)
     
     def transform(self, 
                   int_features: List, 
@@ -98,7 +213,7 @@ class FeatureHasher:
             cat_features: List of 26 categorical values
             int_feature_names: Custom names for int features
             cat_feature_names: Custom names for cat features
-            
+        
         Returns:
             Sparse dict {bucket_index: value}
         """
@@ -134,8 +249,7 @@ class FeatureHasher:
             sparse[bucket_idx] = sparse.get(bucket_idx, 0) + sign * 1.0
         
         # Add bias term
-        bias_idx = self._hash("__BIAS__")
-        sparse[bias_idx] = 1.0
+        sparse[self.bias_bucket] = 1.0
         
         return sparse
 
@@ -156,7 +270,7 @@ class LogTransformer:
         
         Args:
             value: Input value
-            
+        
         Returns:
             Transformed value
         """
@@ -172,7 +286,7 @@ class LogTransformer:
         
         Args:
             values: List of input values
-            
+        
         Returns:
             List of transformed values
         """
@@ -229,6 +343,14 @@ class Preprocessor:
     2. Apply log transform to numerical features
     3. Apply feature hashing
     
+    Typed Mode (typed=True):
+        Works on TypedBatch input (int32 integers, uint32 categoricals;
+        see CriteoDataLoader(typed=True)) and hashes integer (field, value)
+        pairs with FeatureHasher.hash_ids, vectorized over the batch. The
+        features are the same as in string mode (log-bucketed integers,
+        '__MISSING__' categoricals as code 0, colliding buckets summed,
+        bias set to 1), only the hash function differs.
+    
     Example:
         preprocessor = Preprocessor(num_buckets=2**18)
         sparse_features = preprocessor.transform(raw_features)
@@ -237,16 +359,29 @@ class Preprocessor:
     NUM_INT_FEATURES = 13
     NUM_CAT_FEATURES = 26
     
-    def __init__(self, num_buckets: int = 2**20, use_sign: bool = True):
+    # Field ids of typed hashing: column numbers of the TSV (bias = 0)
+    _INT_FIELDS = np.arange(1, NUM_INT_FEATURES + 1)
+    _CAT_FIELDS = np.arange(NUM_INT_FEATURES + 1, NUM_INT_FEATURES + NUM_CAT_FEATURES + 1)
+    
+    def __init__(self,
+                 num_buckets: int = 2**20,
+                 use_sign: bool = True,
+                 typed: bool = False,
+                 hash_name: str = 'legacy_md5'):
         """
         Initialize the preprocessor.
         
         Args:
             num_buckets: Hash space size
             use_sign: Use signed hashing
+            typed: Hash TypedBatch integer matrices (see class docstring);
+                loaders must then be opened with typed=True
+            hash_name: Hash function of string features (see FeatureHasher;
+                typed mode always uses hash_ids)
         """
         self.num_buckets = num_buckets
-        self.hasher = FeatureHasher(num_buckets, use_sign)
+        self.typed = typed
+        self.hasher = FeatureHasher(num_buckets, use_sign, hash_name)
         self.missing_handler = MissingValueHandler()
         self.log_transformer = LogTransformer()
     
@@ -256,10 +391,14 @@ class Preprocessor:
         
         Args:
             raw_features: List of 39 feature values (13 int + 26 cat)
-            
+        
         Returns:
             Sparse feature dict
         """
+        if isinstance(raw_features, TypedBatch):
+            indices, values, _ = self.transform_typed(raw_features)
+            return dict(zip(indices.tolist(), values.tolist()))
+        
         # Split features
         int_features = raw_features[:self.NUM_INT_FEATURES]
         cat_features = raw_features[self.NUM_INT_FEATURES:]
@@ -277,6 +416,103 @@ class Preprocessor:
         
         # Apply feature hashing
         return self.hasher.transform(processed_int, processed_cat)
+    
+    def transform_batch(self, raw_batch: List[List]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Transform a batch of raw feature lists to a CSR sparse batch.
+        
+        Args:
+            raw_batch: List of raw feature lists (as yielded by CriteoDataLoader)
+                or a ColumnarBatch (as yielded by ColumnarDataLoader)
+        
+        Returns:
+            Tuple of (indices, values, indptr) where row r occupies
+            indices[indptr[r]:indptr[r+1]]
+        """
+        if isinstance(raw_batch, TypedBatch):
+            return self.transform_typed(raw_batch)
+        if hasattr(raw_batch, 'to_rows'):
+            raw_batch = raw_batch.to_rows()
+        
+        indices = []
+        values = []
+        indptr = [0]
+        for raw_features in raw_batch:
+            sparse = self.transform(raw_features)
+            indices.extend(sparse.keys())
+            values.extend(sparse.values())
+            indptr.append(len(indices))
+        
+        return (np.array(indices, dtype=np.int64),
+                np.array(values, dtype=np.float64),
+                np.array(indptr, dtype=np.int64))
+    
+    def transform_typed(self, batch: TypedBatch) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized hashing of a TypedBatch to a CSR sparse batch.
+        
+        Args:
+            batch: TypedBatch of integer matrices
+        
+        Returns:
+            Tuple of (indices, values, indptr); within a row the indices are
+            sorted and distinct
+        """
+        num_rows = len(batch)
+        ints = batch.ints.astype(np.float64)
+        
+        # Integers: same transform as transform() (log1p applied by both the
+        # preprocessor and the hasher for positive values); -1 is missing
+        present = ~batch.int_missing & (batch.ints != -1)
+        int_rows, int_cols = np.nonzero(present)
+        int_values = ints[int_rows, int_cols]
+        positive = int_values > 0
+        int_values[positive] = np.log1p(np.log1p(int_values[positive]))
+        int_buckets, int_signs = self.hasher.hash_ids(self._INT_FIELDS[int_cols],
+                                                      np.trunc(int_values))
+        
+        # Categoricals: every field is present, code 0 is the missing token
+        cat_buckets, cat_signs = self.hasher.hash_ids(self._CAT_FIELDS, batch.cats)
+        
+        rows = np.concatenate([int_rows, np.repeat(np.arange(num_rows), self.NUM_CAT_FEATURES)])
+        buckets = np.concatenate([int_buckets, cat_buckets.ravel()])
+        values = np.concatenate([int_signs * int_values, cat_signs.ravel()])
+        
+        # The bias overwrites whatever collides with it
+        bias_bucket = int(self.hasher.hash_ids(0, 0)[0])
+        keep = buckets != bias_bucket
+        rows = np.concatenate([rows[keep], np.arange(num_rows)])
+        buckets = np.concatenate([buckets[keep], np.full(num_rows, bias_bucket)])
+        values = np.concatenate([values[keep], np.ones(num_rows)])
+        
+        # Sum colliding buckets within each row
+        keys, inverse = np.unique(rows * self.num_buckets + buckets, return_inverse=True)
+        summed = np.bincount(inverse, weights=values, minlength=len(keys))
+        indptr = np.zeros(num_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // self.num_buckets, minlength=num_rows), out=indptr[1:])
+        return keys % self.num_buckets, summed, indptr
+    
+    def iter_rows(self, raw_batch):
+        """
+        Sparse feature dicts of every row of a loader batch (any batch kind).
+        
+        Args:
+            raw_batch: Raw feature lists, ColumnarBatch or TypedBatch
+        
+        Yields:
+            Sparse feature dict per row
+        """
+        if isinstance(raw_batch, TypedBatch):
+            indices, values, indptr = self.transform_typed(raw_batch)
+            bounds = indptr.tolist()
+            indices, values = indices.tolist(), values.tolist()
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                yield dict(zip(indices[lo:hi], values[lo:hi]))
+            return
+        if hasattr(raw_batch, 'to_rows'):
+            raw_batch = raw_batch.to_rows()
+        for raw_features in raw_batch:
+            yield self.transform(raw_features)
 
 
 if __name__ == '__main__':
@@ -294,3 +530,13 @@ if __name__ == '__main__':
     print(f"  Input: {len(sample_features)} features")
     print(f"  Output: {len(sparse)} non-zero buckets")
     print(f"  Sample buckets: {list(sparse.items())[:5]}")
+    
+    # Typed mode: integer matrices hashed without strings
+    print("\nTesting typed Preprocessor:")
+    typed_batch = TypedBatch(
+        np.array([[1, 5, 0, 100, 50, 0, 0, 3, 2, 1, 0, 8, 10]], dtype=np.int32),
+        np.array([[v == '' for v in sample_int]]),
+        np.array([[0xabc123, 0xdef456, 0, 0x789abc] + [0] * 22], dtype=np.uint32))
+    typed = Preprocessor(num_buckets=2**18, typed=True)
+    indices, values, indptr = typed.transform_batch(typed_batch)
+    print(f"  Output: {len(indices)} non-zero buckets (string mode: {len(sparse)})")
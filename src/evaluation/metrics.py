@@ -166,6 +166,56 @@ class RunningMetrics:
         if len(self.recent_losses) > self.window_size:
             self.recent_losses.pop(0)
     
+    def update_batch(self, y_true, y_pred, threshold: float = 0.5):
+        """
+        Update metrics with a batch of predictions.
+        
+        Equivalent to calling update() for every pair, with the loss and
+        accuracy terms computed as arrays.
+        
+        Args:
+            y_true: Array-like of true labels
+            y_pred: Array-like of predicted probabilities
+            threshold: Classification threshold
+        """
+        y_true = np.asarray(y_true, dtype=np.int64)
+        y_pred = np.asarray(y_pred, dtype=np.float64)
+        if len(y_true) == 0:
+            return
+        
+        eps = 1e-15
+        clipped = np.clip(y_pred, eps, 1 - eps)
+        losses = -(y_true * np.log(clipped) + (1 - y_true) * np.log(1 - clipped))
+        pred_labels = (y_pred >= threshold).astype(np.int64)
+        
+        self.total_loss += float(losses.sum())
+        self.total_correct += int(np.count_nonzero(pred_labels == y_true))
+        self.total_positive_true += int(y_true.sum())
+        self.total_positive_pred += int(pred_labels.sum())
+        self.count += len(y_true)
+        
+        # Keep only the most recent window_size losses
+        self.recent_losses.extend(losses[-self.window_size:].tolist())
+        if len(self.recent_losses) > self.window_size:
+            del self.recent_losses[:len(self.recent_losses) - self.window_size]
+    
+    def merge(self, other: 'RunningMetrics'):
+        """
+        Add the totals of another tracker (e.g. from a parallel worker).
+        
+        Args:
+            other: RunningMetrics computed on a disjoint set of samples
+        """
+        self.total_loss += other.total_loss
+        self.total_correct += other.total_correct
+        self.total_positive_true += other.total_positive_true
+        self.total_positive_pred += other.total_positive_pred
+        self.count += other.count
+        
+        self.recent_losses.extend(other.recent_losses)
+        if len(self.recent_losses) > self.window_size:
+            del self.recent_losses[:len(self.recent_losses) - self.window_size]
+    
     def compute(self) -> Dict[str, float]:
         """
         Compute all metrics.
@@ -1,2 +1,3 @@
 # Training Module
-from .trainer import StreamingTrainer
+from .trainer import StreamingTrainer, MultiModelTrainer
+from .parallel import HogwildTrainer
@@ -0,0 +1,156 @@
+"""
+Checkpoint Module
+
+Incremental (delta) checkpointing of FTRL-Proximal state.
+"""
+import os
+import re
+from typing import List, Optional, Tuple
+
+from src.algorithms.ftrl import FTRLProximal
+
+
+class CheckpointManager:
+    """
+    Base snapshots plus delta files for long streaming runs.
+    
+    The first save() writes a full base snapshot. Later calls write a delta
+    holding only the coordinates changed since the previous checkpoint, so
+    checkpoint I/O scales with traffic instead of model size. Every
+    compact_every deltas a new base is written and the older files are
+    removed. load() rebuilds the latest state from the base and its deltas.
+    
+    Directory layout:
+        base-000000.bin
+        delta-000000-000001.bin   (base 0, checkpoint 1)
+        delta-000000-000002.bin
+        ...
+    
+    Example:
+        manager = CheckpointManager('checkpoints/ftrl', compact_every=10)
+        for step, (features, label) in enumerate(stream):
+            model.update(features, label)
+            if step % 100000 == 0:
+                manager.save(model)
+        
+        model = manager.load()
+    """
+    
+    _BASE = re.compile(r'^base-(\d+)\.bin$')
+    _DELTA = re.compile(r'^delta-(\d+)-(\d+)\.bin$')
+    
+    def __init__(self, directory: str, compact_every: int = 10):
+        """
+        Initialize the manager.
+        
+        Args:
+            directory: Checkpoint directory (created if missing)
+            compact_every: Number of deltas after which a new base is written
+        """
+        self.directory = directory
+        self.compact_every = compact_every
+        os.makedirs(directory, exist_ok=True)
+        
+        # Position of the latest checkpoint written by this manager. The
+        # sequence continues after anything already on disk, so a new base
+        # always supersedes older files.
+        self._base_seq: Optional[int] = None
+        self._num_deltas = 0
+        base_seq, deltas = self._scan()
+        self._seq = -1 if base_seq is None else max([base_seq] + [seq for seq, _ in deltas])
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+    
+    def _scan(self) -> Tuple[Optional[int], List[Tuple[int, str]]]:
+        """
+        Find the latest base and its deltas on disk.
+        
+        Returns:
+            Tuple of (base sequence or None, sorted list of (seq, delta filename))
+        """
+        bases = []
+        deltas = []
+        for name in os.listdir(self.directory):
+            match = self._BASE.match(name)
+            if match:
+                bases.append(int(match.group(1)))
+                continue
+            match = self._DELTA.match(name)
+            if match:
+                deltas.append((int(match.group(1)), int(match.group(2)), name))
+        
+        if not bases:
+            return None, []
+        base_seq = max(bases)
+        return base_seq, sorted((seq, name) for base, seq, name in deltas if base == base_seq)
+    
+    def _write(self, name: str, writer) -> str:
+        """Write through a temporary file so a crash never leaves a partial checkpoint."""
+        path = self._path(name)
+        tmp_path = path + '.tmp'
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+        return path
+    
+    def save(self, model: FTRLProximal) -> str:
+        """
+        Checkpoint the model (base snapshot or delta).
+        
+        Args:
+            model: Model to checkpoint; change tracking is enabled on it
+        
+        Returns:
+            Path of the file written
+        """
+        needs_base = (self._base_seq is None
+                      or model._dirty is None
+                      or self._num_deltas >= self.compact_every)
+        
+        self._seq += 1
+        if needs_base:
+            path = self._write(f'base-{self._seq:06d}.bin', model.save)
+            model.track_changes()
+            self._base_seq = self._seq
+            self._num_deltas = 0
+            self._remove_superseded()
+            return path
+        
+        path = self._write(f'delta-{self._base_seq:06d}-{self._seq:06d}.bin', model.save_delta)
+        self._num_deltas += 1
+        return path
+    
+    def _remove_superseded(self):
+        """Delete bases and deltas older than the current base."""
+        for name in os.listdir(self.directory):
+            match = self._BASE.match(name) or self._DELTA.match(name)
+            if match and int(match.group(1)) < self._base_seq:
+                os.remove(self._path(name))
+    
+    def exists(self) -> bool:
+        """Whether the directory holds a checkpoint."""
+        return self._scan()[0] is not None
+    
+    def load(self) -> FTRLProximal:
+        """
+        Rebuild the latest state: base snapshot plus its deltas in order.
+        
+        The manager continues the same sequence, so the next save() appends
+        a delta to the loaded state.
+        
+        Returns:
+            FTRLProximal model with change tracking enabled
+        """
+        base_seq, deltas = self._scan()
+        if base_seq is None:
+            raise FileNotFoundError(f"No checkpoint found in {self.directory}")
+        
+        model = FTRLProximal.load(self._path(f'base-{base_seq:06d}.bin'))
+        for _, name in deltas:
+            model.apply_delta(self._path(name))
+        model.track_changes()
+        
+        self._base_seq = base_seq
+        self._seq = deltas[-1][0] if deltas else base_seq
+        self._num_deltas = len(deltas)
+        return model
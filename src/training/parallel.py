@@ -0,0 +1,229 @@
+"""
+Parallel Training Module
+
+Hogwild-style multi-process training for FTRL-Proximal.
+
+Reference:
+    Niu et al., "Hogwild!: A Lock-Free Approach to Parallelizing
+    Stochastic Gradient Descent" (2011)
+"""
+import time
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Optional, Dict, List, Tuple
+
+import numpy as np
+
+from src.data.data_loader import open_loader
+from src.data.preprocessing import Preprocessor
+from src.algorithms.ftrl import FTRLProximal
+from src.evaluation.metrics import RunningMetrics
+
+
+def _attach_arrays(shm_names: List[str],
+                   num_features: int,
+                   dtype: str) -> Tuple[List[shared_memory.SharedMemory], List[np.ndarray]]:
+    """
+    Attach to the shared z/n/w blocks and view them as NumPy arrays.
+    
+    Returns:
+        Tuple of (shared memory handles, arrays); the handles must stay
+        referenced for as long as the arrays are used
+    """
+    blocks = [shared_memory.SharedMemory(name=name) for name in shm_names]
+    arrays = [np.ndarray((num_features,), dtype=dtype, buffer=block.buf) for block in blocks]
+    return blocks, arrays
+
+
+def _hogwild_worker(worker_id: int,
+                    num_workers: int,
+                    train_path: str,
+                    shm_names: List[str],
+                    num_features: int,
+                    dtype: str,
+                    params: Dict,
+                    preprocessor: Preprocessor,
+                    max_samples: Optional[int],
+                    batch_size: int,
+                    result_queue):
+    """
+    Train on one shard of the input, writing straight into shared state.
+    
+    Updates are applied without any locking: concurrent writes to the same
+    coordinate may overwrite each other, which Hogwild tolerates because
+    each sample only touches a few dozen of the num_features coordinates.
+    """
+    blocks, (z, n, w) = _attach_arrays(shm_names, num_features, dtype)
+    try:
+        model = FTRLProximal.from_arrays(z, n, w, **params)
+        loader = open_loader(train_path,
+                             batch_size=batch_size,
+                             max_samples=max_samples,
+                             shard_index=worker_id,
+                             num_shards=num_workers,
+                             typed=preprocessor.typed)
+        metrics = RunningMetrics()
+        
+        for labels, raw_batch in loader:
+            if batch_size > 1:
+                indices, values, indptr = preprocessor.transform_batch(raw_batch)
+                preds = model.update_batch(indices, values, indptr, labels)
+                metrics.update_batch(labels, preds)
+            else:
+                for label, features in zip(labels, preprocessor.iter_rows(raw_batch)):
+                    pred = model.update(features, label)
+                    metrics.update(label, pred)
+        
+        # Drop the recent-window list, only the totals are merged
+        metrics.recent_losses = []
+        result_queue.put((worker_id, metrics))
+    finally:
+        # Release every view of the shared buffers before closing them
+        model = loader = z = n = w = None
+        for block in blocks:
+            block.close()
+
+
+class HogwildTrainer:
+    """
+    Multi-process FTRL training over shared memory.
+    
+    The z, n and weight arrays of a 'dense' FTRLProximal are placed in
+    multiprocessing.shared_memory. Each worker process reads its own shard
+    of the input (parsing and hashing in parallel), and applies lock-free
+    FTRL updates to the shared arrays. Shards are byte ranges of a text
+    file or whole parts of a split directory, so no worker scans the
+    others' data (a single .gz file is the exception, see iter_lines).
+    At the end the shared state is copied into a normal FTRLProximal
+    model.
+    
+    Throughput scaling with num_workers is unverified: it has only been
+    benchmarked on a single core, where extra workers cannot add
+    throughput and, with small batches (the default batch_size=1), the
+    process and shared-memory overhead usually makes training slower than
+    StreamingTrainer (see benchmarks/bench_hogwild.py).
+    
+    Example:
+        trainer = HogwildTrainer(num_workers=8, num_features=2**20,
+                                 alpha=0.1, beta=1.0, L1=1.0, L2=1.0)
+        model, metrics = trainer.train('data/train.txt')
+        model.save('models/ftrl.bin')
+    """
+    
+    def __init__(self,
+                 num_workers: int = 4,
+                 num_features: int = 2**20,
+                 alpha: float = 0.1,
+                 beta: float = 1.0,
+                 L1: float = 1.0,
+                 L2: float = 1.0,
+                 dtype: str = 'float64',
+                 preprocessor: Optional[Preprocessor] = None,
+                 batch_size: int = 1):
+        """
+        Initialize the trainer.
+        
+        Args:
+            num_workers: Number of worker processes
+            num_features: Model dimension (must cover the hash space)
+            alpha, beta, L1, L2: FTRL hyperparameters
+            dtype: Float type of the shared arrays
+            preprocessor: Feature preprocessor (default: Preprocessor(num_features))
+            batch_size: Per-worker mini-batch size (1 = per-sample updates)
+        """
+        self.num_workers = num_workers
+        self.num_features = num_features
+        self.params = {'alpha': alpha, 'beta': beta, 'L1': L1, 'L2': L2}
+        self.dtype = np.dtype(dtype).name
+        self.preprocessor = preprocessor or Preprocessor(num_buckets=num_features)
+        self.batch_size = batch_size
+        
+        if self.preprocessor.num_buckets > num_features:
+            raise ValueError("num_features must be >= the preprocessor's num_buckets")
+    
+    def train(self,
+              train_path: str,
+              max_samples: Optional[int] = None) -> Tuple[FTRLProximal, Dict]:
+        """
+        Train with num_workers processes.
+        
+        Args:
+            train_path: Path to training data file
+            max_samples: Maximum samples to train on in total (None = all)
+        
+        Returns:
+            Tuple of (trained FTRLProximal model, merged training metrics)
+        """
+        print(f"Starting Hogwild training on {train_path} with {self.num_workers} workers")
+        
+        nbytes = self.num_features * np.dtype(self.dtype).itemsize
+        blocks = [shared_memory.SharedMemory(create=True, size=nbytes) for _ in range(3)]
+        
+        try:
+            for block in blocks:
+                np.ndarray((self.num_features,), dtype=self.dtype, buffer=block.buf)[:] = 0
+            
+            per_worker = None
+            if max_samples:
+                per_worker = -(-max_samples // self.num_workers)
+            
+            start_time = time.time()
+            result_queue = mp.Queue()
+            workers = [
+                mp.Process(target=_hogwild_worker,
+                           args=(worker_id, self.num_workers, train_path,
+                                 [block.name for block in blocks],
+                                 self.num_features, self.dtype, self.params,
+                                 self.preprocessor, per_worker, self.batch_size,
+                                 result_queue))
+                for worker_id in range(self.num_workers)
+            ]
+            for worker in workers:
+                worker.start()
+            
+            # Collect results before joining so a full queue cannot block exit
+            metrics = RunningMetrics()
+            num_results = 0
+            while num_results < len(workers):
+                try:
+                    _, worker_metrics = result_queue.get(timeout=1.0)
+                except queue.Empty:
+                    failed = [w.exitcode for w in workers if w.exitcode not in (None, 0)]
+                    if failed:
+                        for worker in workers:
+                            worker.terminate()
+                        raise RuntimeError(f"Hogwild worker exited with code {failed[0]}")
+                    continue
+                metrics.merge(worker_metrics)
+                num_results += 1
+            for worker in workers:
+                worker.join()
+            
+            total_time = time.time() - start_time
+            
+            # Copy the shared state into a regular model
+            z, n, w = (np.array(np.ndarray((self.num_features,), dtype=self.dtype,
+                                           buffer=block.buf))
+                       for block in blocks)
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        
+        model = FTRLProximal.from_arrays(z, n, w, **self.params)
+        model.num_updates = metrics.count
+        
+        final_metrics = metrics.compute()
+        final_metrics['time'] = total_time
+        final_metrics['samples_per_sec'] = metrics.count / total_time if total_time > 0 else 0.0
+        
+        print("=" * 60)
+        print("Hogwild Training Complete!")
+        print(f"  Total samples: {metrics.count:,}")
+        print(f"  Total time: {total_time:.1f}s")
+        print(f"  Speed: {final_metrics['samples_per_sec']:.0f} samples/s")
+        print(f"  Final Log-Loss: {final_metrics['log_loss']:.4f}")
+        print(f"  Model: {model}")
+        
+        return model, final_metrics
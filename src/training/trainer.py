@@ -8,11 +8,30 @@ import time
 from typing import Optional, Dict, List, Callable
 from tqdm import tqdm
 
-from src.data.data_loader import CriteoDataLoader, StreamingIterator
+from src.data.data_loader import StreamingIterator, count_lines, open_loader
+from src.data.columnar import ColumnarCache
+from src.data.fused import FusedDataLoader
+from src.data.parallel_loader import ParallelDataLoader
 from src.data.preprocessing import Preprocessor
 from src.algorithms.ftrl import FTRLProximal
 from src.algorithms.online_logistic import OnlineLogisticRegression
 from src.evaluation.metrics import RunningMetrics
+from src.training.checkpoint import CheckpointManager
+
+
+def _progress_total(path: str, max_samples: Optional[int], start_line: int = 0) -> Optional[int]:
+    """
+    Progress bar total: max_samples, else the number of lines left in the
+    data if a line index already exists (never built just for the bar),
+    else None. Lines the loader rejects yield no sample, so the bar may
+    stop short of the total.
+    """
+    if max_samples:
+        return max_samples
+    num_lines = count_lines(path, build=False)
+    if num_lines is None:
+        return None
+    return max(num_lines - start_line, 0)
 
 
 class StreamingTrainer:
@@ -33,14 +52,21 @@ class StreamingTrainer:
         )
         
         metrics = trainer.train('data/train.txt', max_samples=1000000)
-        trainer.save_model('models/ftrl.pkl')
+        trainer.save_model('models/ftrl.bin')
     """
     
     def __init__(self,
                  model,
                  preprocessor: Optional[Preprocessor] = None,
                  log_interval: int = 10000,
-                 eval_interval: int = 50000):
+                 eval_interval: int = 50000,
+                 batch_size: int = 1,
+                 checkpoint_manager: Optional[CheckpointManager] = None,
+                 checkpoint_interval: int = 100000,
+                 parse_workers: int = 0,
+                 queue_depth: int = 8,
+                 prefetch: int = 0,
+                 fused: bool = False):
         """
         Initialize the trainer.
         
@@ -49,11 +75,41 @@ class StreamingTrainer:
             preprocessor: Feature preprocessor (default: Preprocessor())
             log_interval: How often to log progress (in samples)
             eval_interval: How often to evaluate (in samples)
+            batch_size: Mini-batch size. Values > 1 use the model's
+                update_batch/predict_batch (CSR batches) when available
+            checkpoint_manager: Optional CheckpointManager for periodic
+                base/delta checkpoints of an FTRL model
+            checkpoint_interval: How often to checkpoint (in samples)
+            parse_workers: Parse and hash text input in this many worker
+                processes (ParallelDataLoader), leaving only the model
+                update to this process. 0 = parse in-process. Columnar
+                caches are always read in-process.
+            queue_depth: Parsed chunks the workers may run ahead
+            prefetch: Read, inflate and split in-process text input in a
+                background thread, up to this many line blocks ahead
+                (0 = read in the training loop)
+            fused: Parse and hash text input with the fused byte-level
+                path (FusedDataLoader; same features as the preprocessor,
+                which must be in string mode). Runs in-process, so it
+                cannot be combined with parse_workers
         """
+        if fused and parse_workers > 0:
+            raise ValueError("fused parsing runs in-process; set parse_workers=0 to use it")
+        
         self.model = model
         self.preprocessor = preprocessor or Preprocessor()
         self.log_interval = log_interval
         self.eval_interval = eval_interval
+        self.batch_size = batch_size
+        self.checkpoint_manager = checkpoint_manager
+        self.checkpoint_interval = checkpoint_interval
+        self.parse_workers = parse_workers
+        self.queue_depth = queue_depth
+        self.prefetch = prefetch
+        self.fused = fused
+        
+        # Loader of the current pass, for its prefetch statistics
+        self._loader = None
         
         # Training history
         self.history: Dict[str, List] = {
@@ -66,7 +122,8 @@ class StreamingTrainer:
     def train(self,
               train_path: str,
               max_samples: Optional[int] = None,
-              callback: Optional[Callable] = None) -> Dict:
+              callback: Optional[Callable] = None,
+              start_line: int = 0) -> Dict:
         """
         Train the model on streaming data.
         
@@ -74,7 +131,9 @@ class StreamingTrainer:
             train_path: Path to training data file
             max_samples: Maximum samples to train on (None = all)
             callback: Optional callback function(metrics) called at log_interval
-            
+            start_line: Start reading a text data file at this line, e.g.
+                to continue an interrupted run from a checkpoint
+        
         Returns:
             Final metrics dictionary
         """
@@ -83,17 +142,18 @@ class StreamingTrainer:
         print(f"Hash buckets: {self.preprocessor.num_buckets}")
         print("-" * 60)
         
-        iterator = StreamingIterator(train_path, max_samples=max_samples)
+        if self._use_batches():
+            return self._train_batches(train_path, max_samples, callback, start_line)
+        
         metrics = RunningMetrics()
         
         start_time = time.time()
         sample_count = 0
         
         # Use tqdm for progress bar
-        for label, raw_features in tqdm(iterator, desc="Training", total=max_samples):
-            # Preprocess features
-            features = self.preprocessor.transform(raw_features)
-            
+        for label, features in tqdm(self._samples(train_path, max_samples, start_line),
+                                    desc="Training",
+                                    total=_progress_total(train_path, max_samples, start_line)):
             # Update model and get prediction
             pred = self.model.update(features, label)
             
@@ -103,28 +163,159 @@ class StreamingTrainer:
             
             # Logging
             if sample_count % self.log_interval == 0:
-                elapsed = time.time() - start_time
-                current_metrics = metrics.compute()
-                
-                self.history['log_loss'].append(current_metrics['log_loss'])
-                self.history['accuracy'].append(current_metrics['accuracy'])
-                self.history['samples'].append(sample_count)
-                self.history['time'].append(elapsed)
+                self._log_progress(sample_count, metrics, start_time, callback)
+            
+            if self.checkpoint_manager and sample_count % self.checkpoint_interval == 0:
+                self.checkpoint_manager.save(self.model)
+        
+        return self._finish_training(metrics, sample_count, start_time)
+    
+    def _use_batches(self) -> bool:
+        """Whether to run the mini-batch (CSR) path."""
+        return self.batch_size > 1 and hasattr(self.model, 'update_batch')
+    
+    def _parallel(self, path: str) -> bool:
+        """Whether to parse path in worker processes."""
+        return self.parse_workers > 0 and not ColumnarCache.exists(path)
+    
+    def _fused(self, path: str, start_line: int) -> bool:
+        """Whether to read path with FusedDataLoader."""
+        if not self.fused or ColumnarCache.exists(path):
+            return False
+        if start_line:
+            raise ValueError("start_line is not supported with fused parsing")
+        return True
+    
+    def _hashed_batches(self,
+                        path: str,
+                        max_samples: Optional[int],
+                        batch_size: int,
+                        start_line: int = 0):
+        """
+        Yield (labels, (indices, values, indptr)) CSR batches.
+        
+        Parsed and hashed by ParallelDataLoader workers when parse_workers
+        > 0, otherwise in this process (by FusedDataLoader when fused).
+        """
+        if self._fused(path, start_line):
+            loader = FusedDataLoader(path, self.preprocessor, batch_size=batch_size,
+                                     max_samples=max_samples)
+            self._loader = loader
+            yield from loader
+            return
+        
+        if self._parallel(path):
+            yield from ParallelDataLoader(path, batch_size=batch_size, max_samples=max_samples,
+                                          num_workers=self.parse_workers,
+                                          queue_depth=self.queue_depth,
+                                          preprocessor=self.preprocessor,
+                                          typed=self.preprocessor.typed,
+                                          start_line=start_line)
+            return
+        
+        loader = open_loader(path, batch_size=batch_size, max_samples=max_samples,
+                             typed=self.preprocessor.typed, start_line=start_line,
+                             prefetch=self.prefetch)
+        self._loader = loader
+        for labels, raw_batch in loader:
+            yield labels, self.preprocessor.transform_batch(raw_batch)
+    
+    def _samples(self, path: str, max_samples: Optional[int], start_line: int = 0):
+        """Yield (label, sparse feature dict) one sample at a time."""
+        if self._parallel(path):
+            for labels, (indices, values, indptr) in self._hashed_batches(
+                    path, max_samples, 4096, start_line):
+                bounds = indptr.tolist()
+                indices, values = indices.tolist(), values.tolist()
+                for label, lo, hi in zip(labels.tolist(), bounds[:-1], bounds[1:]):
+                    yield label, dict(zip(indices[lo:hi], values[lo:hi]))
+            return
+        
+        if self._fused(path, start_line):
+            loader = FusedDataLoader(path, self.preprocessor, max_samples=max_samples)
+            self._loader = loader
+            yield from loader.iter_samples()
+            return
+        
+        iterator = StreamingIterator(path, max_samples=max_samples, typed=self.preprocessor.typed,
+                                     start_line=start_line, prefetch=self.prefetch)
+        self._loader = iterator.loader
+        for label, raw_features in iterator:
+            yield label, self.preprocessor.transform(raw_features)
+    
+    def _train_batches(self,
+                       train_path: str,
+                       max_samples: Optional[int],
+                       callback: Optional[Callable],
+                       start_line: int = 0) -> Dict:
+        """
+        Mini-batch training loop: one update_batch call per loader batch.
+        """
+        metrics = RunningMetrics()
+        
+        start_time = time.time()
+        sample_count = 0
+        
+        total = _progress_total(train_path, max_samples, start_line)
+        with tqdm(desc="Training", total=total, unit=" samples") as progress:
+            for labels, (indices, values, indptr) in self._hashed_batches(
+                    train_path, max_samples, self.batch_size, start_line):
+                preds = self.model.update_batch(indices, values, indptr, labels)
+                metrics.update_batch(labels, preds)
                 
-                print(f"\n[{sample_count:,}] "
-                      f"Loss: {current_metrics['log_loss']:.4f}, "
-                      f"Acc: {current_metrics['accuracy']:.4f}, "
-                      f"Time: {elapsed:.1f}s, "
-                      f"Speed: {sample_count/elapsed:.0f} samples/s")
+                prev_count = sample_count
+                sample_count += len(labels)
+                progress.update(len(labels))
                 
-                if hasattr(self.model, 'sparsity'):
-                    nonzero, total, sparsity = self.model.sparsity()
-                    print(f"      Sparsity: {sparsity:.2%} ({nonzero:,}/{total:,} non-zero)")
+                # Log whenever a log_interval boundary is crossed
+                if sample_count // self.log_interval > prev_count // self.log_interval:
+                    self._log_progress(sample_count, metrics, start_time, callback)
                 
-                if callback:
-                    callback(current_metrics)
+                if (self.checkpoint_manager and
+                        sample_count // self.checkpoint_interval > prev_count // self.checkpoint_interval):
+                    self.checkpoint_manager.save(self.model)
+        
+        return self._finish_training(metrics, sample_count, start_time)
+    
+    def _log_progress(self,
+                      sample_count: int,
+                      metrics: RunningMetrics,
+                      start_time: float,
+                      callback: Optional[Callable]):
+        """Record history and print a progress line."""
+        elapsed = time.time() - start_time
+        current_metrics = metrics.compute()
         
-        # Final metrics
+        self.history['log_loss'].append(current_metrics['log_loss'])
+        self.history['accuracy'].append(current_metrics['accuracy'])
+        self.history['samples'].append(sample_count)
+        self.history['time'].append(elapsed)
+        
+        print(f"\n[{sample_count:,}] "
+              f"Loss: {current_metrics['log_loss']:.4f}, "
+              f"Acc: {current_metrics['accuracy']:.4f}, "
+              f"Time: {elapsed:.1f}s, "
+              f"Speed: {sample_count/elapsed:.0f} samples/s")
+        
+        if hasattr(self.model, 'sparsity'):
+            nonzero, total, sparsity = self.model.sparsity()
+            print(f"      Sparsity: {sparsity:.2%} ({nonzero:,}/{total:,} non-zero)")
+        
+        eviction = getattr(self.model, 'eviction', None)
+        if eviction is not None:
+            stats = eviction.stats()
+            print(f"      Evicted: {stats['evicted_total']:,} "
+                  f"(budget {stats['evicted_budget']:,}, ttl {stats['evicted_ttl']:,}, "
+                  f"zero {stats['evicted_zero']:,})")
+        
+        if callback:
+            callback(current_metrics)
+    
+    def _finish_training(self,
+                         metrics: RunningMetrics,
+                         sample_count: int,
+                         start_time: float) -> Dict:
+        """Print the training summary and return the final metrics."""
         final_metrics = metrics.compute()
         total_time = time.time() - start_time
         
@@ -135,6 +326,15 @@ class StreamingTrainer:
         print(f"  Final Log-Loss: {final_metrics['log_loss']:.4f}")
         print(f"  Final Accuracy: {final_metrics['accuracy']:.4f}")
         
+        prefetcher = getattr(self._loader, 'prefetcher', None)
+        if prefetcher is not None:
+            print(f"  Input wait: {prefetcher.wait_time:.1f}s "
+                  f"({prefetcher.num_waits:,} waits for {prefetcher.num_items:,} line blocks)")
+        
+        timings = getattr(self._loader, 'timings', None)
+        if timings and any(timings.values()):
+            print(f"  Input: read {timings['read']:.1f}s, parse + hash {timings['parse_hash']:.1f}s")
+        
         return final_metrics
     
     def evaluate(self, test_path: str, max_samples: Optional[int] = None) -> Dict:
@@ -144,25 +344,37 @@ class StreamingTrainer:
         Args:
             test_path: Path to test data file
             max_samples: Maximum samples to evaluate on
-            
+        
         Returns:
             Evaluation metrics dictionary
         """
         print(f"Evaluating on {test_path}")
         
-        iterator = StreamingIterator(test_path, max_samples=max_samples)
         metrics = RunningMetrics()
         
         predictions = []
         labels = []
         
-        for label, raw_features in tqdm(iterator, desc="Evaluating", total=max_samples):
-            features = self.preprocessor.transform(raw_features)
-            pred = self.model.predict(features)
-            
-            predictions.append(pred)
-            labels.append(label)
-            metrics.update(label, pred)
+        if self.batch_size > 1 and hasattr(self.model, 'predict_batch'):
+            total = _progress_total(test_path, max_samples)
+            with tqdm(desc="Evaluating", total=total, unit=" samples") as progress:
+                for batch_labels, (indices, values, indptr) in self._hashed_batches(
+                        test_path, max_samples, self.batch_size):
+                    preds = self.model.predict_batch(indices, values, indptr)
+                    
+                    predictions.extend(preds.tolist())
+                    labels.extend(batch_labels)
+                    metrics.update_batch(batch_labels, preds)
+                    progress.update(len(batch_labels))
+        else:
+            for label, features in tqdm(self._samples(test_path, max_samples),
+                                        desc="Evaluating",
+                                        total=_progress_total(test_path, max_samples)):
+                pred = self.model.predict(features)
+                
+                predictions.append(pred)
+                labels.append(label)
+                metrics.update(label, pred)
         
         final_metrics = metrics.compute()
         
@@ -193,6 +405,227 @@ class StreamingTrainer:
         return self.history
 
 
+class MultiModelTrainer:
+    """
+    Train and evaluate several models on a single pass over the data.
+    
+    Each sample (or mini-batch) is read, parsed and hashed once and then
+    fed to every model, so comparing or sweeping K models costs one data
+    pass plus K model updates instead of K full passes. Every model keeps
+    its own running metrics, history and update time.
+    
+    Example:
+        trainer = MultiModelTrainer({
+            'ftrl_l1_0.5': FTRLProximal(L1=0.5),
+            'ftrl_l1_1.0': FTRLProximal(L1=1.0),
+            'online_lr': OnlineLogisticRegression(),
+        })
+        
+        train_metrics = trainer.train('data/train.txt', max_samples=1000000)
+        test_metrics = trainer.evaluate('data/test.txt')
+        print(test_metrics['ftrl_l1_0.5']['log_loss'])
+    """
+    
+    def __init__(self,
+                 models: Dict[str, object],
+                 preprocessor: Optional[Preprocessor] = None,
+                 log_interval: int = 10000,
+                 batch_size: int = 1):
+        """
+        Initialize the trainer.
+        
+        Args:
+            models: Models by name (FTRLProximal, OnlineLogisticRegression, ...)
+            preprocessor: Feature preprocessor shared by all models
+            log_interval: How often to log progress (in samples)
+            batch_size: Mini-batch size. Values > 1 use CSR batches when
+                every model has update_batch/predict_batch
+        """
+        if not models:
+            raise ValueError("At least one model is required")
+        self.models = dict(models)
+        self.preprocessor = preprocessor or Preprocessor()
+        self.log_interval = log_interval
+        self.batch_size = batch_size
+        
+        # Training history per model
+        self.history: Dict[str, Dict[str, List]] = {
+            name: {'log_loss': [], 'accuracy': [], 'samples': [], 'time': []}
+            for name in self.models
+        }
+        
+        # Seconds spent preprocessing and in each model's update/predict
+        self.timings: Dict[str, float] = {}
+    
+    def _use_batches(self, method: str) -> bool:
+        """Whether every model supports the mini-batch (CSR) path."""
+        return self.batch_size > 1 and all(hasattr(m, method) for m in self.models.values())
+    
+    def _reset_timings(self):
+        self.timings = dict.fromkeys(['preprocess'] + list(self.models), 0.0)
+    
+    def _stream(self, path: str, max_samples: Optional[int], batched: bool):
+        """
+        Yield (labels, inputs) once per sample or batch, timing preprocessing.
+        
+        inputs is a feature dict, or an (indices, values, indptr) CSR batch.
+        """
+        timings = self.timings
+        if batched:
+            loader = open_loader(path, batch_size=self.batch_size, max_samples=max_samples,
+                                 typed=self.preprocessor.typed)
+            for labels, raw_batch in loader:
+                start = time.perf_counter()
+                batch = self.preprocessor.transform_batch(raw_batch)
+                timings['preprocess'] += time.perf_counter() - start
+                yield labels, batch
+        else:
+            for label, raw_features in StreamingIterator(path, max_samples=max_samples,
+                                                         typed=self.preprocessor.typed):
+                start = time.perf_counter()
+                features = self.preprocessor.transform(raw_features)
+                timings['preprocess'] += time.perf_counter() - start
+                yield [label], features
+    
+    def train(self, train_path: str, max_samples: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Train every model on one pass over the data.
+        
+        Args:
+            train_path: Path to training data file
+            max_samples: Maximum samples to train on (None = all)
+        
+        Returns:
+            Final metrics dictionary per model name
+        """
+        print(f"Starting multi-model training on {train_path}")
+        for name, model in self.models.items():
+            print(f"  {name}: {model}")
+        print(f"Hash buckets: {self.preprocessor.num_buckets}")
+        print("-" * 60)
+        
+        batched = self._use_batches('update_batch')
+        metrics = {name: RunningMetrics() for name in self.models}
+        self._reset_timings()
+        timings = self.timings
+        
+        start_time = time.time()
+        sample_count = 0
+        
+        total = _progress_total(train_path, max_samples)
+        with tqdm(desc="Training", total=total, unit=" samples") as progress:
+            for labels, inputs in self._stream(train_path, max_samples, batched):
+                for name, model in self.models.items():
+                    start = time.perf_counter()
+                    if batched:
+                        preds = model.update_batch(*inputs, labels)
+                        timings[name] += time.perf_counter() - start
+                        metrics[name].update_batch(labels, preds)
+                    else:
+                        pred = model.update(inputs, labels[0])
+                        timings[name] += time.perf_counter() - start
+                        metrics[name].update(labels[0], pred)
+                
+                prev_count = sample_count
+                sample_count += len(labels)
+                progress.update(len(labels))
+                
+                if sample_count // self.log_interval > prev_count // self.log_interval:
+                    self._log_progress(sample_count, metrics, start_time)
+        
+        total_time = time.time() - start_time
+        final_metrics = {name: m.compute() for name, m in metrics.items()}
+        
+        print("\n" + "=" * 60)
+        print("Training Complete!")
+        print(f"  Total samples: {sample_count:,}")
+        print(f"  Total time: {total_time:.1f}s "
+              f"(preprocessing {self.timings['preprocess']:.1f}s, shared by all models)")
+        for name, result in final_metrics.items():
+            print(f"  {name}: Log-Loss {result['log_loss']:.4f}, "
+                  f"Accuracy {result['accuracy']:.4f}, update time {self.timings[name]:.1f}s")
+        
+        return final_metrics
+    
+    def _log_progress(self, sample_count: int, metrics: Dict[str, RunningMetrics], start_time: float):
+        """Record history and print one progress line per model."""
+        elapsed = time.time() - start_time
+        print(f"\n[{sample_count:,}] Time: {elapsed:.1f}s, "
+              f"Speed: {sample_count/elapsed:.0f} samples/s")
+        
+        for name, model_metrics in metrics.items():
+            current_metrics = model_metrics.compute()
+            history = self.history[name]
+            history['log_loss'].append(current_metrics['log_loss'])
+            history['accuracy'].append(current_metrics['accuracy'])
+            history['samples'].append(sample_count)
+            history['time'].append(elapsed)
+            
+            print(f"      {name}: Loss: {current_metrics['log_loss']:.4f}, "
+                  f"Acc: {current_metrics['accuracy']:.4f}")
+    
+    def evaluate(self, test_path: str, max_samples: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Evaluate every model on one pass over the test data.
+        
+        Args:
+            test_path: Path to test data file
+            max_samples: Maximum samples to evaluate on
+        
+        Returns:
+            Evaluation metrics dictionary per model name
+        """
+        print(f"Evaluating on {test_path}")
+        
+        batched = self._use_batches('predict_batch')
+        metrics = {name: RunningMetrics() for name in self.models}
+        predictions: Dict[str, List[float]] = {name: [] for name in self.models}
+        labels: List[int] = []
+        self._reset_timings()
+        timings = self.timings
+        
+        total = _progress_total(test_path, max_samples)
+        with tqdm(desc="Evaluating", total=total, unit=" samples") as progress:
+            for batch_labels, inputs in self._stream(test_path, max_samples, batched):
+                labels.extend(batch_labels)
+                for name, model in self.models.items():
+                    start = time.perf_counter()
+                    if batched:
+                        preds = model.predict_batch(*inputs)
+                        timings[name] += time.perf_counter() - start
+                        predictions[name].extend(preds.tolist())
+                        metrics[name].update_batch(batch_labels, preds)
+                    else:
+                        pred = model.predict(inputs)
+                        timings[name] += time.perf_counter() - start
+                        predictions[name].append(pred)
+                        metrics[name].update(batch_labels[0], pred)
+                progress.update(len(batch_labels))
+        
+        results = {name: m.compute() for name, m in metrics.items()}
+        
+        # Compute AUC if sklearn is available
+        try:
+            from sklearn.metrics import roc_auc_score
+            for name in self.models:
+                results[name]['auc'] = roc_auc_score(labels, predictions[name])
+        except ImportError:
+            pass
+        
+        print("Evaluation Results:")
+        for name, result in results.items():
+            line = f"  {name}: Log-Loss {result['log_loss']:.4f}, Accuracy {result['accuracy']:.4f}"
+            if 'auc' in result:
+                line += f", AUC {result['auc']:.4f}"
+            print(line)
+        
+        return results
+    
+    def get_history(self, name: str) -> Dict:
+        """Get the training history of one model."""
+        return self.history[name]
+
+
 def compare_models(train_path: str,
                    test_path: str,
                    max_train_samples: int = 100000,
@@ -205,45 +638,37 @@ def compare_models(train_path: str,
         test_path: Path to test data
         max_train_samples: Training samples limit
         max_test_samples: Test samples limit
-        
+    
     Returns:
         Comparison results dictionary
     """
-    results = {}
     preprocessor = Preprocessor(num_buckets=2**18)
     
-    # Train FTRL
+    # Both models share one pass over each file (parsing + hashing once)
     print("\n" + "=" * 60)
-    print("Training FTRL-Proximal")
+    print("Training FTRL-Proximal and Online Logistic Regression")
     print("=" * 60)
     
     ftrl = FTRLProximal(alpha=0.1, beta=1.0, L1=1.0, L2=1.0)
-    trainer_ftrl = StreamingTrainer(ftrl, preprocessor, log_interval=20000)
-    
-    train_metrics_ftrl = trainer_ftrl.train(train_path, max_samples=max_train_samples)
-    test_metrics_ftrl = trainer_ftrl.evaluate(test_path, max_samples=max_test_samples)
-    
-    results['ftrl'] = {
-        'train': train_metrics_ftrl,
-        'test': test_metrics_ftrl,
-        'sparsity': ftrl.sparsity()
-    }
-    
-    # Train Online LR
-    print("\n" + "=" * 60)
-    print("Training Online Logistic Regression")
-    print("=" * 60)
-    
     olr = OnlineLogisticRegression(learning_rate=0.1, L2=0.001)
-    trainer_olr = StreamingTrainer(olr, preprocessor, log_interval=20000)
+    trainer = MultiModelTrainer({'ftrl': ftrl, 'online_lr': olr}, preprocessor, log_interval=20000)
     
-    train_metrics_olr = trainer_olr.train(train_path, max_samples=max_train_samples)
-    test_metrics_olr = trainer_olr.evaluate(test_path, max_samples=max_test_samples)
+    train_metrics = trainer.train(train_path, max_samples=max_train_samples)
+    test_metrics = trainer.evaluate(test_path, max_samples=max_test_samples)
+    test_metrics_ftrl = test_metrics['ftrl']
+    test_metrics_olr = test_metrics['online_lr']
     
-    results['online_lr'] = {
-        'train': train_metrics_olr,
-        'test': test_metrics_olr,
-        'weight_stats': olr.weight_stats()
+    results = {
+        'ftrl': {
+            'train': train_metrics['ftrl'],
+            'test': test_metrics_ftrl,
+            'sparsity': ftrl.sparsity()
+        },
+        'online_lr': {
+            'train': train_metrics['online_lr'],
+            'test': test_metrics_olr,
+            'weight_stats': olr.weight_stats()
+        }
     }
     
     # Print comparison